@@ -1,8 +1,15 @@
+import os
+
 import streamlit as st
 
+from src.app.filter_cache import FilterCache
+from src.app.llm_cache import LLMCache
 from src.app.project import Project
+from src.app.project_store import ProjectStore
+from src.app.result_store import ResultStore
 from src.app.speech2text import Speech2Text
-from src.utils.session_state_keys import APP, NLP_LANGUAGE, NLP_STT_HF_MODEL, OPENAI_API_KEY, OPENAI_MODEL_NAME
+from src.utils.session_state_keys import APP, CHART_MAX_POINTS, DATA_DIR, LLM_CACHE_FILE, NLP_LANGUAGE, NLP_STT_HF_MODEL, \
+    OPENAI_API_KEY, OPENAI_MODEL_NAME, SCHEMA_INFERENCE_WORKERS
 
 
 class App:
@@ -13,9 +20,17 @@ class App:
             OPENAI_MODEL_NAME: 'gpt-4o-mini',
             NLP_LANGUAGE: 'en',  # used for the speech2text component, there is 1 for all the projects
             NLP_STT_HF_MODEL: 'openai/whisper-tiny',
+            LLM_CACHE_FILE: None,  # set a file path to persist the LLM cache (see Settings)
+            CHART_MAX_POINTS: 5000,  # scatter, line and area charts with more points are downsampled
+            DATA_DIR: 'data',  # the project data is stored in DATA_DIR/projects
+            SCHEMA_INFERENCE_WORKERS: min(8, os.cpu_count() or 1),  # columns whose data schema is inferred at once
         }
         self.projects: list[Project] = []
         self.speech2text: Speech2Text = Speech2Text(self)
+        self.filter_cache: FilterCache = FilterCache()
+        self.llm_cache: LLMCache = LLMCache(path=self.properties[LLM_CACHE_FILE])
+        self.result_store: ResultStore = ResultStore()
+        self.project_store: ProjectStore = ProjectStore(os.path.join(self.properties[DATA_DIR], 'projects'))
 
     def add_project(self, project: Project):
         self.projects.append(project)
@@ -26,9 +41,18 @@ class App:
                 return project
         return None
 
+    def load_projects(self):
+        """Create the projects stored in the project store (e.g. after restarting the app)."""
+        for df, metadata in self.project_store.load_all():
+            if self.get_project(metadata['name']) is None:
+                Project(self, metadata['name'], df, metadata.get('original_memory_usage'), stored=True,
+                        out_of_core=metadata.get('out_of_core', False), num_rows=metadata.get('num_rows'),
+                        state=self.project_store.load_state(metadata['name']))
+
     def delete_project(self, project: Project):
         index = self.projects.index(project)
         self.projects.remove(project)
+        self.project_store.delete(project.name)
         if self.projects:
             return self.projects[max(index-1, 0)]
         else:
@@ -38,6 +62,7 @@ class App:
 @st.cache_resource
 def create_app():
     _app = App()
+    _app.load_projects()
     return _app
 
 
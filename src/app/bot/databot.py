@@ -1,9 +1,15 @@
 import json
 import logging
 import random
+import threading
+import weakref
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 
+import duckdb
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 from besser.bot.core.bot import Bot
 from besser.bot.core.session import Session
 from besser.bot.nlp import NLP_LANGUAGE, OPENAI_API_KEY
@@ -11,16 +17,18 @@ from besser.bot.nlp.intent_classifier.intent_classifier_configuration import LLM
 from besser.bot.nlp.llm.llm_openai_api import LLMOpenAI
 from besser.bot.platforms.payload import Payload, PayloadAction
 from besser.bot.platforms.websocket import WEBSOCKET_PORT
-from besser.bot.platforms.websocket.websocket_platform import WebSocketPlatform
 from pandas import DataFrame
 
 from src.app.bot.library.databot_entities import DataBotEntities
 from src.app.bot.library.databot_intents import DataBotIntents
 from src.app.bot.library.session_keys import FILTERS, LLM_ANSWERS_ENABLED, REPLY_FALLBACK_MESSAGE
+from src.app.bot.platform import BotPlatform
 from src.app.bot.workflows.llm_query import LLMQuery
 from src.app.bot.workflows.queries.charts.area_chart import AreaChart
 from src.app.bot.workflows.queries.charts.bar_chart import BarChart
 from src.app.bot.workflows.queries.charts.boxplot_chart import BoxplotChart
+from src.app.bot.workflows.queries.charts.chart_data import aggregate_sum, get_histogram_bin_edges, \
+    get_histogram_data
 from src.app.bot.workflows.queries.charts.histogram_chart import HistogramChart
 from src.app.bot.workflows.queries.charts.line_chart import LineChart
 from src.app.bot.workflows.queries.charts.pie_chart import PieChart
@@ -30,29 +38,49 @@ from src.app.bot.workflows.queries.tables.frequent_value_in_field import Frequen
 from src.app.bot.workflows.queries.tables.select_fields_with_conditions import SelectFieldsWithConditions
 from src.app.bot.workflows.queries.tables.value1_vs_value2 import Value1VSValue2
 from src.app.bot.workflows.queries.tables.value_frequency import ValueFrequency
+from src.app.filter_cache import compact_rows, count_selected_rows, intersect_rows, select_rows
+from src.app.result_store import DATAFRAME_PAGE_SIZE, stringify_datetimes
+from src.app.sql_engine import SQLEngine
 from src.schema.field_schema import FieldSchema
+from src.schema.field_statistics import BOX_MAX_OUTLIERS, FieldStatistics, get_box_statistics
+from src.schema.field_type import DATETIME, NUMERIC
 from src.schema.filter import Filter
+from src.schema.value_index import get_value_mask
 from src.utils import session_state_keys
-from src.utils.session_state_keys import BOT_DF_DATA, BOT_DF_SQL, BOT_DF_TITLE, SESSION_ID
+from src.utils.dataframe_encoding import encode_dataframe
+from src.utils.session_state_keys import BOT_DF_DATA, BOT_DF_HANDLE, BOT_DF_SQL, BOT_DF_TITLE, BOT_DF_TOTAL_ROWS, \
+    CHART_MAX_POINTS, SESSION_ID
+from src.utils.sql import quote_identifier, sql_literal
 
 if TYPE_CHECKING:
     from src.app.project import Project
 
+BOX_STATISTICS_CACHE_MAX_ENTRIES = 128
+"""int: Maximum number of (field, filter set) box plot statistics kept by each bot."""
+
+OUT_OF_CORE_CHART_SAMPLE_RATIO = 10
+"""int: Number of rows sampled from the data of an out-of-core project per point of a chart (see
+:meth:`DataBot.get_chart_df`), which are then reduced to the chart point budget."""
+
 
 class DataBot:
 
-    def __init__(self, project: 'Project'):
+    def __init__(self, project: 'Project', bot_state: dict = None):
         self.project: Project = project
         self.bot: Bot = Bot(project.name + '_bot')
-        self.field_value_map: dict[str, str] = {}
-        self.entities: DataBotEntities = DataBotEntities(self)
+        # The stored bot state (see get_state) skips generating the schema entities again
+        self.field_value_map: dict[str, str] = dict(bot_state['field_value_map']) if bot_state else {}
+        self.entities: DataBotEntities = DataBotEntities(self, bot_state['entities'] if bot_state else None)
         self.intents: DataBotIntents = DataBotIntents(self)
         self.key_fields: list[FieldSchema] = self.project.data_schema.get_key_fields()
+        self.sql_engine: SQLEngine = self.create_sql_engine()
+        self._box_statistics_cache: OrderedDict = OrderedDict()
+        self._box_statistics_lock: threading.Lock = threading.Lock()
         with open('src/app/bot/library/messages.json', 'r', encoding='utf-8') as file:
             self.messages: dict[str, str] = json.load(file)
         logging.basicConfig(level=logging.INFO, format='{levelname} - {asctime}: {message}', style='{')
         self._set_bot_properties()
-        self.platform: WebSocketPlatform = self.bot.use_websocket_platform(use_ui=False)
+        self.platform: BotPlatform = BotPlatform(self.bot.use_websocket_platform(use_ui=False))
 
         llm = LLMOpenAI(bot=self.bot, name='gpt-4o-mini', parameters={})
 
@@ -127,41 +155,524 @@ class DataBot:
         # LLM Fallback
         self.s0.when_no_intent_matched_go_to(self.llm_query_workflow.llm_query)
 
+    def refresh_data(self, start: int = None) -> None:
+        """Load the project data again after it changed (the previous data is still used by the running queries).
+
+        Args:
+            start (int): if only rows were appended to the project data, the position of the first appended row: only
+                these rows are loaded into the SQL engine. None to load all the data again
+        """
+        if start is not None:
+            try:
+                self.sql_engine.append_rows(self.project.df, start)
+            except duckdb.Error:
+                # E.g. new values of a categorical column, stored as an enum in the data table
+                start = None
+        if start is None:
+            self.sql_engine = self.create_sql_engine()
+        self.key_fields = self.project.data_schema.get_key_fields()
+        with self._box_statistics_lock:
+            self._box_statistics_cache.clear()
+
+    def create_sql_engine(self) -> SQLEngine:
+        """Create the SQL engine of the project data (over the stored data files, for out-of-core projects)."""
+        if self.project.out_of_core:
+            return SQLEngine(file_paths=self.project.get_data_file_paths())
+        return SQLEngine(self.project.df)
+
+    def get_state(self) -> dict:
+        """Get the definitions generated from the data schema when creating the bot, to store them."""
+        return {
+            'entities': self.entities.get_schema_entries(),
+            'field_value_map': self.field_value_map,
+        }
+
     def _set_bot_properties(self):
         self.bot.set_property(OPENAI_API_KEY, self.project.app.properties[session_state_keys.OPENAI_API_KEY])
         self.bot.set_property(WEBSOCKET_PORT, self.project.properties[WEBSOCKET_PORT.name])
         self.bot.set_property(NLP_LANGUAGE, self.project.properties[NLP_LANGUAGE.name])
 
-    def get_df(self, session: Session):
-        df = self.project.df.copy(deep=True)
+    def get_mask(self, session: Session) -> np.ndarray or None:
+        """Get the boolean row mask of the project data resulting from all the filters of a user session.
+
+        Args:
+            session (Session): the user session
+
+        Returns:
+            numpy.ndarray or None: the row mask, or None if the session has no filters (i.e. all rows are selected)
+        """
         bot_filters: list[Filter] = session.get(FILTERS)
+        if not bot_filters:
+            return None
+        df = self.project.df
+        partitions = self.project.get_partitions(bot_filters)
+        if len(partitions) == len(self.project.partitions):
+            mask = np.ones(len(df), dtype=bool)
+            for bot_filter in bot_filters:
+                mask &= bot_filter.get_mask(df)
+            return mask
+        # Some partitions cannot match the filters: only the rows of the other partitions are evaluated (unless the
+        # filter is resolved with an index)
+        mask = np.zeros(len(df), dtype=bool)
+        for partition in partitions:
+            mask[partition.start:partition.stop] = True
         for bot_filter in bot_filters:
-            df = bot_filter.apply(df)
-        return df
+            filter_mask = bot_filter.get_indexed_mask(df)
+            if filter_mask is not None:
+                mask &= filter_mask
+            else:
+                for partition in partitions:
+                    partition_df = df.iloc[partition.start:partition.stop]
+                    mask[partition.start:partition.stop] &= bot_filter.get_mask(partition_df)
+        return mask
+
+    def get_filter_rows(self, session: Session) -> np.ndarray or None:
+        """Get the rows of the project data selected by the filters of a user session.
+
+        The selected rows are stored in the app's filter cache, so they are only computed again when the session
+        filters change.
+
+        Args:
+            session (Session): the user session
+
+        Returns:
+            numpy.ndarray or None: the boolean row mask or the sorted row positions (see
+            :func:`~src.app.filter_cache.compact_rows`), or None if the session has no filters
+        """
+        bot_filters: list[Filter] = session.get(FILTERS)
+        if not bot_filters:
+            return None
+        filter_cache = self.project.app.filter_cache
+        df = self.project.df
+        key = frozenset(bot_filter.get_key() for bot_filter in bot_filters)
+        rows = filter_cache.get(session.id, key, df)
+        if rows is None:
+            rows = compact_rows(self.get_mask(session))
+            filter_cache.put(session.id, key, df, rows)
+        return rows
+
+    def get_where(self, session: Session, value_field_map: dict[str, str] = None) -> str or None:
+        """Get the SQL condition of the filters of a user session and, optionally, a set of equality conditions, to
+        push them down to the SQL engine of an out-of-core project.
+
+        Args:
+            session (Session): the user session
+            value_field_map (dict[str, str]): the equality conditions, as a value -> field dictionary
+
+        Returns:
+            str or None: the SQL condition, or None if all rows are selected
+        """
+        conditions = [bot_filter.get_sql() for bot_filter in session.get(FILTERS) or []]
+        for value, field in (value_field_map or {}).items():
+            # Like the value index, values are compared by their string representation
+            conditions.append(f'CAST({quote_identifier(field)} AS VARCHAR) = {sql_literal(str(value))}')
+        if not conditions:
+            return None
+        return ' AND '.join(f'({condition})' for condition in conditions)
+
+    def query_sql(self, session: Session, sql: str, value_field_map: dict[str, str] = None,
+                  params: list = None) -> DataFrame:
+        """Run a SQL query on the project data visible to a user session (the 'df' table, see
+        :meth:`SQLEngine.query`).
+
+        Args:
+            session (Session): the user session
+            sql (str): the SQL query
+            value_field_map (dict[str, str]): additional equality conditions, as a value -> field dictionary
+            params (list): the values of the parameters of the SQL query, or None
+
+        Returns:
+            pandas.DataFrame: the query result
+        """
+        if self.project.out_of_core:
+            return self.sql_engine.query(sql, where=self.get_where(session, value_field_map), params=params)
+        return self.sql_engine.query(sql, self.get_rows(session, value_field_map), params=params)
+
+    def query_untrusted_sql(self, session: Session, sql: str) -> DataFrame:
+        """Run an untrusted SQL query (e.g. generated by the LLM) on the project data visible to a user session, in
+        the sandbox of the SQL engine (see :meth:`SQLEngine.query_untrusted`).
+
+        Args:
+            session (Session): the user session
+            sql (str): the SQL query
+
+        Returns:
+            pandas.DataFrame: the query result
+
+        Raises:
+            ValueError: if the query is not a single SELECT statement
+            duckdb.Error: if the query fails
+        """
+        if self.project.out_of_core:
+            return self.sql_engine.query_untrusted(sql, where=self.get_where(session))
+        return self.sql_engine.query_untrusted(sql, self.get_rows(session))
+
+    def get_statistics(self, session: Session, field: str) -> FieldStatistics or None:
+        """Get the precomputed statistics of a field, only if they are valid for a user session (i.e. the session has
+        no filters).
+
+        Args:
+            session (Session): the user session
+            field (str): the field name
+
+        Returns:
+            FieldStatistics or None: the field statistics, or None if they must be computed on the filtered data
+        """
+        if session.get(FILTERS):
+            return None
+        field_schema = self.project.data_schema.get_field(field)
+        if field_schema is None or field_schema.statistics is None or not field_schema.statistics.built_on(self.project.df):
+            return None
+        return field_schema.statistics
+
+    def get_field_type(self, field: str) -> str or None:
+        """Get the type of a field (see :mod:`src.schema.field_type`), or None if it is not in the data schema."""
+        field_schema = self.project.data_schema.get_field(field)
+        return field_schema.type.t if field_schema is not None else None
+
+    def get_box_statistics(self, session: Session, field: str) -> dict or None:
+        """Get the box plot statistics of a field in the data selected by the filters of a user session.
+
+        Without filters, the precomputed field statistics are used. Otherwise, the statistics are computed once per
+        field and filter set and kept in a small LRU cache shared by all the sessions.
+
+        Args:
+            session (Session): the user session
+            field (str): the field name
+
+        Returns:
+            dict or None: the box plot statistics (see :func:`~src.schema.field_statistics.get_box_statistics`), or
+            None if the field is not numeric or has no values
+        """
+        statistics = self.get_statistics(session, field)
+        if statistics is not None:
+            return statistics.box
+        df = self.project.df
+        key = (field, frozenset(bot_filter.get_key() for bot_filter in session.get(FILTERS) or []))
+        with self._box_statistics_lock:
+            entry = self._box_statistics_cache.get(key)
+            if entry is not None and entry[0]() is df:
+                self._box_statistics_cache.move_to_end(key)
+                return entry[1]
+        if self.project.out_of_core:
+            box = self.query_box_statistics(session, field)
+        else:
+            box = get_box_statistics(self.get_df(session, columns=[field])[field])
+        with self._box_statistics_lock:
+            self._box_statistics_cache[key] = (weakref.ref(df), box)
+            self._box_statistics_cache.move_to_end(key)
+            while len(self._box_statistics_cache) > BOX_STATISTICS_CACHE_MAX_ENTRIES:
+                self._box_statistics_cache.popitem(last=False)
+        return box
+
+    def query_box_statistics(self, session: Session, field: str) -> dict or None:
+        """Compute the box plot statistics of a field with the SQL engine (the same statistics as
+        :func:`~src.schema.field_statistics.get_box_statistics`), for out-of-core projects."""
+        if self.get_field_type(field) != NUMERIC:
+            return None
+        column = quote_identifier(field)
+        quartiles, mean, count = self.query_sql(
+            session, f'SELECT quantile_cont({column}, [0.25, 0.5, 0.75]), avg({column}), count({column}) FROM df'
+        ).iloc[0]
+        if count == 0:
+            return None
+        q1, median, q3 = quartiles
+        iqr = q3 - q1
+        fences = [q1 - 1.5 * iqr, q3 + 1.5 * iqr]
+        lower, upper, num_outliers = self.query_sql(
+            session, f'SELECT min({column}) FILTER (WHERE {column} >= ?), max({column}) FILTER (WHERE {column} <= ?), '
+                     f'count(*) FILTER (WHERE {column} < ? OR {column} > ?) FROM df', params=fences + fences
+        ).iloc[0]
+        outliers_sql = f'SELECT {column} AS value FROM df WHERE {column} < ? OR {column} > ? ORDER BY value'
+        params = fences
+        if num_outliers > BOX_MAX_OUTLIERS:
+            # Like get_box_statistics, an evenly spaced sample of the outliers is kept
+            positions = np.linspace(0, num_outliers - 1, BOX_MAX_OUTLIERS).astype(np.int64)
+            outliers_sql = f'SELECT value FROM (SELECT value, row_number() OVER (ORDER BY value) - 1 AS i ' \
+                           f'FROM ({outliers_sql})) WHERE i IN (SELECT unnest(?)) ORDER BY value'
+            params = fences + [positions.tolist()]
+        outliers = self.query_sql(session, outliers_sql, params=params)['value'].to_numpy(dtype=np.float64)
+        return {
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'mean': mean,
+            'lowerfence': lower,
+            'upperfence': upper,
+            'outliers': outliers,
+            'count': int(count),
+        }
+
+    def get_value_positions(self, field: str, value: str) -> np.ndarray:
+        """Get the sorted positions of the project data rows where a field is equal to a value.
+
+        The field's value index is used if available, otherwise the whole column is compared with the value.
+        """
+        df = self.project.df
+        field_schema = self.project.data_schema.get_field(field)
+        if field_schema and field_schema.value_index is not None and field_schema.value_index.built_on(df):
+            return field_schema.value_index.get_positions(value)
+        return np.flatnonzero(get_value_mask(df[field], value))
+
+    def get_rows(self, session: Session, value_field_map: dict[str, str] = None) -> np.ndarray or None:
+        """Get the rows of the project data selected by the filters of a user session and, optionally, a set of
+        equality conditions.
+
+        Args:
+            session (Session): the user session
+            value_field_map (dict[str, str]): the equality conditions, as a value -> field dictionary
+
+        Returns:
+            numpy.ndarray or None: the boolean row mask or the sorted row positions, or None if all rows are selected
+        """
+        rows = self.get_filter_rows(session)
+        if value_field_map:
+            for value, field in value_field_map.items():
+                rows = intersect_rows(rows, self.get_value_positions(field, value))
+        return rows
+
+    def count_rows(self, session: Session, value_field_map: dict[str, str] = None) -> int:
+        """Get the number of rows selected by :meth:`get_rows`, without selecting them from the project data."""
+        if self.project.out_of_core:
+            return int(self.query_sql(session, 'SELECT count(*) FROM df', value_field_map).iloc[0, 0])
+        return count_selected_rows(self.get_rows(session, value_field_map), len(self.project.df))
+
+    def get_df(self, session: Session, columns: list[str] = None, value_field_map: dict[str, str] = None) -> DataFrame:
+        """Get the project data visible to a user session, i.e. with the session filters applied.
+
+        The project DataFrame is never copied: without filters it is returned as is, and otherwise the rows selected
+        by all the filters (see :meth:`get_rows`) are taken at once. The returned DataFrame must not be modified in
+        place. For out-of-core projects, the filtered data is read by the SQL engine.
+
+        Args:
+            session (Session): the user session
+            columns (list[str]): the columns to select, or None to select all of them
+            value_field_map (dict[str, str]): additional equality conditions, as a value -> field dictionary
+
+        Returns:
+            pandas.DataFrame: the filtered data
+        """
+        if self.project.out_of_core:
+            select = ', '.join(quote_identifier(column) for column in dict.fromkeys(columns)) if columns else '*'
+            return self.query_sql(session, f'SELECT {select} FROM df', value_field_map)
+        df = self.project.df
+        if columns is not None:
+            df = df[list(dict.fromkeys(columns))]
+        rows = self.get_rows(session, value_field_map)
+        if rows is None:
+            return df
+        return select_rows(df, rows)
+
+    def get_top_df(self, session: Session, field: str, number: int, largest: bool, columns: list[str] = None,
+                   value_field_map: dict[str, str] = None) -> DataFrame:
+        """Get the rows of the project data visible to a user session with the highest (or lowest) values of a field,
+        keeping all the ties (like pandas.DataFrame.nlargest/nsmallest with keep='all').
+
+        The field's sorted index is used if available, so the data is not sorted again for every query.
+
+        Args:
+            session (Session): the user session
+            field (str): the field to get the highest/lowest values from
+            number (int): the number of values to get
+            largest (bool): True to get the highest values, False to get the lowest ones
+            columns (list[str]): the columns to select, or None to select all of them
+            value_field_map (dict[str, str]): additional equality conditions, as a value -> field dictionary
+
+        Returns:
+            pandas.DataFrame: the selected rows, sorted by the field value
+        """
+        if self.project.out_of_core:
+            column = quote_identifier(field)
+            select = ', '.join(quote_identifier(column) for column in dict.fromkeys(columns)) if columns else '*'
+            order = 'DESC' if largest else 'ASC'
+            return self.query_sql(
+                session, f'SELECT {select} FROM df WHERE {column} IS NOT NULL '
+                         f'QUALIFY rank() OVER (ORDER BY {column} {order}) <= ? ORDER BY {column} {order}',
+                value_field_map, params=[number]
+            )
+        df = self.project.df
+        field_schema = self.project.data_schema.get_field(field)
+        if field_schema is None or field_schema.range_index is None or not field_schema.range_index.built_on(df):
+            df = self.get_df(session, columns, value_field_map)
+            if largest:
+                return df.nlargest(number, field, keep='all')
+            return df.nsmallest(number, field, keep='all')
+        rows = self.get_rows(session, value_field_map)
+        positions = field_schema.range_index.get_top_positions(number, largest, rows)
+        if columns is not None:
+            df = df[list(dict.fromkeys(columns))]
+        return df.iloc[positions]
+
+    def get_distinct_values(self, session: Session, field: str) -> np.ndarray:
+        """Get the distinct values of a field in the project data visible to a user session."""
+        statistics = self.get_statistics(session, field)
+        if statistics is not None:
+            return statistics.distinct
+        if self.project.out_of_core:
+            column = quote_identifier(field)
+            return self.query_sql(session, f'SELECT DISTINCT {column} FROM df ORDER BY {column}')[field].to_numpy()
+        return self.get_df(session, columns=[field])[field].unique()
+
+    def get_value_counts(self, session: Session, field: str) -> pd.Series:
+        """Get the number of rows of each (non-null) value of a field in the project data visible to a user session,
+        sorted by count (like pandas.Series.value_counts)."""
+        statistics = self.get_statistics(session, field)
+        if statistics is not None:
+            return statistics.value_counts
+        if self.project.out_of_core:
+            column = quote_identifier(field)
+            counts = self.query_sql(
+                session, f'SELECT {column}, count(*) AS count FROM df WHERE {column} IS NOT NULL GROUP BY {column} '
+                         f'ORDER BY count DESC'
+            )
+            return pd.Series(counts['count'].to_numpy(), index=pd.Index(counts[field], name=field), name='count')
+        value_counts = self.get_df(session, columns=[field])[field].value_counts()
+        # Categorical fields also count the categories that are not in the filtered data
+        return value_counts[value_counts > 0]
+
+    def get_aggregate(self, session: Session, field: str, function: str, value_field_map: dict[str, str] = None):
+        """Get the mean or the sum of a numeric field in the project data visible to a user session.
+
+        Args:
+            session (Session): the user session
+            field (str): the field name
+            function (str): 'mean' or 'sum'
+            value_field_map (dict[str, str]): additional equality conditions, as a value -> field dictionary
+
+        Returns:
+            the mean or the sum of the field values
+        """
+        statistics = None if value_field_map else self.get_statistics(session, field)
+        if statistics is not None:
+            return getattr(statistics, function)
+        if self.project.out_of_core:
+            aggregate = 'avg' if function == 'mean' else 'sum'
+            value = self.query_sql(session, f'SELECT {aggregate}({quote_identifier(field)}) FROM df',
+                                   value_field_map).iloc[0, 0]
+            # Like pandas, the sum of no values is 0
+            return 0 if pd.isna(value) and function == 'sum' else value
+        return getattr(self.get_df(session, columns=[field], value_field_map=value_field_map)[field], function)()
+
+    def get_group_sums(self, session: Session, group_field: str, value_field: str) -> DataFrame:
+        """Sum the values of a field grouped by another field, in the project data visible to a user session (see
+        :func:`~src.app.bot.workflows.queries.charts.chart_data.aggregate_sum`).
+
+        Returns:
+            pandas.DataFrame: one row per group with the group and the sum of its values, or the chart data (see
+            :meth:`get_chart_df`) if it cannot be aggregated
+        """
+        if not self.project.out_of_core:
+            return aggregate_sum(self.get_df(session, columns=[group_field, value_field]), group_field, value_field)
+        if group_field == value_field or self.get_field_type(value_field) != NUMERIC:
+            return self.get_chart_df(session, [group_field, value_field],
+                                     self.project.app.properties[CHART_MAX_POINTS])[0]
+        group = quote_identifier(group_field)
+        value = quote_identifier(value_field)
+        return self.query_sql(session, f'SELECT {group}, sum({value}) AS {value} FROM df GROUP BY {group} '
+                                        f'ORDER BY {group}')
+
+    def get_histogram(self, session: Session, field: str) -> tuple[DataFrame, np.ndarray or None]:
+        """Count the values of the histogram of a field in the project data visible to a user session (see
+        :func:`~src.app.bot.workflows.queries.charts.chart_data.get_histogram_data`). The values of out-of-core
+        projects are counted by the SQL engine."""
+        if not self.project.out_of_core:
+            return get_histogram_data(self.get_df(session, columns=[field])[field])
+        column = quote_identifier(field)
+        count_column = 'count' if field != 'count' else 'number of rows'
+        field_type = self.get_field_type(field)
+        if field_type not in [NUMERIC, DATETIME]:
+            return self.query_sql(session, f'SELECT {column}, count(*) AS {quote_identifier(count_column)} FROM df '
+                                           f'WHERE {column} IS NOT NULL GROUP BY {column} ORDER BY {column}'), None
+        # Datetimes are binned as milliseconds since epoch (the units of a datetime chart axis)
+        values = f'epoch_ms({column})' if field_type == DATETIME else f'CAST({column} AS DOUBLE)'
+        low, high, count, quartiles = self.query_sql(
+            session, f'SELECT min({values}), max({values}), count({values}), '
+                     f'quantile_cont({values}, [0.25, 0.75]) FROM df'
+        ).iloc[0]
+        if count == 0:
+            return DataFrame({field: [], count_column: np.array([], dtype=np.int64)}), None
+        edges = get_histogram_bin_edges(float(low), float(high), int(count), quartiles[1] - quartiles[0])
+        num_bins = len(edges) - 1
+        bins = self.query_sql(
+            session, f'SELECT least(CAST(floor(({values} - ?) / ? * ?) AS BIGINT), ? - 1) AS bin, count(*) AS count '
+                     f'FROM df WHERE {column} IS NOT NULL GROUP BY bin',
+            params=[edges[0], edges[-1] - edges[0], num_bins, num_bins]
+        )
+        counts = np.zeros(num_bins, dtype=np.int64)
+        counts[bins['bin'].to_numpy(dtype=np.int64)] = bins['count'].to_numpy()
+        centers = (edges[:-1] + edges[1:]) / 2
+        if field_type == DATETIME:
+            centers = pd.to_datetime(centers, unit='ms')
+        return DataFrame({field: centers, count_column: counts}), np.diff(edges)
+
+    def get_chart_df(self, session: Session, columns: list[str], max_points: int) -> tuple[DataFrame, int]:
+        """Get the data of a chart in the project data visible to a user session.
+
+        For out-of-core projects, if there are many more rows than the chart point budget, only a random sample of
+        :data:`OUT_OF_CORE_CHART_SAMPLE_RATIO` rows per point is read (the chart data is reduced to the budget anyway,
+        see :mod:`~src.app.bot.workflows.queries.charts.chart_data`).
+
+        Args:
+            session (Session): the user session
+            columns (list[str]): the chart columns
+            max_points (int): the chart point budget
+
+        Returns:
+            tuple[pandas.DataFrame, int]: the chart data, and the number of rows it comes from
+        """
+        if not self.project.out_of_core:
+            df = self.get_df(session, columns=columns)
+            return df, len(df)
+        num_rows = self.count_rows(session)
+        select = ', '.join(quote_identifier(column) for column in dict.fromkeys(columns))
+        sql = f'SELECT {select} FROM df'
+        if num_rows > max_points * OUT_OF_CORE_CHART_SAMPLE_RATIO:
+            sql += f' USING SAMPLE reservoir({int(max_points * OUT_OF_CORE_CHART_SAMPLE_RATIO)} ROWS) REPEATABLE (0)'
+        return self.query_sql(session, sql), num_rows
 
     def reply_dataframe(self, session: Session, df: DataFrame, title: str, sql: str = None) -> None:
         """Send a DataFrame bot reply, i.e. a table, to a specific user.
 
+        Only the first page of the DataFrame is sent. If there are more rows, the DataFrame is kept in the app's result
+        store and the message contains the handle to get the remaining rows from it.
+
         Args:
             title (str): the DataFrame title
             session (Session): the user session
             df (pandas.DataFrame): the message to send to the user
             sql (str): a sql statement if this df has been generated with a sql statement, or None otherwise
         """
-        pd.set_option('mode.chained_assignment', None)
-        for col in df.columns:
-            if pd.api.types.is_datetime64_any_dtype(df[col]):
-                df[col] = df[col].astype(str)
-        message = {BOT_DF_TITLE: title, BOT_DF_SQL: sql, BOT_DF_DATA: df.to_dict()}
+        handle = None
+        if len(df) > DATAFRAME_PAGE_SIZE:
+            handle = self.project.app.result_store.put(df)
+        page = df.iloc[:DATAFRAME_PAGE_SIZE]
+        message = {
+            BOT_DF_TITLE: title,
+            BOT_DF_SQL: sql,
+            BOT_DF_TOTAL_ROWS: len(df),
+            BOT_DF_HANDLE: handle
+        }
+        # The DataFrame is sent in a binary frame encoded with Arrow, which keeps the column dtypes. If it cannot be
+        # encoded (e.g. columns with mixed types), it is sent in a JSON payload
+        try:
+            if self.platform.send_binary(session, encode_dataframe(message, page)):
+                return
+        except pa.ArrowException as e:
+            logging.warning(f'The DataFrame could not be encoded with Arrow, sending it as JSON: {e}')
+        message[BOT_DF_DATA] = stringify_datetimes(page).to_dict()
         message = json.dumps(message)
         # session.chat_history.append((message, 0))
         payload = Payload(action=PayloadAction.BOT_REPLY_DF,
                           message=message)
-        self.platform._send(session.id, payload)
-        pd.set_option('mode.chained_assignment', 'warn')
+        self.platform.send_payload(session, payload)
 
     def reply(self, session: Session, data: DataFrame, title: str, message_key: str):
-        if len(data) == 0:
+        self.reply_num_rows(session, len(data), title, message_key)
+
+    def reply_num_rows(self, session: Session, num_rows: int, title: str, message_key: str) -> None:
+        """Send the message introducing the answer of a query, or that nothing was found if the answer has no rows
+        (like :meth:`reply`, from the number of rows of the answer, without selecting them)."""
+        if num_rows == 0:
             session.reply(self.messages['nothing_found'].format(title))
         else:
             session.reply(random.choice(self.messages[message_key]).format(title))
@@ -60,22 +60,42 @@ def generate_row_name_entity() -> Entity:
     return Entity('row_name', entries=entries)
 
 
+def get_entity_entries(entity: Entity) -> dict[str, list[str]]:
+    """Get the entries (and their synonyms) of an entity."""
+    return {entry.value: list(entry.synonyms) for entry in entity.entries}
+
+
 class DataBotEntities:
-    """All the entities used by the DataBot"""
+    """All the entities used by the DataBot.
+
+    The entities generated from the data schema can be restored from their stored entries (see
+    :meth:`get_schema_entries`) instead of generating them again.
+    """
 
-    def __init__(self, databot: 'DataBot'):
-        self.numeric_field = databot.bot.add_entity(generate_field_entity(databot, NUMERIC))
-        self.textual_field = databot.bot.add_entity(generate_field_entity(databot, TEXTUAL))
-        self.datetime_field = databot.bot.add_entity(generate_field_entity(databot, DATETIME))
+    def __init__(self, databot: 'DataBot', schema_entries: dict[str, dict[str, list[str]]] = None):
+
+        def schema_entity(name: str, generate) -> Entity:
+            if schema_entries is not None and name in schema_entries:
+                return Entity(name, entries=schema_entries[name])
+            return generate()
+
+        self.numeric_field = databot.bot.add_entity(schema_entity('numeric_field', lambda: generate_field_entity(databot, NUMERIC)))
+        self.textual_field = databot.bot.add_entity(schema_entity('textual_field', lambda: generate_field_entity(databot, TEXTUAL)))
+        self.datetime_field = databot.bot.add_entity(schema_entity('datetime_field', lambda: generate_field_entity(databot, DATETIME)))
         # TODO: BOOLEAN field
-        self.field = databot.bot.add_entity(generate_field_entity(databot))
+        self.field = databot.bot.add_entity(schema_entity('field', lambda: generate_field_entity(databot)))
         self.numeric_operator = databot.bot.add_entity(generate_operator_entity('numeric_operator'))
         self.textual_operator = databot.bot.add_entity(generate_operator_entity('textual_operator'))
         self.datetime_operator = databot.bot.add_entity(generate_operator_entity('datetime_operator'))
         self.numeric_function_operator = databot.bot.add_entity(generate_operator_entity('numeric_function_operator'))
         self.datetime_function_operator = databot.bot.add_entity(generate_operator_entity('datetime_function_operator'))
         self.function_operator = databot.bot.add_entity(merge_entities('function_operator', [self.numeric_function_operator, self.datetime_function_operator]))
-        self.field_value = databot.bot.add_entity(generate_field_value_entity(databot))
+        self.field_value = databot.bot.add_entity(schema_entity('field_value', lambda: generate_field_value_entity(databot)))
         self.row_name = databot.bot.add_entity(generate_row_name_entity())
 
         # TODO: Field groups
+
+    def get_schema_entries(self) -> dict[str, dict[str, list[str]]]:
+        """Get the entries of the entities generated from the data schema, to store them."""
+        return {entity.name: get_entity_entries(entity)
+                for entity in [self.numeric_field, self.textual_field, self.datetime_field, self.field, self.field_value]}
@@ -0,0 +1,50 @@
+from besser.bot.core.session import Session
+from besser.bot.platforms.payload import Payload
+from besser.bot.platforms.websocket.websocket_platform import WebSocketPlatform
+from plotly.graph_objs import Figure
+
+
+class BotPlatform:
+    """Wrapper of the websocket platform of a bot, to send the bot replies to the user sessions.
+
+    Besides the replies supported by the framework (text, Plotly figures and JSON payloads), it sends binary frames
+    (e.g. DataFrames encoded with Arrow, see :func:`~src.utils.dataframe_encoding.encode_dataframe`), which the
+    framework has no public method for.
+
+    Args:
+        platform (WebSocketPlatform): the websocket platform of the bot
+
+    Attributes:
+        _platform (WebSocketPlatform): the websocket platform of the bot
+    """
+
+    def __init__(self, platform: WebSocketPlatform):
+        self._platform: WebSocketPlatform = platform
+
+    def reply(self, session: Session, message: str) -> None:
+        """Send a text reply to a user session."""
+        self._platform.reply(session, message)
+
+    def reply_plotly(self, session: Session, plot: Figure) -> None:
+        """Send a Plotly figure reply to a user session."""
+        self._platform.reply_plotly(session, plot)
+
+    def send_payload(self, session: Session, payload: Payload) -> None:
+        """Send a JSON payload to a user session."""
+        self._platform._send(session.id, payload)
+
+    def send_binary(self, session: Session, data: bytes) -> bool:
+        """Send a binary frame to a user session.
+
+        Args:
+            session (Session): the user session
+            data (bytes): the frame content
+
+        Returns:
+            bool: False if the session has no open connection (so nothing was sent)
+        """
+        connection = self._platform._connections.get(session.id)
+        if connection is None:
+            return False
+        connection.send(data)
+        return True
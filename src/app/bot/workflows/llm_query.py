@@ -6,7 +6,6 @@ from typing import TYPE_CHECKING
 
 import openai
 from besser.bot.core.session import Session
-from pandasql import sqldf
 
 from src.app.bot.library.session_keys import LLM_ANSWERS_ENABLED, REPLY_FALLBACK_MESSAGE
 from src.utils.session_state_keys import AI_ICON, OPENAI_MODEL_NAME
@@ -26,13 +25,22 @@ class LLMQuery:
             if self.client and session.get(LLM_ANSWERS_ENABLED):
                 try:
                     data_schema_dict = self.databot.project.data_schema.to_dict_simple()
-                    response = self.query_openai(session.message, data_schema_dict)
+                    llm_cache = self.databot.project.app.llm_cache
+                    key = llm_cache.get_key(session.message, data_schema_dict,
+                                            self.databot.project.app.properties[OPENAI_MODEL_NAME])
+                    # A cached response skips the OpenAI API call, but its SQL is run again on the current data
+                    response = llm_cache.get(key)
+                    cached = response is not None
+                    if not cached:
+                        response = self.query_openai(session.message, data_schema_dict)
                     if 'sql' in response:
-                        df = self.databot.get_df(session)
-                        answer = sqldf(response['sql'])
+                        answer = self.databot.query_untrusted_sql(session, response['sql'])
                         if answer is not None:
                             self.databot.reply_dataframe(session, answer, response['title'], response['sql'])
                     session.reply(f'{AI_ICON} ' + response['answer'])
+                    if not cached:
+                        # Only responses that could be answered are cached
+                        llm_cache.put(key, response)
                 except openai.AuthenticationError as e:
                     session.reply(self.databot.messages['openai_authentication_error'])
                 except Exception as e:
@@ -55,7 +63,7 @@ class LLMQuery:
                     "content": f"""
                     You are a helpful assistant, part of an intent-based chatbot created to answer questions about a 
                     dataset. Your task is to help answering questions the chatbot was not able to identify their intent.
-                    You must provide a syntactically correct SQL statement to retrieve the answer to the user question 
+                    You must provide a syntactically correct DuckDB SQL statement to retrieve the answer to the user question 
                     from the data (the table is called 'df', so use 'FROM df...' in the SQL query).
                     Remember to use column names and values that are present in the data.
                     Do not invent the query parameters. You can guess 
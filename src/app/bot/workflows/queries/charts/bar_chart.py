@@ -16,9 +16,9 @@ class BarChart(AbstractQueryWorkflow):
 
     def answer(self, session: Session) -> None:
         predicted_intent: IntentClassifierPrediction = session.predicted_intent
-        df = self.databot.get_df(session)
         field_x = predicted_intent.get_parameter(session_keys.FIELD_X).value
         field_y = predicted_intent.get_parameter(session_keys.FIELD_Y).value
+        df = self.databot.get_group_sums(session, field_x, field_y)
         title = f'Bar chart of {field_y} grouped by {field_x}'
         fig = px.bar(df, x=field_x, y=field_y, title=title)
         self.databot.reply(session, df, title, 'plot_message')
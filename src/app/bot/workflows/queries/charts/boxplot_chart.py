@@ -1,9 +1,12 @@
 import plotly.express as px
+import plotly.graph_objects as go
 from besser.bot.core.session import Session
 from besser.bot.nlp.intent_classifier.intent_classifier_prediction import IntentClassifierPrediction
 
 from src.app.bot.library import session_keys
+from src.app.bot.workflows.queries.charts.chart_data import reduce_box_data
 from src.app.bot.workflows.abstract_query_workflow import AbstractQueryWorkflow
+from src.utils.session_state_keys import CHART_MAX_POINTS
 
 
 class BoxplotChart(AbstractQueryWorkflow):
@@ -15,9 +18,28 @@ class BoxplotChart(AbstractQueryWorkflow):
 
     def answer(self, session: Session) -> None:
         predicted_intent: IntentClassifierPrediction = session.predicted_intent
-        df = self.databot.get_df(session)
         field = predicted_intent.get_parameter(session_keys.FIELD).value
         title = f'Boxplot of {field}'
-        fig = px.box(df, y=field, title=title)
-        self.databot.reply(session, df, title, 'plot_message')
+        box = self.databot.get_box_statistics(session, field)
+        if box is None:
+            # Plotly computes the box from the values (e.g. of a datetime field), so only a few of them are sent
+            max_points = self.databot.project.app.properties[CHART_MAX_POINTS]
+            df, num_rows = self.databot.get_chart_df(session, [field], max_points)
+            fig = px.box(reduce_box_data(df, field, max_points), y=field, title=title)
+        else:
+            num_rows = self.databot.count_rows(session)
+            # Only the summary statistics (and the outliers) are sent to the browser, not every value
+            fig = go.Figure(go.Box(
+                name=field,
+                y=[box['outliers']],
+                q1=[box['q1']],
+                median=[box['median']],
+                q3=[box['q3']],
+                mean=[box['mean']],
+                lowerfence=[box['lowerfence']],
+                upperfence=[box['upperfence']],
+                boxpoints='outliers',
+            ))
+            fig.update_layout(title=title, yaxis_title=field)
+        self.databot.reply_num_rows(session, num_rows, title, 'plot_message')
         self.platform.reply_plotly(session, fig)
@@ -0,0 +1,301 @@
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+SCATTER_GRID_SIZE = 64
+"""int: Number of bins of each axis of the grid used to sample scatter plots."""
+
+HISTOGRAM_MAX_BINS = 100
+"""int: Maximum number of bins of a histogram of a numeric or datetime field."""
+
+
+def to_float(column: pd.Series) -> np.ndarray:
+    """Get the values of a numeric or datetime column as floats (datetimes as nanoseconds since epoch)."""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+    return column.to_numpy(dtype=np.float64)
+
+
+def is_continuous(column: pd.Series) -> bool:
+    """Check if a column is numeric or datetime (i.e. it can be used as a continuous chart axis)."""
+    return is_numeric(column) or pd.api.types.is_datetime64_any_dtype(column)
+
+
+def is_numeric(column: pd.Series) -> bool:
+    """Check if a column is numeric (and not boolean)."""
+    return pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, num_points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling of a line: select the points that keep the visual shape of the
+    line, i.e. in each bucket, the point forming the largest triangle with the previously selected point and the
+    average of the next bucket.
+
+    Args:
+        x (numpy.ndarray): the x values, sorted
+        y (numpy.ndarray): the y values
+        num_points (int): the number of points to select
+
+    Returns:
+        numpy.ndarray: the positions of the selected points, sorted
+    """
+    n = len(x)
+    if num_points >= n:
+        return np.arange(n)
+    if num_points < 3:
+        # Not enough points for a bucket between the first and last points
+        return np.unique(np.linspace(0, n - 1, num_points).astype(np.intp))
+    # The first and last points are always selected, the rest of the points are split into num_points - 2 buckets
+    edges = np.linspace(1, n - 1, num_points - 1).astype(np.intp)
+    selected = np.empty(num_points, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(num_points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i == num_points - 3:
+            next_x, next_y = x[n - 1], y[n - 1]
+        else:
+            next_x, next_y = x[end:edges[i + 2]].mean(), y[end:edges[i + 2]].mean()
+        areas = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def min_max_buckets(y: np.ndarray, num_points: int) -> np.ndarray:
+    """Downsample a line by splitting it into buckets and selecting the minimum and maximum point of each one.
+
+    Args:
+        y (numpy.ndarray): the y values
+        num_points (int): the (maximum) number of points to select
+
+    Returns:
+        numpy.ndarray: the positions of the selected points, sorted
+    """
+    n = len(y)
+    if num_points >= n:
+        return np.arange(n)
+    if num_points < 2:
+        return np.arange(min(num_points, n))
+    num_buckets = num_points // 2
+    edges = np.linspace(0, n, num_buckets + 1).astype(np.intp)
+    selected = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if start < end:
+            selected.append(start + np.argmin(y[start:end]))
+            selected.append(start + np.argmax(y[start:end]))
+    return np.unique(selected)
+
+
+def get_axis_bins(column: pd.Series, num_bins: int) -> np.ndarray:
+    """Get the bin of each value of a chart axis: equal-width bins for continuous columns, or one bin per value for
+    the rest."""
+    if is_continuous(column):
+        values = to_float(column)
+        low, high = np.nanmin(values), np.nanmax(values)
+        if high == low:
+            return np.zeros(len(values), dtype=np.int64)
+        return np.minimum(((values - low) / (high - low) * num_bins).astype(np.int64), num_bins - 1)
+    return pd.factorize(column)[0].astype(np.int64)
+
+
+def stratified_sample(df: DataFrame, x: str, y: str, num_points: int, seed: int = 0) -> np.ndarray:
+    """Sample the points of a scatter plot keeping its density: the plot is split into a grid (with at most one cell
+    per point of the budget) and each grid cell keeps a proportional share of its points. The cells whose share
+    rounds down to 0 keep 1 point while the budget allows it, so that isolated points and outliers are not lost.
+
+    Args:
+        df (pandas.DataFrame): the data
+        x (str): the x column
+        y (str): the y column
+        num_points (int): the maximum number of points to select
+        seed (int): the seed of the random sampling, so the same data always gives the same plot
+
+    Returns:
+        numpy.ndarray: the positions of the selected points, sorted
+    """
+    n = len(df)
+    if num_points >= n:
+        return np.arange(n)
+    rng = np.random.default_rng(seed)
+    grid_size = min(SCATTER_GRID_SIZE, max(1, int(np.sqrt(num_points))))
+    bins_x = get_axis_bins(df[x], grid_size)
+    bins_y = get_axis_bins(df[y], grid_size)
+    cells = bins_x * (bins_y.max() + 1) + bins_y
+    # Shuffle the points within each cell, then keep the first ones of each cell
+    order = np.lexsort((rng.random(n), cells))
+    sorted_cells = cells[order]
+    cell_values, cell_starts, cell_counts = np.unique(sorted_cells, return_index=True, return_counts=True)
+    shares = cell_counts * num_points / n
+    quotas = np.floor(shares).astype(np.int64)
+    remaining = num_points - int(quotas.sum())
+    # Non-categorical axes can have more cells than the budget: then only some of the cells without points keep one
+    empty = np.flatnonzero(quotas == 0)
+    if len(empty) > remaining:
+        empty = rng.choice(empty, remaining, replace=False)
+    quotas[empty] = 1
+    remaining -= len(empty)
+    if remaining > 0:
+        # The rest of the budget goes to the cells with the largest remainders (largest remainder method)
+        remainders = shares - quotas
+        largest = np.argsort(-remainders, kind='stable')[:remaining]
+        quotas[largest[remainders[largest] > 0]] += 1
+    cell_index = np.repeat(np.arange(len(cell_values)), cell_counts)
+    ranks = np.arange(n) - cell_starts[cell_index]
+    return np.sort(order[ranks < quotas[cell_index]])
+
+
+def reduce_line_data(df: DataFrame, x: str, y: str, max_points: int) -> DataFrame:
+    """Reduce the number of points of a line (or area) chart to a point budget, keeping its visual shape.
+
+    Lines with a continuous x axis are sorted by x and downsampled with LTTB. Otherwise, if y is numeric, the minimum
+    and maximum of each bucket of points are kept, and if not, the points are sampled uniformly.
+
+    Args:
+        df (pandas.DataFrame): the chart data
+        x (str): the x column
+        y (str): the y column
+        max_points (int): the maximum number of points
+
+    Returns:
+        pandas.DataFrame: the reduced chart data (df itself if it has no more than max_points rows)
+    """
+    if len(df) <= max_points:
+        return df
+    df = df.dropna(subset=list(dict.fromkeys([x, y])))
+    if len(df) <= max_points:
+        return df
+    if is_continuous(df[x]) and is_continuous(df[y]):
+        df = df.sort_values(x, kind='stable')
+        return df.iloc[lttb(to_float(df[x]), to_float(df[y]), max_points)]
+    if is_continuous(df[y]):
+        return df.iloc[min_max_buckets(to_float(df[y]), max_points)]
+    return df.iloc[np.linspace(0, len(df) - 1, max_points).astype(np.intp)]
+
+
+def reduce_scatter_data(df: DataFrame, x: str, y: str, max_points: int) -> DataFrame:
+    """Reduce the number of points of a scatter plot to a point budget with a stratified sampling (see
+    :func:`stratified_sample`).
+
+    Args:
+        df (pandas.DataFrame): the chart data
+        x (str): the x column
+        y (str): the y column
+        max_points (int): the maximum number of points
+
+    Returns:
+        pandas.DataFrame: the reduced chart data (df itself if it has no more than max_points rows)
+    """
+    if len(df) <= max_points:
+        return df
+    df = df.dropna(subset=list(dict.fromkeys([x, y])))
+    if len(df) <= max_points:
+        return df
+    return df.iloc[stratified_sample(df, x, y, max_points)]
+
+
+def reduce_box_data(df: DataFrame, y: str, max_points: int) -> DataFrame:
+    """Reduce the values of a box plot computed by Plotly (i.e. of a field without precomputed box statistics, like a
+    datetime field) to a point budget: the sorted values at evenly spaced ranks, which keep the minimum, the maximum
+    and, approximately, the quartiles.
+
+    Args:
+        df (pandas.DataFrame): the chart data
+        y (str): the y column
+        max_points (int): the maximum number of points
+
+    Returns:
+        pandas.DataFrame: the reduced chart data (df itself if it has no more than max_points rows)
+    """
+    if len(df) <= max_points:
+        return df
+    df = df[[y]].dropna()
+    if len(df) <= max_points:
+        return df
+    df = df.sort_values(y, kind='stable')
+    return df.iloc[np.linspace(0, len(df) - 1, max_points).astype(np.intp)]
+
+
+def get_reduced_title(title: str, num_points: int, num_reduced_points: int) -> str:
+    """Add a note to a chart title when its data has been reduced."""
+    if num_reduced_points < num_points:
+        return f'{title} (showing {num_reduced_points:,} of {num_points:,} points)'
+    return title
+
+
+def aggregate_sum(df: DataFrame, group_field: str, value_field: str) -> DataFrame:
+    """Sum the values of a field grouped by another field, so that a chart draws one element per group instead of one
+    per row.
+
+    Args:
+        df (pandas.DataFrame): the chart data
+        group_field (str): the field to group by
+        value_field (str): the field to sum
+
+    Returns:
+        pandas.DataFrame: one row per group (in order of appearance) with the group and the sum of its values, or df
+        itself if it cannot be aggregated (the value field is not numeric or it is the group field)
+    """
+    if group_field == value_field or not is_numeric(df[value_field]):
+        return df
+    return df.groupby(group_field, sort=False, observed=True)[value_field].sum().reset_index()
+
+
+def get_histogram_bin_edges(low: float, high: float, num_values: int, iqr: float) -> np.ndarray:
+    """Get the bin edges of a histogram from a summary of its values, like numpy.histogram_bin_edges with
+    bins='auto' (the smallest bin width of the Sturges and Freedman-Diaconis estimators), but without the values
+    themselves. Used when the values are counted by the SQL engine (see
+    :meth:`src.app.bot.databot.DataBot.get_histogram`).
+
+    Args:
+        low (float): the minimum value
+        high (float): the maximum value
+        num_values (int): the number of values
+        iqr (float): the interquartile range of the values
+
+    Returns:
+        numpy.ndarray: the bin edges (at most :data:`HISTOGRAM_MAX_BINS` bins)
+    """
+    if high == low:
+        return np.array([low - 0.5, high + 0.5])
+    width = (high - low) / (np.log2(num_values) + 1)
+    if iqr > 0:
+        width = min(width, 2 * iqr * num_values ** (-1 / 3))
+    num_bins = min(max(int(np.ceil((high - low) / width)), 1), HISTOGRAM_MAX_BINS)
+    return np.linspace(low, high, num_bins + 1)
+
+
+def get_histogram_data(column: pd.Series) -> tuple[DataFrame, np.ndarray or None]:
+    """Count the values of a histogram.
+
+    Numeric and datetime columns are split into (at most :data:`HISTOGRAM_MAX_BINS`) equal-width bins, while the rest
+    of the columns get one bin per value, in order of appearance.
+
+    Args:
+        column (pandas.Series): the histogram data
+
+    Returns:
+        tuple[pandas.DataFrame, numpy.ndarray or None]: the bins (their center or value, and their count) and the
+        width of each bin (in the units of the chart axis, i.e. milliseconds for datetimes), or None for value bins
+    """
+    count_column = 'count' if column.name != 'count' else 'number of rows'
+    if not is_continuous(column):
+        counts = column.value_counts(sort=False)
+        counts = counts[counts > 0]
+        return DataFrame({column.name: counts.index, count_column: counts.to_numpy()}), None
+    values = to_float(column.dropna())
+    if len(values) == 0:
+        return DataFrame({column.name: column.iloc[:0], count_column: np.array([], dtype=np.int64)}), None
+    edges = np.histogram_bin_edges(values, bins='auto')
+    if len(edges) > HISTOGRAM_MAX_BINS + 1:
+        edges = np.histogram_bin_edges(values, bins=HISTOGRAM_MAX_BINS)
+    counts, edges = np.histogram(values, bins=edges)
+    centers = (edges[:-1] + edges[1:]) / 2
+    widths = np.diff(edges)
+    if pd.api.types.is_datetime64_any_dtype(column):
+        centers = pd.to_datetime(centers.astype(np.int64), utc=column.dt.tz is not None)
+        if column.dt.tz is not None:
+            centers = centers.tz_convert(column.dt.tz)
+        widths = widths / 1e6
+    return DataFrame({column.name: centers, count_column: counts}), widths
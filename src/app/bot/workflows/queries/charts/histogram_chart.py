@@ -15,9 +15,12 @@ class HistogramChart(AbstractQueryWorkflow):
 
     def answer(self, session: Session) -> None:
         predicted_intent: IntentClassifierPrediction = session.predicted_intent
-        df = self.databot.get_df(session)
         field = predicted_intent.get_parameter(session_keys.FIELD).value
         title = f'Histogram of {field}'
-        fig = px.histogram(df, x=field, title=title)
-        self.databot.reply(session, df, title, 'plot_message')
+        histogram_df, widths = self.databot.get_histogram(session, field)
+        fig = px.bar(histogram_df, x=field, y=histogram_df.columns[1], title=title)
+        if widths is not None:
+            fig.update_traces(width=widths)
+            fig.update_layout(bargap=0)
+        self.databot.reply(session, histogram_df, title, 'plot_message')
         self.platform.reply_plotly(session, fig)
@@ -16,9 +16,9 @@ class PieChart(AbstractQueryWorkflow):
 
     def answer(self, session: Session) -> None:
         predicted_intent: IntentClassifierPrediction = session.predicted_intent
-        df = self.databot.get_df(session)
         field_x = predicted_intent.get_parameter(session_keys.FIELD_X).value
         field_y = predicted_intent.get_parameter(session_keys.FIELD_Y).value
+        df = self.databot.get_group_sums(session, field_y, field_x)
         title = f'Pie chart of {field_x} grouped by {field_y}'
         fig = px.pie(df, values=field_x, names=field_y, title=title)
         self.databot.reply(session, df, title, 'plot_message')
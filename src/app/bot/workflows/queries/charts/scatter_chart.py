@@ -4,6 +4,8 @@ from besser.bot.nlp.intent_classifier.intent_classifier_prediction import Intent
 
 from src.app.bot.library import session_keys
 from src.app.bot.workflows.abstract_query_workflow import AbstractQueryWorkflow
+from src.app.bot.workflows.queries.charts.chart_data import get_reduced_title, reduce_scatter_data
+from src.utils.session_state_keys import CHART_MAX_POINTS
 
 
 class ScatterChart(AbstractQueryWorkflow):
@@ -16,10 +18,12 @@ class ScatterChart(AbstractQueryWorkflow):
 
     def answer(self, session: Session) -> None:
         predicted_intent: IntentClassifierPrediction = session.predicted_intent
-        df = self.databot.get_df(session)
         field_x = predicted_intent.get_parameter(session_keys.FIELD_X).value
         field_y = predicted_intent.get_parameter(session_keys.FIELD_Y).value
+        max_points = self.databot.project.app.properties[CHART_MAX_POINTS]
+        df, num_points = self.databot.get_chart_df(session, [field_x, field_y], max_points)
         title = f'Scatter plot of {field_x} against {field_y}'
-        fig = px.scatter(df, x=field_x, y=field_y, title=title)
+        chart_df = reduce_scatter_data(df, field_x, field_y, max_points)
+        fig = px.scatter(chart_df, x=field_x, y=field_y, title=get_reduced_title(title, num_points, len(chart_df)))
         self.databot.reply(session, df, title, 'plot_message')
         self.platform.reply_plotly(session, fig)
@@ -15,8 +15,8 @@ class FieldDistinct(AbstractQueryWorkflow):
 
     def answer(self, session: Session) -> None:
         predicted_intent: IntentClassifierPrediction = session.predicted_intent
-        df = self.databot.get_df(session)
         field = predicted_intent.get_parameter(session_keys.FIELD).value
-        answer = pd.DataFrame(df[field].unique(), columns=[field])
+        distinct = self.databot.get_distinct_values(session, field)
+        answer = pd.DataFrame(distinct, columns=[field])
         self.platform.reply(session, self.databot.messages['field_distinct'].format(len(answer), field))
         self.databot.reply_dataframe(session, answer, f"Unique values of field '{field}'")
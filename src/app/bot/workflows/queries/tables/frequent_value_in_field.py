@@ -15,9 +15,8 @@ class FrequentValueInField(AbstractQueryWorkflow):
 
     def answer(self, session: Session) -> None:
         predicted_intent: IntentClassifierPrediction = session.predicted_intent
-        df = self.databot.get_df(session)
         field = predicted_intent.get_parameter(session_keys.FIELD).value
-        value_counts = df[field].value_counts()
+        value_counts = self.databot.get_value_counts(session, field)
         if predicted_intent.intent == self.databot.intents.most_frequent_value_in_field:
             message_key = 'most_frequent_value_in_field'
             target_value = value_counts.idxmax()
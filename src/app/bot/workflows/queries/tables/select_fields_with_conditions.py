@@ -155,7 +155,6 @@ class SelectFieldsWithConditions(AbstractQueryWorkflow):
 
     def answer(self, session: Session) -> None:
         predicted_intent: IntentClassifierPrediction = session.predicted_intent
-        df = self.databot.get_df(session)
         number = predicted_intent.get_parameter(session_keys.NUMBER).value
         field1 = predicted_intent.get_parameter(session_keys.FIELD + '1').value
         operator = predicted_intent.get_parameter(session_keys.OPERATOR).value
@@ -167,16 +166,16 @@ class SelectFieldsWithConditions(AbstractQueryWorkflow):
         key_fields = [field.original_name for field in self.databot.key_fields]
         if not key_fields:
             key_fields = [field.original_name for field in self.databot.project.data_schema.field_schemas]
-
         title = ''
         if not operator:
             # SELECT fields WHERE conditions
             select_fields = self.get_select_fields(key_fields, value_field_map, target_field, None)
             for v, f in value_field_map.items():
-                df = df[df[f] == v]
                 title += f', {f} = {v}'
             title = title[2:]
-            df = df[select_fields]
+            # Only the columns involved in the query are selected from the project data, and the value conditions are
+            # resolved with the field indexes (also by get_top_df, below)
+            df = self.databot.get_df(session, columns=select_fields, value_field_map=value_field_map)
 
         elif max_min_oldest_newest(operator):
             # SELECT fields, MAX(operatorField) WHERE conditions
@@ -185,31 +184,30 @@ class SelectFieldsWithConditions(AbstractQueryWorkflow):
             operator = datetime_operator_to_numeric_operator(operator)
             number = get_number_or_default(number)
             for v, f in value_field_map.items():
-                df = df[df[f] == v]
                 title += f', {f} = {v}'
             if operator == MAX:
-                df = df.nlargest(number, operator_field, keep='all')
+                df = self.databot.get_top_df(session, operator_field, number, True, select_fields, value_field_map)
                 title = f'highest {operator_field}' + title
             elif operator == MIN:
-                df = df.nsmallest(number, operator_field, keep='all')
+                df = self.databot.get_top_df(session, operator_field, number, False, select_fields, value_field_map)
                 title = f'lowest {operator_field}' + title
             if number > 1:
                 title = f'Top {number} ' + title
-            df = df[select_fields]
 
         else:
             # Other operators (AVG, SUM)
             # SELECT AVG(operatorField) WHERE conditions
             answer = pd.DataFrame()
             for v, f in value_field_map.items():
-                df = df[df[f] == v]
                 answer[f] = [v]
                 title += f', {f} = {v}'
             if operator == AVG:
-                answer[f'Average {operator_field}'] = [df[operator_field].mean()]
+                answer[f'Average {operator_field}'] = [self.databot.get_aggregate(session, operator_field, 'mean',
+                                                                                  value_field_map)]
                 title = f'Average {operator_field}' + title
             elif operator == SUM:
-                answer[f'Total {operator_field}'] = [df[operator_field].sum()]
+                answer[f'Total {operator_field}'] = [self.databot.get_aggregate(session, operator_field, 'sum',
+                                                                                value_field_map)]
                 title = f'Total {operator_field}' + title
             df = answer
 
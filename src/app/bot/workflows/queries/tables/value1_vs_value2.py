@@ -16,13 +16,12 @@ class Value1VSValue2(AbstractQueryWorkflow):
 
     def answer(self, session: Session) -> None:
         predicted_intent: IntentClassifierPrediction = session.predicted_intent
-        df = self.databot.get_df(session)
         value1 = predicted_intent.get_parameter(session_keys.VALUE + '1').value
         value2 = predicted_intent.get_parameter(session_keys.VALUE + '2').value
         field1 = self.databot.field_value_map[value1]
         field2 = self.databot.field_value_map[value2]
-        count_value1 = len(df[df[field1] == value1])
-        count_value2 = len(df[df[field2] == value2])
+        count_value1 = self.databot.count_rows(session, {value1: field1})
+        count_value2 = self.databot.count_rows(session, {value2: field2})
         message_key = 'value1_more_than_value2'
         if count_value2 > count_value1:
             max_value = value2
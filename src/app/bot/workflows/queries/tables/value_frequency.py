@@ -14,9 +14,8 @@ class ValueFrequency(AbstractQueryWorkflow):
 
     def answer(self, session: Session) -> None:
         predicted_intent: IntentClassifierPrediction = session.predicted_intent
-        df = self.databot.get_df(session)
         value = predicted_intent.get_parameter(session_keys.VALUE).value
         field = self.databot.field_value_map[value]
-        answer = df[df[field] == value]
+        answer = self.databot.get_df(session, value_field_map={value: field})
         self.platform.reply(session, self.databot.messages['value_frequency'].format(len(answer), field, value))
         self.databot.reply_dataframe(session, answer, f"Records with {field} = '{value}'")
@@ -0,0 +1,130 @@
+import hashlib
+from io import StringIO
+
+import requests
+from pandas import DataFrame
+
+from src.utils.csv_loader import read_csv
+from src.utils.download import download_if_modified
+from src.utils.encoding_detection import decode, detect_encoding
+
+# Results of a data source refresh (see src.app.project.Project.refresh_from_source)
+SOURCE_UNCHANGED = 'unchanged'
+SOURCE_APPENDED = 'appended'
+SOURCE_REPLACED = 'replaced'
+
+
+class DataSource:
+    """Remote CSV file a project was created from (e.g. a file URL or the CSV file of an Open Data package), to
+    refresh the project data when the file changes (see :meth:`src.app.project.Project.refresh_from_source`).
+
+    The file is downloaded with conditional requests (with the validators of the last download), so an unchanged
+    file is not downloaded again. The size and hash of the last downloaded content are kept to detect if a changed
+    file only had new rows appended to it, so only these rows are read.
+
+    Args:
+        url (str): the file URL
+        delimiter (str): the CSV delimiter
+        encoding (str): the file encoding, or None to detect it when the file is downloaded
+
+    Attributes:
+        url (str): the file URL
+        delimiter (str): the CSV delimiter
+        encoding (str or None): the file encoding
+        etag (str or None): the ETag header of the last download
+        last_modified (str or None): the Last-Modified header of the last download
+        size (int): the size (in bytes) of the last downloaded content
+        digest (str or None): the SHA-256 hash of the last downloaded content
+        ends_with_newline (bool): whether the last downloaded content ended with a line break (otherwise, its last
+            row could be continued by the appended content)
+    """
+
+    def __init__(self, url: str, delimiter: str = ',', encoding: str = None):
+        self.url: str = url
+        self.delimiter: str = delimiter
+        self.encoding: str or None = encoding
+        self.etag: str or None = None
+        self.last_modified: str or None = None
+        self.size: int = 0
+        self.digest: str or None = None
+        self.ends_with_newline: bool = False
+
+    def download(self, http_session: requests.Session = None) -> tuple[bytes or None, dict[str, str or None]]:
+        """Download the file, if it changed since it was last downloaded.
+
+        The new content and validators are not recorded until the content is read into the project (see
+        :meth:`update`), so a failed refresh is retried with the next one.
+
+        Args:
+            http_session (requests.Session): the HTTP session to use, or None to create one
+
+        Returns:
+            tuple[bytes or None, dict[str, str or None]]: the file content (None if it did not change) and its
+            validators (see :func:`~src.utils.download.download_if_modified`)
+
+        Raises:
+            requests.RequestException: if the request fails
+            src.utils.download.DownloadTooLargeError: if the file is too large
+        """
+        content, validators = download_if_modified(self.url, self.etag, self.last_modified, http_session)
+        if content is not None and len(content) == self.size and hashlib.sha256(content).hexdigest() == self.digest:
+            # The server does not support conditional requests, or the file was rewritten with the same content
+            content = None
+        if content is None:
+            self.etag = validators['etag']
+            self.last_modified = validators['last_modified']
+        return content, validators
+
+    def update(self, content: bytes, validators: dict[str, str or None]) -> None:
+        """Record the content of the file that was read into the project, and the validators it was downloaded with
+        (see :meth:`download`)."""
+        self.etag = validators['etag']
+        self.last_modified = validators['last_modified']
+        self.size = len(content)
+        self.digest = hashlib.sha256(content).hexdigest()
+        self.ends_with_newline = content.endswith(b'\n')
+
+    def is_append(self, content: bytes) -> bool:
+        """Check if a new content of the file only has rows appended to the last recorded content (i.e. it starts
+        with it)."""
+        return self.digest is not None and self.ends_with_newline and len(content) > self.size \
+            and hashlib.sha256(content[:self.size]).hexdigest() == self.digest
+
+    def read(self, content: bytes) -> tuple[DataFrame, int]:
+        """Read the content of the file (see :func:`~src.utils.csv_loader.read_csv`). If the encoding of the source
+        is unknown, it is detected from the content. If the content is not valid in it, the fallback encoding is
+        used from then on (see :func:`~src.utils.encoding_detection.decode`)."""
+        if self.encoding is None:
+            self.encoding = detect_encoding(content)
+        text, self.encoding = decode(content, self.encoding)
+        return read_csv(StringIO(text), delimiter=self.delimiter)
+
+    def read_appended_rows(self, content: bytes) -> tuple[DataFrame, int]:
+        """Read only the rows appended to the last recorded content of the file (see :meth:`is_append`), i.e. the
+        header line followed by the new bytes."""
+        header_end = content.find(b'\n') + 1
+        return self.read(content[:header_end] + content[self.size:])
+
+    def get_state(self) -> dict:
+        """Get the data source metadata, to store it (see :meth:`from_state`)."""
+        return {
+            'url': self.url,
+            'delimiter': self.delimiter,
+            'encoding': self.encoding,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'size': self.size,
+            'digest': self.digest,
+            'ends_with_newline': self.ends_with_newline,
+        }
+
+    @staticmethod
+    def from_state(state: dict) -> 'DataSource':
+        """Create a data source from its stored metadata (see :meth:`get_state`)."""
+        source = DataSource(state['url'], state['delimiter'], state['encoding'])
+        source.etag = state['etag']
+        source.last_modified = state['last_modified']
+        source.size = state['size']
+        source.digest = state['digest']
+        source.ends_with_newline = state['ends_with_newline']
+        return source
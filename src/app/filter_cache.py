@@ -0,0 +1,123 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+from pandas import DataFrame
+
+FILTER_CACHE_MAX_SIZE = 256 * 1024 * 1024
+"""int: Maximum size, in bytes, of all the row selections stored in the filter cache."""
+
+
+def compact_rows(mask: np.ndarray) -> np.ndarray:
+    """Get the smallest representation of a row selection: the boolean mask itself (1 byte per row) or the positions
+    of the selected rows (8 bytes per selected row), for very selective filters.
+
+    Args:
+        mask (numpy.ndarray): the boolean row mask
+
+    Returns:
+        numpy.ndarray: the boolean row mask or the sorted row positions
+    """
+    count = np.count_nonzero(mask)
+    if count * np.dtype(np.intp).itemsize < mask.nbytes:
+        return np.flatnonzero(mask)
+    return mask
+
+
+def select_rows(df: DataFrame, rows: np.ndarray) -> DataFrame:
+    """Select the rows of a DataFrame given a boolean row mask or the row positions."""
+    if rows.dtype == bool:
+        return df[rows]
+    return df.iloc[rows]
+
+
+def intersect_rows(rows: np.ndarray or None, positions: np.ndarray) -> np.ndarray:
+    """Intersect a row selection with a set of sorted row positions.
+
+    Args:
+        rows (numpy.ndarray or None): the boolean row mask or the sorted row positions, or None to select all rows
+        positions (numpy.ndarray): the sorted row positions
+
+    Returns:
+        numpy.ndarray: the sorted positions of the rows in both selections
+    """
+    if rows is None:
+        return positions
+    if rows.dtype == bool:
+        return positions[rows[positions]]
+    return np.intersect1d(rows, positions, assume_unique=True)
+
+
+def count_selected_rows(rows: np.ndarray or None, num_rows: int) -> int:
+    """Get the number of rows in a row selection (None selects all the num_rows rows)."""
+    if rows is None:
+        return num_rows
+    if rows.dtype == bool:
+        return int(np.count_nonzero(rows))
+    return len(rows)
+
+
+class FilterCache:
+    """Cache of the rows selected by the filters of the bot sessions, so the filters are not evaluated again on every
+    message if they have not changed.
+
+    Each session has 1 entry, identified by the canonical form of its filters (see :meth:`Filter.get_key`) and the
+    DataFrame they were evaluated on. When the cache exceeds its maximum size, the least recently used entries (of
+    any session and project) are evicted.
+
+    Args:
+        max_size (int): the maximum size of the cache, in bytes
+
+    Attributes:
+        max_size (int): the maximum size of the cache, in bytes
+        size (int): the current size of the cache, in bytes
+        _entries (OrderedDict[str, tuple]): the cache entries, in least recently used order. For each session id,
+            the filters key, a weak reference to the filtered DataFrame and the selected rows
+        _lock (threading.Lock): the lock to access the cache from the different bot sessions
+    """
+
+    def __init__(self, max_size: int = FILTER_CACHE_MAX_SIZE):
+        self.max_size: int = max_size
+        self.size: int = 0
+        self._entries: OrderedDict[str, tuple[frozenset, weakref.ref, np.ndarray]] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, session_id: str, key: frozenset, df: DataFrame) -> np.ndarray or None:
+        """Get the rows selected by the filters of a session, or None if they are not cached."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            entry_key, entry_df, rows = entry
+            if entry_key != key or entry_df() is not df:
+                return None
+            self._entries.move_to_end(session_id)
+            return rows
+
+    def put(self, session_id: str, key: frozenset, df: DataFrame, rows: np.ndarray) -> None:
+        """Store the rows selected by the filters of a session, replacing the previous ones."""
+        with self._lock:
+            self._remove(session_id)
+            if rows.nbytes > self.max_size:
+                return
+            self._entries[session_id] = (key, weakref.ref(df), rows)
+            self.size += rows.nbytes
+            while self.size > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, session_id: str) -> None:
+        """Remove the entry of a session. Must be called when the session filters change."""
+        with self._lock:
+            self._remove(session_id)
+
+    def clear(self) -> None:
+        """Remove all the entries."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self.size -= entry[2].nbytes
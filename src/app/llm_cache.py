@@ -0,0 +1,165 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+LLM_CACHE_MAX_ENTRIES = 1000
+"""int: Maximum number of LLM responses stored in the LLM cache."""
+
+LLM_CACHE_TTL = 7 * 24 * 3600
+"""int: Time, in seconds, an LLM response is kept in the LLM cache."""
+
+LLM_CACHE_COMPACTION_RATIO = 2
+"""int: The LLM cache file is rewritten with only the current entries when it has this many times more lines than
+entries (each stored response is appended to it)."""
+
+
+def normalize_message(message: str) -> str:
+    """Normalize a user message so that trivial variations of the same question (case, spacing, final punctuation)
+    share the same cache entry."""
+    return ' '.join(message.lower().split()).strip(' ?!.')
+
+
+class LLMCache:
+    """Cache of the LLM responses (title, sql and answer) to the user questions the bots could not answer.
+
+    Entries are identified by the normalized user message, the data schema sent to the LLM and the LLM name, so that a
+    response is only reused for the same question about the same data schema. Entries expire after a TTL, the least
+    recently used entries are evicted when the cache is full, and the cache can be persisted in a file.
+
+    The file is a JSON Lines log: each stored response is appended to it as a line, instead of writing the whole cache
+    again, and the file is only rewritten (with the current entries) when it grows too large (see
+    :data:`LLM_CACHE_COMPACTION_RATIO`) or the cache is cleared.
+
+    Args:
+        max_entries (int): the maximum number of entries
+        ttl (int): the time, in seconds, an entry is valid
+        path (str or None): the file where the cache is persisted, or None to keep it only in memory
+
+    Attributes:
+        max_entries (int): the maximum number of entries
+        ttl (int): the time, in seconds, an entry is valid
+        path (str or None): the file where the cache is persisted, or None to keep it only in memory
+        _entries (OrderedDict[str, tuple[float, dict]]): for each key, the entry creation time and the LLM response,
+            in least recently used order
+        _num_lines (int): the number of lines of the cache file
+        _lock (threading.Lock): the lock to access the cache from the different bot sessions
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl: int = LLM_CACHE_TTL, path: str = None):
+        self.max_entries: int = max_entries
+        self.ttl: int = ttl
+        self.path: str or None = path
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._num_lines: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        if self.path and os.path.exists(self.path):
+            self._load()
+
+    @staticmethod
+    def get_key(message: str, data_schema: dict, model: str) -> str:
+        """Get the cache key of a user message.
+
+        Args:
+            message (str): the user message
+            data_schema (dict): the data schema sent to the LLM
+            model (str): the LLM name
+
+        Returns:
+            str: the cache key
+        """
+        data_schema_hash = hashlib.sha256(json.dumps(data_schema, sort_keys=True, default=str).encode()).hexdigest()
+        return hashlib.sha256(f'{model}\n{data_schema_hash}\n{normalize_message(message)}'.encode()).hexdigest()
+
+    def get(self, key: str) -> dict or None:
+        """Get a cached LLM response, or None if there is no valid entry for the key."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, response: dict) -> None:
+        """Store an LLM response."""
+        with self._lock:
+            created = time.time()
+            self._entries[key] = (created, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.path:
+                if self._num_lines >= LLM_CACHE_COMPACTION_RATIO * self.max_entries:
+                    self._save()
+                else:
+                    self._append(key, created, response)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self.path:
+                self._save()
+
+    def set_path(self, path: str or None) -> None:
+        """Change the file where the cache is persisted (e.g. from the app settings). The entries of the new file are
+        loaded, and the file is rewritten with them and the entries already in memory.
+
+        Args:
+            path (str or None): the file where the cache is persisted, or None to keep it only in memory
+        """
+        with self._lock:
+            if path == self.path:
+                return
+            self.path = path
+            if self.path:
+                if os.path.exists(self.path):
+                    self._load()
+                self._save()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                lines = file.readlines()
+        except OSError as e:
+            logging.warning(f'The LLM cache could not be loaded from {self.path}: {e}')
+            return
+        now = time.time()
+        for line in lines:
+            try:
+                key, created, response = json.loads(line)
+            except (ValueError, TypeError):
+                # E.g. a line left half-written
+                continue
+            if now - created <= self.ttl and created >= self._entries.get(key, (0,))[0]:
+                self._entries[key] = (created, response)
+        # Least recently used order, as far as the file tells (i.e. by creation time)
+        self._entries = OrderedDict(sorted(self._entries.items(), key=lambda item: item[1][0]))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._num_lines = len(lines)
+
+    def _append(self, key: str, created: float, response: dict) -> None:
+        try:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps([key, created, response]) + '\n')
+            self._num_lines += 1
+        except OSError as e:
+            logging.warning(f'The LLM cache could not be saved in {self.path}: {e}')
+
+    def _save(self) -> None:
+        # Write a temporary file first, so the cache file is never left half-written
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                for key, (created, response) in self._entries.items():
+                    file.write(json.dumps([key, created, response]) + '\n')
+            os.replace(tmp_path, self.path)
+            self._num_lines = len(self._entries)
+        except OSError as e:
+            logging.warning(f'The LLM cache could not be saved in {self.path}: {e}')
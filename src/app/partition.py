@@ -0,0 +1,101 @@
+import pandas as pd
+from pandas import DataFrame
+
+
+def get_value_ranges(df: DataFrame) -> dict[str, tuple or None]:
+    """Get the range of values of each numeric and datetime column of a DataFrame.
+
+    Args:
+        df (pandas.DataFrame): the DataFrame
+
+    Returns:
+        dict[str, tuple or None]: the (min, max) values of each column, or None if all its values are null
+    """
+    ranges = {}
+    for name, column in df.items():
+        if (pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column)) \
+                or pd.api.types.is_datetime64_any_dtype(column):
+            low, high = column.min(), column.max()
+            ranges[name] = None if pd.isna(low) else (low, high)
+    return ranges
+
+
+def range_to_json(value_range: tuple or None) -> dict or None:
+    if value_range is None:
+        return None
+    low, high = value_range
+    if isinstance(low, pd.Timestamp):
+        return {'datetime': True, 'min': low.isoformat(), 'max': high.isoformat()}
+    return {'datetime': False, 'min': low.item() if hasattr(low, 'item') else low,
+            'max': high.item() if hasattr(high, 'item') else high}
+
+
+def range_from_json(value_range: dict or None) -> tuple or None:
+    if value_range is None:
+        return None
+    if value_range['datetime']:
+        return pd.Timestamp(value_range['min']), pd.Timestamp(value_range['max'])
+    return value_range['min'], value_range['max']
+
+
+class Partition:
+    """A part of the project data, usually coming from one source file (e.g. the data of one year).
+
+    The partitions of a project are consecutive row ranges of the project DataFrame. Each partition knows the range
+    of values of its numeric and datetime fields, so the filters that cannot match any of its rows can skip it (see
+    :meth:`src.schema.filter.Filter.can_match`).
+
+    Args:
+        key (str): the partition key (e.g. the file name or the year of the data)
+        start (int): the position of the first row of the partition in the project data
+        stop (int): the position after the last row of the partition in the project data
+        ranges (dict[str, tuple or None] or None): the range of values of each field (see :func:`get_value_ranges`),
+            or None if unknown
+
+    Attributes:
+        key (str): the partition key (e.g. the file name or the year of the data)
+        start (int): the position of the first row of the partition in the project data
+        stop (int): the position after the last row of the partition in the project data
+        ranges (dict[str, tuple or None] or None): the range of values of each field, or None if unknown (then, the
+            partition is never skipped)
+    """
+
+    def __init__(self, key: str, start: int, stop: int, ranges: dict[str, tuple or None] = None):
+        self.key: str = key
+        self.start: int = start
+        self.stop: int = stop
+        self.ranges: dict[str, tuple or None] or None = ranges
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def get_value_range(self, field_name: str) -> tuple or None:
+        """Get the (min, max) values of a field in the partition.
+
+        Returns:
+            tuple or None: the range of values, or None if all the values are null
+
+        Raises:
+            KeyError: if the range of the field is unknown
+        """
+        if self.ranges is None:
+            raise KeyError(field_name)
+        return self.ranges[field_name]
+
+    def get_state(self) -> dict:
+        """Get the partition metadata, to store it (see :meth:`from_state`)."""
+        return {
+            'key': self.key,
+            'start': self.start,
+            'stop': self.stop,
+            'ranges': {name: range_to_json(value_range) for name, value_range in self.ranges.items()}
+            if self.ranges is not None else None,
+        }
+
+    @staticmethod
+    def from_state(state: dict) -> 'Partition':
+        """Create a partition from its stored metadata (see :meth:`get_state`)."""
+        ranges = None
+        if state['ranges'] is not None:
+            ranges = {name: range_from_json(value_range) for name, value_range in state['ranges'].items()}
+        return Partition(state['key'], state['start'], state['stop'], ranges)
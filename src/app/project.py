@@ -1,35 +1,327 @@
+import hashlib
+from datetime import datetime
+
+import pandas as pd
+import requests
 from openai import OpenAI
 from pandas import DataFrame
 from typing import TYPE_CHECKING
 
 from src.app.bot.databot import DataBot
+from src.app.data_source import DataSource, SOURCE_APPENDED, SOURCE_REPLACED, SOURCE_UNCHANGED
+from src.app.partition import Partition, get_value_ranges
+from src.app.project_store import OUT_OF_CORE_DATA_EXTENSION
 from src.schema.data_schema import DataSchema
+from src.schema.field_schema import get_dtype_field_type
+from src.schema.field_type import DATETIME, TEXTUAL
+from src.schema.filter import Filter
+from src.schema.type_inference import convert_text_column
+from src.utils.csv_loader import concat_column
 from src.utils.session_state_keys import NLP_LANGUAGE, OPENAI_API_KEY, WEBSOCKET_PORT
 
 if TYPE_CHECKING:
     from src.app.app import App
 
+# Project DataFrames are shared (read-only) by all the bot sessions. With copy-on-write, selecting columns or rows
+# from them does not copy the data until it is modified, so the project data is never copied by a session
+pd.set_option('mode.copy_on_write', True)
+
 
 class Project:
 
-    def __init__(self, app: 'App', name: str, df: DataFrame):
+    def __init__(self, app: 'App', name: str, df: DataFrame, original_memory_usage: int = None, stored: bool = False,
+                 partition_key: str = None, out_of_core: bool = False, num_rows: int = None,
+                 source: DataSource = None, state: dict = None):
         self.app: App = app
         self.name: str = name
         self.databot: DataBot = None
         self.bot_running = False
         self.bot_trained = False
-        self.df: DataFrame = df  # TODO: list of dataframes? for sources with +1 dataset (e.g. one x year) they must share the same data schema
-        self.data_schema: DataSchema = DataSchema(self)
+        # Sources with +1 dataset (e.g. one x year) are stored as consecutive partitions of df (see append_partition)
+        self.df: DataFrame = df
+        # The data of out-of-core projects stays on disk and is queried by the SQL engine: df is only a sample of it,
+        # used to infer the data schema (see import_csv)
+        self.out_of_core: bool = out_of_core
+        self.num_rows: int = num_rows if out_of_core else len(df)
+        # Memory the data would take with the default pandas types (see src.utils.csv_loader.read_csv)
+        self.original_memory_usage: int or None = original_memory_usage
+        # Remote file the data was loaded from, to refresh it when the file changes (see refresh_from_source)
+        self.source: DataSource or None = source
+        # A stored project (see set_state) restores its data schema instead of inferring it again, unless its data
+        # changed since its state was stored
+        data_schema_state = None
+        if state is not None and state.get('data_version') == self.app.project_store.get_data_version(name):
+            data_schema_state = state['data_schema']
+        self.data_schema: DataSchema = DataSchema(self, data_schema_state)
+        # The value ranges of a partition are only needed when there are more than 1 (see append_partition)
+        self.partitions: list[Partition] = [Partition(partition_key or name, 0, self.num_rows)]
         self.properties: dict = {
             NLP_LANGUAGE: 'en',
             WEBSOCKET_PORT: 8765 + len(self.app.projects)
         }
         self.ai_updated_fields = []
+        # Artifacts of the last trained bot, to restore it without generating them again (see train_bot)
+        self.bot_state: dict or None = None
+        self._saved_state: dict or None = None
         self.app.add_project(self)
+        if state is not None:
+            self.set_state(state)
+        if not stored:
+            if not self.out_of_core:
+                # Store the data (after the data schema inference, which may convert some columns)
+                self.save_data()
+            self.save_state()
+
+    @staticmethod
+    def import_csv(app: 'App', name: str, file_path: str, delimiter: str = ',', encoding: str = None) -> 'Project':
+        """Create an out-of-core project from a CSV file, for datasets that may not fit in memory.
+
+        The file is stored in the app's project store without loading it (see
+        :meth:`~src.app.project_store.ProjectStore.import_csv`), and only a sample of it is loaded to infer the data
+        schema. The bot queries are run by the SQL engine over the stored file.
+
+        Args:
+            app (App): the app
+            name (str): the project name
+            file_path (str): the path of the CSV file
+            delimiter (str): the CSV delimiter
+            encoding (str): the file encoding, or None if it is UTF-8
+
+        Returns:
+            Project: the created project
+        """
+        app.project_store.import_csv(name, file_path, delimiter, encoding)
+        df, metadata = app.project_store.load_sample(app.project_store.get_file_path(name, OUT_OF_CORE_DATA_EXTENSION))
+        return Project(app, name, df, out_of_core=True, num_rows=metadata['num_rows'])
+
+    def get_data_file_paths(self) -> list[str]:
+        """Get the paths of the stored data files of an out-of-core project, read by the SQL engine."""
+        return [self.app.project_store.get_file_path(self.name, OUT_OF_CORE_DATA_EXTENSION)]
+
+    def save_data(self) -> None:
+        """Store the project data in the app's project store."""
+        self.app.project_store.save(self.name, self.df, {'original_memory_usage': self.original_memory_usage})
+
+    def get_state(self) -> dict:
+        """Get the project state to store it: properties, data schema customizations and the artifacts of the last
+        trained bot."""
+        return {
+            'properties': {NLP_LANGUAGE: self.properties[NLP_LANGUAGE]},
+            'ai_updated_fields': list(self.ai_updated_fields),
+            'data_schema': self.data_schema.get_state(),
+            'bot': self.bot_state,
+            'partitions': [partition.get_state() for partition in self.partitions],
+            'original_memory_usage': self.original_memory_usage,
+            'source': self.source.get_state() if self.source is not None else None,
+            # The data schema is only restored if the stored data did not change since then (see __init__)
+            'data_version': self.app.project_store.get_data_version(self.name),
+        }
+
+    def set_state(self, state: dict) -> None:
+        """Restore a stored project state (see :meth:`get_state`)."""
+        self.properties.update(state['properties'])
+        self.ai_updated_fields = state['ai_updated_fields']
+        self.data_schema.set_state(state['data_schema'])
+        self.bot_state = state['bot']
+        partitions = [Partition.from_state(partition_state) for partition_state in state.get('partitions') or []]
+        if partitions and partitions[-1].stop == self.num_rows:
+            self.partitions = partitions
+            self.original_memory_usage = state.get('original_memory_usage', self.original_memory_usage)
+            # The source is only valid for the data it was recorded with
+            if state.get('source') is not None:
+                self.source = DataSource.from_state(state['source'])
+        self._saved_state = state
+
+    def save_state(self) -> None:
+        """Store the project state in the app's project store, if it changed since it was last stored."""
+        state = self.get_state()
+        if state != self._saved_state:
+            self.app.project_store.save_state(self.name, state)
+            self._saved_state = state
+
+    def get_partitions(self, filters: list[Filter]) -> list[Partition]:
+        """Get the data partitions that may contain rows passing a set of filters (i.e. skip the partitions where the
+        filter fields have no value in the filtered range)."""
+        return [partition for partition in self.partitions
+                if all(bot_filter.can_match(partition) for bot_filter in filters)]
+
+    def append_partition(self, key: str, df: DataFrame, original_memory_usage: int = None) -> None:
+        """Append a new data partition (e.g. the data of a new year) to the project. The partition must have the same
+        fields as the project data, which share the data schema.
+
+        Only the new partition is stored, without reading or writing the previous ones again. The data schema is
+        updated in place (see :meth:`~src.schema.data_schema.DataSchema.append_rows`): its customizations are kept
+        and, if the bot is trained, its statistics and indexes are updated with the new rows, which are also inserted
+        into the SQL engine. The text fields of the partition are converted like the project data (see
+        :attr:`~src.schema.field_schema.FieldSchema.conversion`), and the data schema is only inferred again if the
+        type of a field changed.
+
+        Args:
+            key (str): the partition key (e.g. the file name or the year of the data)
+            df (pandas.DataFrame): the partition data
+            original_memory_usage (int): the memory the partition data would take with the default pandas types
+
+        Raises:
+            ValueError: if the project is out-of-core, the partition fields do not match the project fields, or a
+                datetime field cannot be parsed
+        """
+        if self.out_of_core:
+            raise ValueError('Partitions cannot be appended to an out-of-core project')
+        if set(df.columns) != set(self.df.columns):
+            raise ValueError(f"The fields of the partition '{key}' do not match the fields of the project")
+        converted = {}
+        for field in self.data_schema.field_schemas:
+            name = field.original_name
+            if field.type.t == TEXTUAL or get_dtype_field_type(df[name].dtype) != TEXTUAL:
+                continue
+            if field.conversion is not None:
+                # The same conversion the type inference applied to the project data (e.g. 'yes' to True, '1,5' to
+                # 1.5). If a value cannot be converted, the column is kept as text and the data schema inferred again
+                column = convert_text_column(df[name], field.conversion)
+                if column is not None:
+                    converted[name] = column
+            elif field.type.t == DATETIME:
+                converted[name] = pd.to_datetime(df[name])
+        df = df.assign(**converted)[list(self.df.columns)].reset_index(drop=True)
+        if len(self.partitions) == 1 and self.partitions[0].ranges is None:
+            self.partitions[0].ranges = get_value_ranges(self.df)
+        if self.original_memory_usage is not None and original_memory_usage is not None:
+            self.original_memory_usage += original_memory_usage
+        start = len(self.df)
+        self.partitions.append(Partition(key, start, start + len(df), get_value_ranges(df)))
+        previous_df = self.df
+        self.df = DataFrame({name: concat_column([self.df[name], df[name]]) for name in self.df.columns})
+        self.num_rows = len(self.df)
+        updated = self.data_schema.append_rows(previous_df)
+        if not updated:
+            data_schema_state = self.data_schema.get_state()
+            self.data_schema = DataSchema(self)
+            self.data_schema.set_state(data_schema_state)
+        self.app.project_store.save_partition(self.name, len(self.partitions) - 1, self.df.iloc[start:])
+        self.save_state()
+        if self.databot is not None:
+            if updated:
+                self.databot.refresh_data(start)
+            else:
+                self.refresh_bot_data()
+
+    def replace_data(self, df: DataFrame, original_memory_usage: int = None) -> None:
+        """Replace the project data (e.g. after its source file changed), keeping the data schema customizations of
+        the fields that still exist with the same type. The new data is stored as a single partition and, if the bot
+        is trained, its data structures are updated.
+
+        Args:
+            df (pandas.DataFrame): the new data
+            original_memory_usage (int): the memory the new data would take with the default pandas types
+
+        Raises:
+            ValueError: if the project is out-of-core
+        """
+        if self.out_of_core:
+            raise ValueError('The data of an out-of-core project cannot be replaced')
+        data_schema_state = self.data_schema.get_state()
+        self.df = df
+        self.num_rows = len(df)
+        self.original_memory_usage = original_memory_usage
+        self.data_schema = DataSchema(self)
+        self.data_schema.set_state(data_schema_state)
+        self.partitions = [Partition(self.name, 0, self.num_rows)]
+        self.save_data()
+        self.save_state()
+        if self.databot is not None:
+            self.refresh_bot_data()
+
+    def refresh_from_source(self, http_session: requests.Session = None) -> str:
+        """Refresh the project data from the remote file it was loaded from (see :attr:`source`).
+
+        The file is only downloaded if it changed (see :meth:`~src.app.data_source.DataSource.download`). If new
+        rows were only appended to it (e.g. a daily updated dataset), only these rows are read and appended to the
+        project as a new partition (see :meth:`append_partition`), so the data schema, statistics and indexes are
+        updated in place. Otherwise, all the project data is replaced (see :meth:`replace_data`).
+
+        Args:
+            http_session (requests.Session): the HTTP session to use, or None to create one
+
+        Returns:
+            str: the result of the refresh: SOURCE_UNCHANGED, SOURCE_APPENDED or SOURCE_REPLACED (see
+            :mod:`src.app.data_source`)
+
+        Raises:
+            ValueError: if the project has no source or is out-of-core, or the new data does not fit the project
+            requests.RequestException: if the file cannot be downloaded
+        """
+        if self.source is None:
+            raise ValueError(f"The project '{self.name}' has no data source to refresh it from")
+        content, validators = self.source.download(http_session)
+        if content is None:
+            result = SOURCE_UNCHANGED
+        elif self.source.is_append(content):
+            df, original_memory_usage = self.source.read_appended_rows(content)
+            if len(df) > 0:
+                self.append_partition(f'{datetime.now():%Y-%m-%d %H:%M:%S}', df, original_memory_usage)
+            result = SOURCE_APPENDED if len(df) > 0 else SOURCE_UNCHANGED
+        else:
+            df, original_memory_usage = self.source.read(content)
+            self.replace_data(df, original_memory_usage)
+            result = SOURCE_REPLACED
+        if content is not None:
+            self.source.update(content, validators)
+        self.save_state()
+        return result
+
+    def refresh_bot_data(self) -> None:
+        """Update the bot data structures (indexes, statistics, SQL engine) after the project data changed. The bot
+        vocabulary (e.g. new field values) is only updated when it is trained again."""
+        self.data_schema.compute_statistics()
+        self.data_schema.build_indexes()
+        self.databot.refresh_data()
+
+    def get_bot_hash(self) -> str:
+        """Get a hash of everything the trained bot depends on (the data schema and the stored data version)."""
+        content = self.data_schema.get_hash() + str(self.app.project_store.get_data_version(self.name))
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get_memory_usage(self) -> int:
+        """Get the memory (in bytes) used by the project data (only the data sample, for out-of-core projects)."""
+        return int(self.df.memory_usage(index=True, deep=True).sum())
 
     def train_bot(self):
-        self.databot = DataBot(self)
+        """Train the project bot.
+
+        If the data schema and the data did not change since the bot was last trained (e.g. before restarting the
+        app), the stored bot artifacts (the field statistics, the field indexes and the entities generated from the
+        data schema) are restored instead of computing them again. The intent classifiers of the bot are LLM-based
+        (see :class:`~src.app.bot.databot.DataBot`), so they have no trained model to store: training the besser bot
+        only sets up the NLP engine of its states, which is needed to run it.
+
+        Out-of-core projects have no field statistics nor indexes: their queries are pushed down to the SQL engine.
+        """
+        bot_hash = self.get_bot_hash()
+        artifacts = None
+        if self.bot_state is not None and self.bot_state['hash'] == bot_hash:
+            artifacts = self.app.project_store.load_artifacts(self.name)
+        if artifacts is not None and 'indexes' in artifacts:
+            for field in self.data_schema.field_schemas:
+                field.statistics = artifacts['statistics'].get(field.original_name)
+                field.value_index, field.range_index = artifacts['indexes'].get(field.original_name, (None, None))
+                for artifact in [field.statistics, field.value_index, field.range_index]:
+                    if artifact is not None:
+                        artifact.bind(self.df)
+        else:
+            artifacts = None
+            if not self.out_of_core:
+                self.data_schema.compute_statistics()
+                self.data_schema.build_indexes()
+        self.databot = DataBot(self, self.bot_state if artifacts is not None else None)
         self.databot.bot.train()
+        if artifacts is None:
+            self.app.project_store.save_artifacts(self.name, {
+                'statistics': {field.original_name: field.statistics for field in self.data_schema.field_schemas},
+                'indexes': {field.original_name: (field.value_index, field.range_index)
+                            for field in self.data_schema.field_schemas},
+            })
+            self.bot_state = {'hash': bot_hash, **self.databot.get_state()}
+        self.save_state()
         self.bot_trained = True
 
     def run_bot(self):
@@ -0,0 +1,325 @@
+import json
+import logging
+import os
+import pickle
+import shutil
+from urllib.parse import quote, unquote
+
+import duckdb
+import pyarrow as pa
+from pandas import DataFrame
+from pyarrow import feather, parquet
+
+from src.utils.csv_loader import CSV_CHUNK_SIZE, DATE_COLUMN, concat_column, get_column_plans
+from src.utils.encoding_detection import check_file_encoding, is_utf8, transcode_file
+from src.utils.sql import quote_identifier, sql_literal
+
+PROJECT_DATA_EXTENSION = '.arrow'
+"""str: Extension of the project data files."""
+
+PROJECT_STATE_EXTENSION = '.json'
+"""str: Extension of the project state files (data schema customizations, properties, bot artifacts...)."""
+
+PROJECT_ARTIFACTS_EXTENSION = '.artifacts.pkl'
+"""str: Extension of the files of the trained bot artifacts that are not JSON serializable (e.g. indexes)."""
+
+PROJECT_PARTITIONS_EXTENSION = '.partitions'
+"""str: Extension of the directory containing the data files of the partitions appended to a project (see
+:meth:`src.app.project.Project.append_partition`)."""
+
+PROJECT_METADATA_KEY = b'databot'
+"""bytes: Key of the project metadata in the Arrow schema metadata of a project data file."""
+
+OUT_OF_CORE_DATA_EXTENSION = '.parquet'
+"""str: Extension of the data files of the out-of-core projects (see :meth:`ProjectStore.import_csv`)."""
+
+OUT_OF_CORE_SAMPLE_ROWS = 100_000
+"""int: Number of rows of the sample of the data of an out-of-core project kept in memory (to infer its data schema
+and preview it)."""
+
+
+class ProjectStore:
+    """Store of the projects on disk, so that they survive an app restart: their data, their state (see
+    :meth:`src.app.project.Project.get_state`) and the artifacts of their trained bots.
+
+    The data of each project is stored in an uncompressed Arrow IPC (Feather v2) file. When the app starts, the files
+    are memory-mapped: the numeric columns are used directly from the mapped file (without copying them), so only the
+    pages of the columns that are actually read are loaded in memory.
+
+    The data of the out-of-core projects, which may not fit in memory, is stored in a Parquet file instead (see
+    :meth:`import_csv`): it is only read by the SQL engine, which reads the columns and row groups each query needs.
+
+    Args:
+        path (str): the directory where the project data files are stored
+
+    Attributes:
+        path (str): the directory where the project data files are stored
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+        os.makedirs(self.path, exist_ok=True)
+
+    def get_file_path(self, name: str, extension: str = PROJECT_DATA_EXTENSION) -> str:
+        """Get the path of a file of a project (the project name is escaped to be a valid file name)."""
+        return os.path.join(self.path, quote(name, safe='') + extension)
+
+    def get_partition_file_paths(self, name: str) -> list[str]:
+        """Get the paths of the data files of the partitions appended to a project, in order."""
+        partitions_path = self.get_file_path(name, PROJECT_PARTITIONS_EXTENSION)
+        if not os.path.isdir(partitions_path):
+            return []
+        file_names = [file_name for file_name in os.listdir(partitions_path)
+                      if file_name.endswith(PROJECT_DATA_EXTENSION)]
+        file_names.sort(key=lambda file_name: int(file_name[:-len(PROJECT_DATA_EXTENSION)]))
+        return [os.path.join(partitions_path, file_name) for file_name in file_names]
+
+    def get_data_version(self, name: str) -> str or None:
+        """Get an identifier of the stored version of the data of a project (it changes every time the data is
+        saved or a partition is appended), or None if the data is not stored."""
+        file_path = self.get_file_path(name)
+        if not os.path.exists(file_path):
+            file_path = self.get_file_path(name, OUT_OF_CORE_DATA_EXTENSION)
+        try:
+            stats = [os.stat(file_path) for file_path in [file_path] + self.get_partition_file_paths(name)]
+        except OSError:
+            return None
+        return ','.join(f'{stat.st_mtime_ns}-{stat.st_size}' for stat in stats)
+
+    def save(self, name: str, df: DataFrame, metadata: dict = None) -> bool:
+        """Save the data of a project, replacing its previous data files (including its partitions).
+
+        Args:
+            name (str): the project name
+            df (pandas.DataFrame): the project data
+            metadata (dict): other project information to store with the data (must be JSON serializable)
+
+        Returns:
+            bool: True if the data was saved, False if it cannot be stored as Arrow data
+        """
+        partitions_path = self.get_file_path(name, PROJECT_PARTITIONS_EXTENSION)
+        if os.path.isdir(partitions_path):
+            shutil.rmtree(partitions_path)
+        return self._write(self.get_file_path(name), name, df, metadata)
+
+    def save_partition(self, name: str, index: int, df: DataFrame) -> bool:
+        """Save the data of a partition appended to a project, without writing the previous partitions again.
+
+        Args:
+            name (str): the project name
+            index (int): the partition index (the first partition is the project data file, see :meth:`save`)
+            df (pandas.DataFrame): the partition data
+
+        Returns:
+            bool: True if the data was saved, False if it cannot be stored as Arrow data
+        """
+        partitions_path = self.get_file_path(name, PROJECT_PARTITIONS_EXTENSION)
+        os.makedirs(partitions_path, exist_ok=True)
+        return self._write(os.path.join(partitions_path, f'{index}{PROJECT_DATA_EXTENSION}'), name, df)
+
+    def _write(self, file_path: str, name: str, df: DataFrame, metadata: dict = None) -> bool:
+        tmp_path = file_path + '.tmp'
+        try:
+            try:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+            except pa.ArrowException:
+                # Arrow columns have a single type: text columns mixing other types (e.g. numbers) are stored as text
+                table = pa.Table.from_pandas(df.assign(**{
+                    column: df[column].astype(str).where(df[column].notna()) for column in df.columns
+                    if df[column].dtype == object
+                }), preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                PROJECT_METADATA_KEY: json.dumps({'name': name, **(metadata or {})}).encode(),
+            })
+            # A single chunk per column: loading a column of several chunks concatenates them, copying it out of the
+            # mapped file (see load)
+            try:
+                table = table.combine_chunks()
+                chunk_size = max(table.num_rows, 1)
+            except pa.ArrowException:
+                # E.g. a text column with more than 2 GB of text, which does not fit in a single chunk
+                chunk_size = None
+            feather.write_feather(table, tmp_path, compression='uncompressed', chunksize=chunk_size)
+            os.replace(tmp_path, file_path)
+            return True
+        except (pa.ArrowException, OSError) as e:
+            logging.warning(f"The data of the project '{name}' could not be stored: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def load(self, file_path: str) -> tuple[DataFrame, dict]:
+        """Load (memory-mapped) the data of a project.
+
+        Args:
+            file_path (str): the path of the project data file
+
+        Returns:
+            tuple[pandas.DataFrame, dict]: the project data and its metadata (including the project name)
+        """
+        table = feather.read_table(file_path, memory_map=True)
+        metadata = json.loads((table.schema.metadata or {}).get(PROJECT_METADATA_KEY, b'{}'))
+        if 'name' not in metadata:
+            metadata['name'] = unquote(os.path.basename(file_path)[:-len(PROJECT_DATA_EXTENSION)])
+        # split_blocks avoids consolidating the columns into 2D blocks, which would copy them out of the mapped file
+        df = table.to_pandas(split_blocks=True)
+        partition_file_paths = self.get_partition_file_paths(metadata['name'])
+        if partition_file_paths:
+            # The partitions are concatenated into a single DataFrame (so their data is copied)
+            dfs = [df] + [feather.read_table(file_path, memory_map=True).to_pandas(split_blocks=True)
+                          for file_path in partition_file_paths]
+            df = DataFrame({column: concat_column([partition_df[column] for partition_df in dfs])
+                            for column in df.columns})
+        return df, metadata
+
+    def import_csv(self, name: str, file_path: str, delimiter: str = ',', encoding: str = None) -> None:
+        """Store a CSV file as the data of an out-of-core project, without loading it in memory.
+
+        The file is converted into a Parquet file by DuckDB, which streams it (and spills to disk if needed). The
+        column types are detected by DuckDB, and the text columns with a date format (see
+        :func:`~src.utils.csv_loader.get_column_plans`) that all their values match are stored as dates.
+
+        Args:
+            name (str): the project name
+            file_path (str): the path of the CSV file
+            delimiter (str): the CSV delimiter
+            encoding (str): the file encoding (files not in UTF-8 are converted first), or None if it is UTF-8
+
+        Raises:
+            duckdb.Error: if the CSV file cannot be read
+        """
+        target_path = self.get_file_path(name, OUT_OF_CORE_DATA_EXTENSION)
+        tmp_path = target_path + '.tmp'
+        utf8_path = file_path
+        if is_utf8(encoding):
+            # The encoding was detected from the first bytes of the file only (e.g. an ASCII prefix)
+            encoding = check_file_encoding(file_path, encoding)
+        if not is_utf8(encoding):
+            utf8_path = tmp_path + '.csv'
+            transcode_file(file_path, utf8_path, encoding)
+        connection = duckdb.connect()
+        try:
+            csv = f'read_csv({sql_literal(utf8_path)}, delim={sql_literal(delimiter)}, header=true)'
+            sample = connection.execute(f'SELECT * FROM {csv} LIMIT {CSV_CHUNK_SIZE}').df()
+            candidates = [
+                (column, date_format)
+                for column, (plan, date_formats) in get_column_plans(sample).items() if plan == DATE_COLUMN
+                for date_format in date_formats
+            ]
+            date_columns = {}
+            if candidates:
+                # A value outside the sample can rule out a date format (e.g. a day after the 12th in a column read
+                # month first), so the candidate formats are checked against the whole file in a single scan
+                checks = ', '.join(
+                    f'bool_and({quote_identifier(column)} IS NULL '
+                    f'OR try_strptime({quote_identifier(column)}, {sql_literal(date_format)}) IS NOT NULL)'
+                    for column, date_format in candidates
+                )
+                matches = connection.execute(f'SELECT {checks} FROM {csv}').fetchone()
+                for (column, date_format), match in zip(candidates, matches):
+                    if match and column not in date_columns:
+                        date_columns[column] = (f'strptime({quote_identifier(column)}, {sql_literal(date_format)}) '
+                                         f'AS {quote_identifier(column)}')
+            dates = list(date_columns.values())
+            columns = f'* REPLACE ({", ".join(dates)})' if dates else '*'
+            connection.execute(f'COPY (SELECT {columns} FROM {csv}) TO {sql_literal(tmp_path)} (FORMAT PARQUET)')
+            os.replace(tmp_path, target_path)
+        finally:
+            connection.close()
+            for path in [tmp_path, tmp_path + '.csv']:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def load_sample(self, file_path: str, num_rows: int = OUT_OF_CORE_SAMPLE_ROWS) -> tuple[DataFrame, dict]:
+        """Load a random sample of the data of an out-of-core project (see :meth:`import_csv`).
+
+        Args:
+            file_path (str): the path of the project data file
+            num_rows (int): the number of rows of the sample
+
+        Returns:
+            tuple[pandas.DataFrame, dict]: the data sample and its metadata (the project name and its number of rows)
+        """
+        metadata = {
+            'name': unquote(os.path.basename(file_path)[:-len(OUT_OF_CORE_DATA_EXTENSION)]),
+            'out_of_core': True,
+            'num_rows': parquet.ParquetFile(file_path).metadata.num_rows,
+        }
+        connection = duckdb.connect()
+        try:
+            # The same sample is taken every time, so the inferred data schema does not change
+            df = connection.execute(f'SELECT * FROM read_parquet({sql_literal(file_path)}) '
+                                    f'USING SAMPLE reservoir({int(num_rows)} ROWS) REPEATABLE (0)').df()
+        finally:
+            connection.close()
+        return df, metadata
+
+    def save_state(self, name: str, state: dict) -> None:
+        """Save the state of a project (see :meth:`src.app.project.Project.get_state`)."""
+        file_path = self.get_file_path(name, PROJECT_STATE_EXTENSION)
+        tmp_path = file_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(state, file, default=str)
+            os.replace(tmp_path, file_path)
+        except OSError as e:
+            logging.warning(f"The state of the project '{name}' could not be stored: {e}")
+
+    def load_state(self, name: str) -> dict or None:
+        """Load the stored state of a project, or None if it is not stored."""
+        try:
+            with open(self.get_file_path(name, PROJECT_STATE_EXTENSION), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def save_artifacts(self, name: str, artifacts: dict) -> None:
+        """Save the artifacts of the trained bot of a project that are not JSON serializable."""
+        file_path = self.get_file_path(name, PROJECT_ARTIFACTS_EXTENSION)
+        tmp_path = file_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as file:
+                pickle.dump(artifacts, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, file_path)
+        except (OSError, pickle.PicklingError) as e:
+            logging.warning(f"The bot artifacts of the project '{name}' could not be stored: {e}")
+
+    def load_artifacts(self, name: str) -> dict or None:
+        """Load the stored artifacts of the trained bot of a project, or None if they are not stored."""
+        try:
+            with open(self.get_file_path(name, PROJECT_ARTIFACTS_EXTENSION), 'rb') as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+
+    def delete(self, name: str) -> None:
+        """Delete all the files of a project."""
+        for extension in [PROJECT_DATA_EXTENSION, OUT_OF_CORE_DATA_EXTENSION, PROJECT_STATE_EXTENSION,
+                          PROJECT_ARTIFACTS_EXTENSION]:
+            file_path = self.get_file_path(name, extension)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        partitions_path = self.get_file_path(name, PROJECT_PARTITIONS_EXTENSION)
+        if os.path.isdir(partitions_path):
+            shutil.rmtree(partitions_path)
+
+    def load_all(self) -> list[tuple[DataFrame, dict]]:
+        """Load (memory-mapped) the data of all the stored projects, in the order they were stored. Only a sample of
+        the data of the out-of-core projects is loaded (see :meth:`load_sample`).
+
+        Returns:
+            list[tuple[pandas.DataFrame, dict]]: the data and metadata of each project (see :meth:`load`)
+        """
+        file_paths = [os.path.join(self.path, file_name) for file_name in os.listdir(self.path)
+                      if file_name.endswith(PROJECT_DATA_EXTENSION) or file_name.endswith(OUT_OF_CORE_DATA_EXTENSION)]
+        projects = []
+        for file_path in sorted(file_paths, key=os.path.getmtime):
+            try:
+                if file_path.endswith(OUT_OF_CORE_DATA_EXTENSION):
+                    projects.append(self.load_sample(file_path))
+                else:
+                    projects.append(self.load(file_path))
+            except (pa.ArrowException, duckdb.Error, OSError, ValueError) as e:
+                logging.warning(f'The project data file {file_path} could not be loaded: {e}')
+        return projects
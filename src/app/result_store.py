@@ -0,0 +1,116 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import pandas as pd
+from pandas import DataFrame
+
+DATAFRAME_PAGE_SIZE = 1000
+"""int: Number of rows of each page of a DataFrame bot reply."""
+
+RESULT_STORE_TTL = 30 * 60
+"""int: Time, in seconds, a DataFrame bot reply is kept in the result store after its last access."""
+
+RESULT_STORE_MAX_SIZE = 512 * 1024 * 1024
+"""int: Maximum size, in bytes, of all the DataFrames stored in the result store."""
+
+
+def stringify_datetimes(df: DataFrame, columns: list[str] = None) -> DataFrame:
+    """Get a DataFrame with its datetime columns converted to strings, so it can be serialized to JSON. The original
+    DataFrame is not modified.
+
+    Args:
+        df (pandas.DataFrame): the DataFrame
+        columns (list[str]): the columns to convert (if they are datetime), or None to convert all datetime columns
+
+    Returns:
+        pandas.DataFrame: the DataFrame with the datetime columns converted to strings
+    """
+    if columns is None:
+        columns = df.columns
+    datetime_columns = {col: df[col].astype(str) for col in columns
+                        if pd.api.types.is_datetime64_any_dtype(df[col])}
+    if datetime_columns:
+        df = df.assign(**datetime_columns)
+    return df
+
+
+class ResultStore:
+    """Server-side store of the DataFrame bot replies too large to be sent in a single message.
+
+    The bot only sends the first page of a DataFrame, together with its total number of rows and a handle to get the
+    remaining rows from this store. Results expire after some time without being accessed, and the least recently used
+    ones are evicted when the store exceeds its maximum size.
+
+    Args:
+        ttl (int): the time, in seconds, a result is kept after its last access
+        max_size (int): the maximum size of all the stored results, in bytes
+
+    Attributes:
+        ttl (int): the time, in seconds, a result is kept after its last access
+        max_size (int): the maximum size of all the stored results, in bytes
+        size (int): the current size of all the stored results, in bytes
+        _results (OrderedDict[str, tuple[float, pandas.DataFrame, int]]): for each handle, the last access time, the
+            DataFrame and its size, in least recently used order
+        _lock (threading.Lock): the lock to access the store from the bot sessions and the Streamlit sessions
+    """
+
+    def __init__(self, ttl: int = RESULT_STORE_TTL, max_size: int = RESULT_STORE_MAX_SIZE):
+        self.ttl: int = ttl
+        self.max_size: int = max_size
+        self.size: int = 0
+        self._results: OrderedDict[str, tuple[float, DataFrame, int]] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def put(self, df: DataFrame) -> str:
+        """Store a DataFrame.
+
+        Args:
+            df (pandas.DataFrame): the DataFrame to store. It must not be modified afterwards
+
+        Returns:
+            str: the handle to get the DataFrame rows
+        """
+        handle = uuid.uuid4().hex
+        # Counting the text of object columns too: they take most of the memory of many results
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            self._remove_expired()
+            self._results[handle] = (time.time(), df, size)
+            self.size += size
+            while self.size > self.max_size and len(self._results) > 1:
+                self._remove(next(iter(self._results)))
+        return handle
+
+    def get_rows(self, handle: str, start: int, count: int) -> DataFrame or None:
+        """Get some rows of a stored DataFrame.
+
+        Args:
+            handle (str): the DataFrame handle
+            start (int): the position of the first row
+            count (int): the number of rows
+
+        Returns:
+            pandas.DataFrame or None: the rows, or None if the DataFrame is not stored (e.g. it expired)
+        """
+        with self._lock:
+            self._remove_expired()
+            if handle not in self._results:
+                return None
+            _, df, size = self._results[handle]
+            self._results[handle] = (time.time(), df, size)
+            self._results.move_to_end(handle)
+        return df.iloc[start:start + count]
+
+    def _remove_expired(self) -> None:
+        now = time.time()
+        while self._results:
+            handle, (last_access, _, _) = next(iter(self._results.items()))
+            if now - last_access <= self.ttl:
+                break
+            self._remove(handle)
+
+    def _remove(self, handle: str) -> None:
+        _, _, size = self._results.pop(handle)
+        self.size -= size
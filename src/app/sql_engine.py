@@ -0,0 +1,167 @@
+import threading
+
+import duckdb
+import numpy as np
+from pandas import DataFrame
+
+from src.utils.sql import sql_literal
+
+DATA_TABLE = '__databot_data'
+"""str: Name of the table containing the project data in the SQL engine."""
+
+ROW_ID = '__databot_row'
+"""str: Name of the column containing the position of each row in the project DataFrame."""
+
+SESSION_ROWS = '__databot_session_rows'
+"""str: Name of the relation containing the rows selected by the session filters."""
+
+
+class SQLEngine:
+    """In-process SQL engine (DuckDB) where the project data is loaded once, to run SQL queries on it without loading
+    the data again on every query.
+
+    Queries are run against a view called 'df' containing only the rows selected by the filters of the user session.
+    For in-memory projects, the session filters are not translated into SQL: the rows they select are passed to the
+    query. For out-of-core projects (see :attr:`src.app.project.Project.out_of_core`), the data is not loaded: the data
+    table is a view over the project data files, and the session filters are pushed down to DuckDB as a SQL condition
+    (see :meth:`src.schema.filter.Filter.get_sql`), so only the needed columns and row groups are read from disk.
+
+    Untrusted queries (e.g. the SQL generated by the LLM, see :meth:`query_untrusted`) are not run on the database
+    holding the data table, but on a sandbox database where the project data can only be read: the data of an
+    in-memory project is exposed as a DataFrame registered on each query cursor, and the data files of an out-of-core
+    project are the only files that can be read (external access is disabled and the configuration locked).
+
+    Args:
+        df (pandas.DataFrame): the project data (of an in-memory project)
+        file_paths (list[str]): the Parquet files with the project data (of an out-of-core project)
+
+    Attributes:
+        _connection (duckdb.DuckDBPyConnection): the connection to the in-memory DuckDB database
+        _sandbox (duckdb.DuckDBPyConnection): the connection to the sandbox database, for untrusted queries
+        _lock (threading.Lock): the lock to create a connection cursor for each query
+        _row_ids (bool): whether the data table has the :data:`ROW_ID` column (in-memory projects)
+        _df (pandas.DataFrame or None): the project data with the :data:`ROW_ID` column (of an in-memory project),
+            read by the untrusted queries
+    """
+
+    def __init__(self, df: DataFrame = None, file_paths: list[str] = None):
+        self._connection: duckdb.DuckDBPyConnection = duckdb.connect()
+        self._sandbox: duckdb.DuckDBPyConnection = duckdb.connect()
+        self._lock: threading.Lock = threading.Lock()
+        self._row_ids: bool = file_paths is None
+        self._df: DataFrame or None = None
+        if file_paths is not None:
+            self._connection.execute(
+                f'CREATE VIEW {DATA_TABLE} AS SELECT * FROM read_parquet({sql_literal(file_paths)})'
+            )
+            self._sandbox.execute(f'SET allowed_paths = {sql_literal(file_paths)}')
+            self._sandbox.execute(
+                f'CREATE VIEW {DATA_TABLE} AS SELECT * FROM read_parquet({sql_literal(file_paths)})'
+            )
+        else:
+            self._df = df.assign(**{ROW_ID: np.arange(len(df))})
+            self._connection.register('project_df', self._df)
+            self._connection.execute(f'CREATE TABLE {DATA_TABLE} AS SELECT * FROM project_df')
+            self._connection.unregister('project_df')
+        self._sandbox.execute('SET enable_external_access = false')
+        self._sandbox.execute('SET lock_configuration = true')
+
+    def append_rows(self, df: DataFrame, start: int) -> None:
+        """Insert the rows appended to the project data (of an in-memory project) into the data table, instead of
+        loading all the data again. The running queries keep reading the previous rows.
+
+        Args:
+            df (pandas.DataFrame): the project data
+            start (int): the position of the first appended row in the project DataFrame
+
+        Raises:
+            duckdb.Error: if the rows cannot be inserted (e.g. a value does not match the column type of the table)
+        """
+        with self._lock:
+            cursor = self._connection.cursor()
+        try:
+            cursor.register('appended_df', df.iloc[start:].assign(**{ROW_ID: np.arange(start, len(df))}))
+            cursor.execute(f'INSERT INTO {DATA_TABLE} BY NAME SELECT * FROM appended_df')
+        finally:
+            cursor.close()
+        self._df = df.assign(**{ROW_ID: np.arange(len(df))})
+
+    def query(self, sql: str, rows: np.ndarray or None = None, where: str = None, params: list = None) -> DataFrame:
+        """Run a SQL query on the project data.
+
+        Args:
+            sql (str): the SQL query, reading from the 'df' table
+            rows (numpy.ndarray or None): the rows the query can read (a boolean row mask or the sorted row positions),
+                or None to read all the rows
+            where (str): a SQL condition the rows the query can read must pass, or None
+            params (list): the values of the parameters of the SQL query, or None
+
+        Returns:
+            pandas.DataFrame: the query result
+        """
+        # Each query uses its own cursor (i.e. connection to the database), so the 'df' view is only visible to it and
+        # the queries of different sessions can run concurrently
+        with self._lock:
+            cursor = self._connection.cursor()
+        try:
+            return self._run_query(cursor, DATA_TABLE, sql, rows, where, params)
+        finally:
+            cursor.close()
+
+    def query_untrusted(self, sql: str, rows: np.ndarray or None = None, where: str = None) -> DataFrame:
+        """Run an untrusted SQL query (e.g. generated by the LLM) on the project data, in the sandbox database.
+
+        Only a single SELECT statement is accepted (checked with the DuckDB parser), and it can neither read other
+        files nor modify the project data.
+
+        Args:
+            sql (str): the SQL query, reading from the 'df' table
+            rows (numpy.ndarray or None): the rows the query can read (a boolean row mask or the sorted row positions),
+                or None to read all the rows
+            where (str): a SQL condition the rows the query can read must pass, or None
+
+        Returns:
+            pandas.DataFrame: the query result
+
+        Raises:
+            ValueError: if the query is not a single SELECT statement
+            duckdb.Error: if the query fails (e.g. it tries to read a file)
+        """
+        with self._lock:
+            cursor = self._sandbox.cursor()
+            df = self._df
+        try:
+            statements = cursor.extract_statements(sql)
+            if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+                raise ValueError(f'Only a single SELECT statement can be run: {sql}')
+            table = DATA_TABLE
+            if df is not None:
+                # Registered DataFrames are read-only views, only visible to this cursor
+                table = 'project_df'
+                cursor.register(table, df)
+            return self._run_query(cursor, table, sql, rows, where)
+        finally:
+            cursor.close()
+
+    def _run_query(self, cursor: duckdb.DuckDBPyConnection, table: str, sql: str, rows: np.ndarray or None,
+                   where: str or None, params: list = None) -> DataFrame:
+        """Create the 'df' view of a query cursor (the rows of the data table the query can read) and run the query
+        (see :meth:`query`)."""
+        columns = f'* EXCLUDE ({ROW_ID})' if self._row_ids else '*'
+        conditions = []
+        if rows is not None:
+            if rows.dtype == bool:
+                rows = np.flatnonzero(rows)
+            cursor.register(SESSION_ROWS, DataFrame({ROW_ID: rows}))
+            conditions.append(f'{ROW_ID} IN (SELECT {ROW_ID} FROM {SESSION_ROWS})')
+        if where:
+            conditions.append(f'({where})')
+        view = f'SELECT {columns} FROM {table}'
+        if conditions:
+            view += ' WHERE ' + ' AND '.join(conditions)
+        cursor.execute(f'CREATE TEMP VIEW df AS {view}')
+        return cursor.execute(sql, params).df()
+
+    def close(self) -> None:
+        self._connection.close()
+        self._sandbox.close()
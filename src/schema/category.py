@@ -11,3 +11,14 @@ class Category:
 
     def to_dict_simple(self):
         return {}
+
+    def get_state(self) -> dict:
+        """Get the category customizations, to store them (see :meth:`set_state`)."""
+        return {
+            'value': self.value,
+            'synonyms': self.synonyms,
+        }
+
+    def set_state(self, state: dict) -> None:
+        """Restore the stored category customizations (see :meth:`get_state`)."""
+        self.synonyms = {language: list(synonyms) for language, synonyms in state['synonyms'].items()}
@@ -1,6 +1,19 @@
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING
 
-from src.schema.field_schema import FieldSchema
+import pandas as pd
+from pandas import DataFrame, Series
+
+from src.schema.field_schema import FieldSchema, get_dtype_field_type
+from src.schema.field_statistics import FieldStatistics
+from src.schema.field_type import DATETIME, NUMERIC
+from src.schema.sorted_index import SortedIndex
+from src.schema.value_index import ValueIndex
+from src.utils.session_state_keys import SCHEMA_INFERENCE_WORKERS
 
 if TYPE_CHECKING:
     from src.app.project import Project
@@ -8,12 +21,129 @@ if TYPE_CHECKING:
 
 class DataSchema:
 
-    def __init__(self, project: 'Project'):
+    def __init__(self, project: 'Project', state: dict = None):
         self.project: 'Project' = project
         self.field_schemas: list[FieldSchema] = []
+        # Columns converted during the type inference (e.g. datetime columns stored as text)
+        self.parsed_columns: dict[str, Series] = {}
+        # CPU time (in seconds) taken to infer the schema of each field (not the elapsed time, which also counts the
+        # time waiting for the other workers)
+        self.inference_times: dict[str, float] = {}
         # TODO: Add row names
-        for column in self.project.df.columns:
-            self.field_schemas.append(FieldSchema(self, column))
+        if state is not None and self._fits(state):
+            # A stored data schema (see get_state) is restored without inferring it again: the stored data was saved
+            # after the type inference, so its columns already have the inferred types
+            self.field_schemas = [FieldSchema(self, field_state['original_name'], field_state)
+                                  for field_state in state['fields']]
+        else:
+            self._infer_fields()
+
+    def _fits(self, state: dict) -> bool:
+        """Check if a stored data schema (see :meth:`get_state`) still fits the project data: the same fields, with
+        the same types."""
+        df = self.project.df
+        field_states = state['fields']
+        return ([field_state['original_name'] for field_state in field_states] == list(df.columns)
+                and all('num_different_values' in field_state
+                        and get_dtype_field_type(df[field_state['original_name']].dtype) == field_state['type']
+                        for field_state in field_states))
+
+    def _infer_fields(self) -> None:
+        """Infer the schema of all the fields of the project data, on a pool of workers."""
+        columns = list(self.project.df.columns)
+        max_workers = min(self.project.app.properties[SCHEMA_INFERENCE_WORKERS], len(columns))
+        start = time.perf_counter()
+        if max_workers > 1:
+            # The fields are inferred independently (each one only adds its own parsed column), mostly in NumPy and
+            # pandas code
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                self.field_schemas = list(executor.map(self._infer_field, columns))
+        else:
+            self.field_schemas = [self._infer_field(column) for column in columns]
+        slowest = sorted(self.inference_times.items(), key=lambda item: item[1], reverse=True)[:5]
+        logging.info(f'Data schema of {self.project.name} inferred in {time.perf_counter() - start:.2f}s '
+                     f'({len(columns)} fields, {max(max_workers, 1)} workers). Slowest fields: '
+                     + ', '.join(f'{name} ({seconds:.2f}s)' for name, seconds in slowest))
+        if self.parsed_columns:
+            # project.df is shared by all the bot sessions, so it is replaced by a new DataFrame instead of being
+            # modified in place (with copy-on-write, the unchanged columns are not copied)
+            self.project.df = self.project.df.assign(**self.parsed_columns)
+            self.parsed_columns = {}
+
+    def _infer_field(self, name: str) -> FieldSchema:
+        """Infer the schema of a field, timing it (see :attr:`inference_times`)."""
+        start = time.thread_time()
+        field = FieldSchema(self, name)
+        self.inference_times[name] = time.thread_time() - start
+        return field
+
+    def get_column(self, name: str) -> Series:
+        if name in self.parsed_columns:
+            return self.parsed_columns[name]
+        return self.project.df[name]
+
+    def build_indexes(self):
+        """Build the indexes of the project data used to answer the bot queries: a value index for each categorical
+        field and a sorted index for each numeric or datetime field."""
+        df = self.project.df
+        for field in self.field_schemas:
+            if field.categorical:
+                field.value_index = ValueIndex(df, field.original_name)
+            else:
+                field.value_index = None
+            if field.type.t in [NUMERIC, DATETIME] and SortedIndex.supports(df, field.original_name):
+                field.range_index = SortedIndex(df, field.original_name)
+            else:
+                field.range_index = None
+
+    def compute_statistics(self):
+        """Compute the statistics of all the fields of the project data."""
+        for field in self.field_schemas:
+            field.statistics = FieldStatistics(self.project.df, field.original_name)
+
+    def append_rows(self, previous_df: DataFrame) -> bool:
+        """Update the data schema after rows were appended to the project data, without inferring it again.
+
+        The number of values and the categories of each field are updated (see :meth:`FieldSchema.update_values`),
+        and the field statistics and indexes built on the previous data are replaced by copies updated with the new
+        rows (the running queries may still be reading the previous ones), instead of computing them again from all
+        the rows. The statistics and indexes of a field whose dtype changed (e.g. int8
+        values that no longer fit after the append) are computed again.
+
+        Args:
+            previous_df (pandas.DataFrame): the project data before the rows were appended
+
+        Returns:
+            bool: False if the type of a field changed (e.g. text appended to a numeric field), so the data schema
+            could not be updated and must be inferred again
+        """
+        df = self.project.df
+        if any(get_dtype_field_type(df[field.original_name].dtype) != field.type.t for field in self.field_schemas):
+            return False
+        start = len(previous_df)
+        for field in self.field_schemas:
+            name = field.original_name
+            field.update_values(start)
+            dtype, previous_dtype = df[name].dtype, previous_df[name].dtype
+            # Categorical columns keep their dtype even if the appended rows added new categories
+            same_dtype = dtype == previous_dtype or (isinstance(dtype, pd.CategoricalDtype)
+                                                     and isinstance(previous_dtype, pd.CategoricalDtype))
+            if field.statistics is not None and field.statistics.built_on(previous_df):
+                if same_dtype:
+                    field.statistics = field.statistics.appended(df, start)
+                else:
+                    field.statistics = FieldStatistics(df, name)
+            if field.value_index is not None and field.value_index.built_on(previous_df):
+                # Values are indexed by their string representation, whatever their dtype
+                field.value_index = field.value_index.appended(df, start)
+            if field.range_index is not None and field.range_index.built_on(previous_df):
+                if same_dtype:
+                    field.range_index = field.range_index.appended(df, start)
+                elif SortedIndex.supports(df, name):
+                    field.range_index = SortedIndex(df, name)
+                else:
+                    field.range_index = None
+        return True
 
     def get_field(self, name: str):
         for field in self.field_schemas:
@@ -21,6 +151,29 @@ class DataSchema:
                 return field
         return None
 
+    def get_state(self) -> dict:
+        """Get the data schema customizations and the inferred field types, to store them (see :meth:`set_state`)."""
+        return {'fields': [field.get_state() for field in self.field_schemas]}
+
+    def set_state(self, state: dict) -> None:
+        """Restore the stored data schema customizations (see :meth:`get_state`). Only the fields that still exist
+        with the same type are restored."""
+        for field_state in state['fields']:
+            field = self.get_field(field_state['original_name'])
+            if field is not None and field.type.t == field_state['type']:
+                field.set_state(field_state)
+
+    def get_hash(self) -> str:
+        """Get a hash of the data schema (including its customizations) and the shape and types of the project data,
+        used to check if the artifacts of a trained bot are still valid."""
+        df = self.project.df
+        content = {
+            'schema': self.get_state(),
+            'num_rows': len(df),
+            'dtypes': [[str(column), str(dtype)] for column, dtype in df.dtypes.items()],
+        }
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
     def to_dict(self):
         return {field_schema.original_name: field_schema.to_dict() for field_schema in self.field_schemas}
 
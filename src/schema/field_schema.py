@@ -3,41 +3,89 @@ from typing import TYPE_CHECKING
 import pandas as pd
 
 from src.schema.category import Category
+from src.schema.distinct_count import count_distinct
+from src.schema.field_statistics import FieldStatistics
 from src.schema.field_type import BOOLEAN, DATETIME, FieldType, NUMERIC, TEXTUAL
+from src.schema.sorted_index import SortedIndex
+from src.schema.type_inference import infer_text_column
+from src.schema.value_index import ValueIndex
 
 if TYPE_CHECKING:
     from src.schema.data_schema import DataSchema
 
+CATEGORICAL_MAX_VALUES = 9
+"""int: Maximum number of different values of a field to be categorical by default."""
+
+
+def get_dtype_field_type(dtype) -> str or None:
+    """Get the field type of a column from its dtype.
+
+    Args:
+        dtype: the column dtype
+
+    Returns:
+        str or None: the field type, or None if the dtype has no field type (e.g. timedeltas). Text columns (object
+        or categorical dtype) are textual: the data schema converts the ones holding datetimes, numbers or booleans
+        before getting their type (see :func:`~src.schema.type_inference.infer_text_column`)
+    """
+    if pd.api.types.is_bool_dtype(dtype):
+        return BOOLEAN
+    if pd.api.types.is_numeric_dtype(dtype):
+        # Any numeric type (loaded CSV columns are downcast, e.g. to int8 or float32)
+        return NUMERIC
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return DATETIME
+    if isinstance(dtype, pd.CategoricalDtype) or dtype == 'object':
+        return TEXTUAL
+    return None
+
 
 class FieldSchema:
 
-    def __init__(self, data_schema: 'DataSchema', name: str):
+    def __init__(self, data_schema: 'DataSchema', name: str, state: dict = None):
         self.data_schema: 'DataSchema' = data_schema
         self.original_name: str = name
         self.readable_name: str = name
         self.synonyms: dict[str, list[str]] = {'en': []}
-        t = self.data_schema.project.df[self.original_name].dtype
-        if t == 'int64' or t == 'float64':
-            t = NUMERIC
-        elif t == 'bool':
-            # TODO: YES/NO, 0/1 columns, boolean?
-            t = BOOLEAN
-        elif t in ['datetime64[ns]', '<M8[ns]']:
-            t = DATETIME
-        elif t == 'object':
-            # Check if it is datetime
-            if self.infer_datetime_type(self.original_name):
-                t = DATETIME
-            else:
-                t = TEXTUAL
-        self.type: FieldType = FieldType(t)  # TODO: infer type (datetime, etc)
-        self.num_different_values: int = self.data_schema.project.df[self.original_name].nunique()
         self.key: bool = False
-        self._categorical: bool = self.num_different_values < 10
-        self.categories: list[Category] or None = None
-        self._update_categories()
-
         self.tags: list[str] = []
+        # Built when training the bot (see DataSchema.build_indexes)
+        self.value_index: ValueIndex or None = None
+        self.range_index: SortedIndex or None = None
+        self.statistics: FieldStatistics or None = None
+        # The conversion of a field stored as text (see src.schema.type_inference.convert_text), to convert the text
+        # of new rows (e.g. an appended partition) the same way
+        self.conversion: str or None = None
+        if state is not None:
+            # Restored from the stored state, without reading the column (see DataSchema)
+            self.type: FieldType = FieldType(state['type'])
+            self.num_different_values: int = state['num_different_values']
+            self.num_different_values_exact: bool = state['num_different_values_exact']
+            self.conversion = state.get('conversion')
+            self._categorical: bool = state['categorical']
+            self.categories: list[Category] or None = None
+            if state['categories'] is not None:
+                self.categories = [Category(category_state['value']) for category_state in state['categories']]
+            self.set_state(state)
+        else:
+            column = self.data_schema.get_column(self.original_name)
+            t = get_dtype_field_type(column.dtype)
+            if t == TEXTUAL and not self.data_schema.project.out_of_core:
+                # Check if it holds datetimes, numbers or booleans stored as text (the data of out-of-core projects is
+                # typed when it is imported, and converting its sample would not convert the stored data)
+                inferred = infer_text_column(column)
+                if inferred is not None:
+                    column, self.conversion = inferred
+                    self.data_schema.parsed_columns[self.original_name] = column
+                    t = get_dtype_field_type(column.dtype)
+            self.type: FieldType = FieldType(t)
+            # Only counted exactly for low-cardinality fields, estimated for the rest (see count_distinct)
+            num_different_values, exact = count_distinct(column, CATEGORICAL_MAX_VALUES)
+            self.num_different_values: int = num_different_values
+            self.num_different_values_exact: bool = exact
+            self._categorical: bool = self.num_different_values <= CATEGORICAL_MAX_VALUES
+            self.categories: list[Category] or None = None
+            self._update_categories()
 
     @property
     def categorical(self):
@@ -48,6 +96,24 @@ class FieldSchema:
         self._categorical = value
         self._update_categories()
 
+    def update_values(self, start: int) -> None:
+        """Update the number of different values and the categories of the field after rows were appended to the
+        data, keeping the field customizations (the values of the new rows that are not a category yet are added as
+        new categories).
+
+        Args:
+            start (int): the position of the first appended row
+        """
+        column = self.data_schema.get_column(self.original_name)
+        self.num_different_values, self.num_different_values_exact = count_distinct(column, CATEGORICAL_MAX_VALUES)
+        if self._categorical and self.categories is not None:
+            values = {category.value for category in self.categories}
+            for value in column.iloc[start:].unique():
+                category = Category(value)
+                if category.value not in values:
+                    self.categories.append(category)
+                    values.add(category.value)
+
     def get_category(self, value: str) -> Category:
         for category in self.categories:
             if category.value == value:
@@ -57,7 +123,7 @@ class FieldSchema:
     def _update_categories(self):
         if self._categorical and self.categories is None:
             self.categories = []
-            for category in self.data_schema.project.df[self.original_name].unique():
+            for category in self.data_schema.get_column(self.original_name).unique():
                 self.categories.append(Category(category))
 
     def get_category(self, value: str):
@@ -92,18 +158,32 @@ class FieldSchema:
             field_schema_dict['synonyms'] = self.synonyms['en']
         return field_schema_dict
 
-    def infer_datetime_type(self, column_name):
-        df = self.data_schema.project.df
-        # TODO: datetime formats
-        date_formats = [
-            '%m/%d/%Y',
-            '%d/%m/%Y',
-            '%Y/%d/%m',
-        ]
-        for date_format in date_formats:
-            try:
-                df[column_name] = pd.to_datetime(df[column_name], format=date_format)
-                return True
-            except ValueError as e:
-                pass
-        return False
+    def get_state(self) -> dict:
+        """Get the field customizations (readable name, synonyms, flags, categories...) and the inferred type and
+        number of different values, to store them (see :meth:`set_state`)."""
+        return {
+            'original_name': self.original_name,
+            'type': self.type.t,
+            'num_different_values': self.num_different_values,
+            'num_different_values_exact': self.num_different_values_exact,
+            'conversion': self.conversion,
+            'readable_name': self.readable_name,
+            'synonyms': self.synonyms,
+            'key': self.key,
+            'categorical': self.categorical,
+            'tags': self.tags,
+            'categories': [category.get_state() for category in self.categories] if self.categories else None,
+        }
+
+    def set_state(self, state: dict) -> None:
+        """Restore the stored field customizations (see :meth:`get_state`). Categories that are no longer in the data
+        are ignored."""
+        self.readable_name = state['readable_name']
+        self.synonyms = {language: list(synonyms) for language, synonyms in state['synonyms'].items()}
+        self.key = state['key']
+        self.categorical = state['categorical']
+        self.tags = list(state['tags'])
+        for category_state in state['categories'] or []:
+            category = self.get_category(category_state['value'])
+            if category is not None:
+                category.set_state(category_state)
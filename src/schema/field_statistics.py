@@ -0,0 +1,151 @@
+import copy
+import weakref
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+BOX_MAX_OUTLIERS = 1000
+"""int: Maximum number of outliers kept in the box plot statistics of a field."""
+
+
+def get_box_statistics(column: pd.Series) -> dict or None:
+    """Compute the statistics needed to draw the box plot of a numeric column: the quartiles (with linear
+    interpolation, like Plotly), the mean, the whiskers (the furthest values within 1.5 IQR of the box) and the
+    outliers.
+
+    If there are more than :data:`BOX_MAX_OUTLIERS` outliers, an evenly spaced sample of them (always including the
+    most extreme ones) is kept.
+
+    Args:
+        column (pandas.Series): the column
+
+    Returns:
+        dict or None: the box plot statistics, or None if the column is not numeric or has no values
+    """
+    if not pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+        return None
+    # np.sort returns a copy: with copy-on-write, the values of the column are read-only
+    values = np.sort(column.dropna().to_numpy(dtype=np.float64))
+    if len(values) == 0:
+        return None
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    lower = values[np.searchsorted(values, q1 - 1.5 * iqr, side='left')]
+    upper = values[np.searchsorted(values, q3 + 1.5 * iqr, side='right') - 1]
+    outliers = np.concatenate([values[values < lower], values[values > upper]])
+    if len(outliers) > BOX_MAX_OUTLIERS:
+        outliers = np.sort(outliers)[np.linspace(0, len(outliers) - 1, BOX_MAX_OUTLIERS).astype(np.intp)]
+    return {
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'mean': values.mean(),
+        'lowerfence': lower,
+        'upperfence': upper,
+        'outliers': outliers,
+        'count': len(values),
+    }
+
+
+class FieldStatistics:
+    """Statistics of a field, computed once when training the bot to answer the queries that do not depend on the
+    session filters without computing them again.
+
+    Args:
+        df (pandas.DataFrame): the DataFrame containing the field
+        field_name (str): the name of the field
+
+    Attributes:
+        field_name (str): the name of the field
+        value_counts (pandas.Series): the number of rows of each value, sorted by count (like
+            pandas.Series.value_counts)
+        distinct (numpy.ndarray): the distinct values, in order of appearance (like pandas.Series.unique)
+        null_count (int): the number of null values
+        min: the minimum value (numeric and datetime fields), or None
+        max: the maximum value (numeric and datetime fields), or None
+        mean: the mean value (numeric fields), or None
+        sum: the sum of all the values (numeric fields), or None
+        box (dict): the box plot statistics (numeric fields, see :func:`get_box_statistics`), or None
+        _df (weakref.ref): a weak reference to the DataFrame the statistics were computed on
+    """
+
+    def __init__(self, df: DataFrame, field_name: str):
+        self.field_name: str = field_name
+        self._df: weakref.ref = weakref.ref(df)
+        column = df[field_name]
+        self.value_counts: pd.Series = column.value_counts()
+        self.distinct: np.ndarray = column.unique()
+        self.null_count: int = int(column.isna().sum())
+        self.min = None
+        self.max = None
+        self.mean = None
+        self.sum = None
+        self.box: dict or None = None
+        if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            self.min = column.min()
+            self.max = column.max()
+            self.mean = column.mean()
+            self.sum = column.sum()
+            self.box = get_box_statistics(column)
+        elif pd.api.types.is_datetime64_any_dtype(column):
+            self.min = column.min()
+            self.max = column.max()
+
+    def appended(self, df: DataFrame, start: int) -> 'FieldStatistics':
+        """Get the statistics of the DataFrame after rows were appended to the one they were computed on, only reading
+        the new rows (the box plot statistics, which cannot be merged, are computed again).
+
+        The statistics are not modified, as running queries may be reading them: updated statistics are returned.
+
+        Args:
+            df (pandas.DataFrame): the new DataFrame, whose rows before start are the ones the statistics were computed
+                on
+            start (int): the position of the first appended row
+
+        Returns:
+            FieldStatistics: the statistics of the new DataFrame
+        """
+        column = df[self.field_name]
+        rows = column.iloc[start:]
+        statistics = copy.copy(self)
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            # Counting the codes of the whole column is cheap, and the categories of the new rows may have changed
+            statistics.value_counts = column.value_counts()
+            statistics.distinct = column.unique()
+        else:
+            counts = self.value_counts.add(rows.value_counts(), fill_value=0).astype(np.int64)
+            statistics.value_counts = counts.sort_values(ascending=False, kind='stable')
+            statistics.distinct = pd.concat([pd.Series(self.distinct, dtype=column.dtype), rows]).unique()
+        statistics.null_count = self.null_count + int(rows.isna().sum())
+        if self.min is not None:
+            low, high = rows.min(), rows.max()
+            if not pd.isna(low):
+                statistics.min = low if pd.isna(self.min) else min(self.min, low)
+                statistics.max = high if pd.isna(self.max) else max(self.max, high)
+        if self.sum is not None:
+            statistics.sum = self.sum + rows.sum()
+            count = len(column) - statistics.null_count
+            statistics.mean = statistics.sum / count if count else np.nan
+            statistics.box = get_box_statistics(column)
+        statistics._df = weakref.ref(df)
+        return statistics
+
+    def built_on(self, df: DataFrame) -> bool:
+        """Check if the statistics were computed on a specific DataFrame."""
+        return self._df() is df
+
+    def bind(self, df: DataFrame) -> None:
+        """Set the DataFrame the statistics were computed on, after restoring them from disk (only if it contains the
+        same data they were computed on)."""
+        self._df = weakref.ref(df)
+
+    def __getstate__(self) -> dict:
+        # The reference to the DataFrame cannot be stored (see bind)
+        state = self.__dict__.copy()
+        state['_df'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._df = lambda: None
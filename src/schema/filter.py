@@ -1,11 +1,16 @@
 import logging
-from typing import Any
+from typing import Any, TYPE_CHECKING
 
 import numpy as np
 from pandas import DataFrame
 
 from src.schema.field_schema import FieldSchema
 from src.schema.field_type import BOOLEAN, DATETIME, NUMERIC, TEXTUAL
+from src.schema.value_index import get_value_mask
+from src.utils.sql import quote_identifier, sql_literal
+
+if TYPE_CHECKING:
+    from src.app.partition import Partition
 
 numeric_operators = ['=', '!=', '<', '<=', '>', '>=']
 textual_operators = ['equals', 'different', 'contains', 'starts with', 'ends with']
@@ -13,6 +18,13 @@ datetime_operators = ['equals', 'different', 'between', 'before', 'after']
 boolean_operators = ['equals']
 
 
+def freeze_value(value: Any):
+    """Get a hashable version of a filter value (lists of dates or times are converted into tuples)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_value(v) for v in value)
+    return value
+
+
 class Filter:
 
     def __init__(self, field: FieldSchema, operator: str, value: Any):
@@ -26,67 +38,251 @@ class Filter:
         else:
             return False
 
-    def apply(self, df):
+    def get_key(self) -> tuple:
+        """Get the canonical, hashable form of this filter. Equal filters have the same key."""
+        return self.field.original_name, self.operator, freeze_value(self.value)
+
+    def apply(self, df: DataFrame) -> DataFrame:
+        return df[self.get_mask(df)]
+
+    def get_mask(self, df: DataFrame) -> np.ndarray:
+        """Get the boolean row mask of this filter over a DataFrame, without materializing the filtered rows.
+
+        Args:
+            df (pandas.DataFrame): the DataFrame to evaluate the filter on
+
+        Returns:
+            numpy.ndarray: a boolean array with one element per row of df, True for the rows passing the filter
+        """
         if self.field.type.t == NUMERIC:
-            return self.apply_numeric_filter(df)
+            return self.get_numeric_mask(df)
         if self.field.type.t == TEXTUAL:
-            return self.apply_textual_filter(df)
+            return self.get_textual_mask(df)
         if self.field.type.t == DATETIME:
-            return self.apply_datetime_filter(df)
+            return self.get_datetime_mask(df)
         if self.field.type.t == BOOLEAN:
-            return self.apply_boolean_filter(df)
+            return self.get_boolean_mask(df)
+        return np.ones(len(df), dtype=bool)
+
+    def get_sql(self) -> str:
+        """Get the SQL condition of this filter, to push it down to the SQL engine of an out-of-core project (see
+        :class:`~src.app.sql_engine.SQLEngine`). It selects the same rows as :meth:`get_mask`.
+
+        Returns:
+            str: the SQL condition
+        """
+        column = quote_identifier(self.field.original_name)
+        if self.field.type.t == NUMERIC:
+            operators = {'=': '=', '!=': 'IS DISTINCT FROM', '<': '<', '<=': '<=', '>': '>', '>=': '>='}
+            if self.operator in operators:
+                return f'{column} {operators[self.operator]} {sql_literal(self.value)}'
+        elif self.field.type.t == TEXTUAL:
+            # Like the value index, values are compared by their string representation
+            text = f'CAST({column} AS VARCHAR)'
+            value = sql_literal(str(self.value))
+            if self.operator == 'equals':
+                return f'{text} = {value}'
+            if self.operator == 'different':
+                return f'{text} IS DISTINCT FROM {value}'
+            if self.operator == 'contains':
+                # pandas.Series.str.contains matches a regular expression
+                return f'coalesce(regexp_matches({text}, {value}), FALSE)'
+            if self.operator == 'starts with':
+                return f'coalesce(starts_with({text}, {value}), FALSE)'
+            if self.operator == 'ends with':
+                return f'coalesce(ends_with({text}, {value}), FALSE)'
+        elif self.field.type.t == DATETIME:
+            dates = [sql_literal(np.datetime64(date)) for date, time in self.value]
+            if self.operator == 'equals':
+                return f'{column} = {dates[0]}'
+            if self.operator == 'different':
+                return f'{column} IS DISTINCT FROM {dates[0]}'
+            if self.operator == 'between':
+                return f'{column} BETWEEN {dates[0]} AND {dates[1]}'
+            if self.operator == 'before':
+                return f'{column} < {dates[0]}'
+            if self.operator == 'after':
+                return f'{column} > {dates[0]}'
+        elif self.field.type.t == BOOLEAN:
+            if self.operator == 'equals':
+                return f'{column} = {sql_literal(self.value)}'
+        logging.warning('No SQL filter could be applied')
+        return 'TRUE'
+
+    def can_match(self, partition: 'Partition') -> bool:
+        """Check if any row of a data partition may pass this filter, given the range of values of the filter field in
+        the partition. Partitions where no row can pass the filter are skipped.
+
+        Args:
+            partition (Partition): the data partition
+
+        Returns:
+            bool: False if no row of the partition can pass the filter, True otherwise (i.e. if some rows may pass it)
+        """
+        if self.operator in ['!=', 'different']:
+            return True
+        try:
+            value_range = partition.get_value_range(self.field.original_name)
+        except KeyError:
+            return True
+        if value_range is None:
+            # All the values of the partition are null, so no comparison can be true
+            return False
+        low, high = value_range
+        try:
+            if self.field.type.t == NUMERIC and self.value is not None:
+                value = self.value
+                conditions = {
+                    '=': low <= value <= high,
+                    '<': low < value,
+                    '<=': low <= value,
+                    '>': high > value,
+                    '>=': high >= value,
+                }
+            elif self.field.type.t == DATETIME:
+                dates = [np.datetime64(date) for date, time in self.value]
+                if any(np.isnat(date) for date in dates):
+                    return True
+                conditions = {
+                    'equals': low <= dates[0] <= high,
+                    'before': low < dates[0],
+                    'after': high > dates[0],
+                }
+                if len(dates) > 1:
+                    conditions['between'] = low <= dates[1] and dates[0] <= high
+            else:
+                return True
+        except TypeError:
+            # Values that cannot be compared (e.g. dates with and without time zone)
+            return True
+        return bool(conditions.get(self.operator, True))
+
+    def get_indexed_mask(self, df: DataFrame) -> np.ndarray or None:
+        """Get the boolean row mask of this filter using the field indexes (see :meth:`get_indexed_range_mask` and the
+        field's value index).
+
+        Returns:
+            numpy.ndarray or None: the row mask, or None if the filter cannot be resolved with an index
+        """
+        if self.field.type.t in [NUMERIC, DATETIME]:
+            return self.get_indexed_range_mask(df)
+        if self.field.type.t == TEXTUAL:
+            value_index = self.field.value_index
+            if value_index is not None and value_index.built_on(df):
+                if self.operator == 'equals':
+                    return value_index.get_mask(self.value)
+                if self.operator == 'different':
+                    return ~value_index.get_mask(self.value)
+        return None
+
+    def get_indexed_range_mask(self, df: DataFrame) -> np.ndarray or None:
+        """Get the boolean row mask of a numeric or datetime filter using the field's sorted index, so the filter is
+        resolved with 2 binary searches instead of comparing the whole column.
+
+        Returns:
+            numpy.ndarray or None: the row mask, or None if the filter cannot be resolved with the sorted index
+        """
+        range_index = self.field.range_index
+        if range_index is None or not range_index.built_on(df):
+            return None
+        if self.field.type.t == NUMERIC:
+            if self.value is None:
+                return None
+            value = self.value
+            # operator: (lower, upper, include_lower, include_upper, negate)
+            ranges = {
+                '=': (value, value, True, True, False),
+                '!=': (value, value, True, True, True),
+                '<': (None, value, True, False, False),
+                '<=': (None, value, True, True, False),
+                '>': (value, None, False, True, False),
+                '>=': (value, None, True, True, False),
+            }
+        elif self.field.type.t == DATETIME:
+            dates = [np.datetime64(date) for date, time in self.value]
+            if any(np.isnat(date) for date in dates):
+                return None
+            ranges = {
+                'equals': (dates[0], dates[0], True, True, False),
+                'different': (dates[0], dates[0], True, True, True),
+                'before': (None, dates[0], True, False, False),
+                'after': (dates[0], None, False, True, False),
+            }
+            if len(dates) > 1:
+                ranges['between'] = (dates[0], dates[1], True, True, False)
+        else:
+            return None
+        if self.operator not in ranges:
+            return None
+        lower, upper, include_lower, include_upper, negate = ranges[self.operator]
+        mask = range_index.get_mask(lower, upper, include_lower, include_upper)
+        return ~mask if negate else mask
 
-    def apply_numeric_filter(self, df: DataFrame):
+    def get_numeric_mask(self, df: DataFrame) -> np.ndarray:
+        mask = self.get_indexed_range_mask(df)
+        if mask is not None:
+            return mask
+        column = df[self.field.original_name]
         if self.operator == '=':
-            return df[df[self.field.original_name] == self.value]
+            return (column == self.value).to_numpy()
         elif self.operator == '!=':
-            return df[df[self.field.original_name] != self.value]
+            return (column != self.value).to_numpy()
         elif self.operator == '<':
-            return df[df[self.field.original_name] < self.value]
+            return (column < self.value).to_numpy()
         elif self.operator == '<=':
-            return df[df[self.field.original_name] <= self.value]
+            return (column <= self.value).to_numpy()
         elif self.operator == '>':
-            return df[df[self.field.original_name] > self.value]
+            return (column > self.value).to_numpy()
         elif self.operator == '>=':
-            return df[df[self.field.original_name] >= self.value]
+            return (column >= self.value).to_numpy()
         logging.warning('No numeric filter could be applied')
-        return df
+        return np.ones(len(df), dtype=bool)
 
-    def apply_textual_filter(self, df: DataFrame):
+    def get_textual_mask(self, df: DataFrame) -> np.ndarray:
+        # Resolve equality conditions with the field's value index instead of comparing the whole column
+        mask = self.get_indexed_mask(df)
+        if mask is not None:
+            return mask
+        column = df[self.field.original_name]
+        # Like the value index, values are compared by their string representation
         if self.operator == 'equals':
-            return df[df[self.field.original_name] == self.value]
+            return get_value_mask(column, self.value)
         if self.operator == 'different':
-            return df[df[self.field.original_name] != self.value]
+            return ~get_value_mask(column, self.value)
         if self.operator == 'contains':
-            return df[df[self.field.original_name].str.contains(self.value)]
+            return column.str.contains(self.value, na=False).to_numpy(dtype=bool)
         if self.operator == 'starts with':
-            return df[df[self.field.original_name].str.startswith(self.value)]
+            return column.str.startswith(self.value, na=False).to_numpy(dtype=bool)
         if self.operator == 'ends with':
-            return df[df[self.field.original_name].str.endswith(self.value)]
+            return column.str.endswith(self.value, na=False).to_numpy(dtype=bool)
         logging.warning('No textual filter could be applied')
-        return df
+        return np.ones(len(df), dtype=bool)
 
-    def apply_datetime_filter(self, df: DataFrame):
+    def get_datetime_mask(self, df: DataFrame) -> np.ndarray:
         # datetime value: [(date, time)]
         # date or time can be None
         # if operator is 'between': [(date1, time1), (date2, time2)]
         # date1 and date2, or time1 and time2, can be null
         # TODO: Use the time field for the datetime filter
+        mask = self.get_indexed_range_mask(df)
+        if mask is not None:
+            return mask
+        column = df[self.field.original_name]
         if self.operator == 'equals':
-            return df[df[self.field.original_name] == np.datetime64(self.value[0][0])]
+            return (column == np.datetime64(self.value[0][0])).to_numpy()
         if self.operator == 'different':
-            return df[df[self.field.original_name] != np.datetime64(self.value[0][0])]
+            return (column != np.datetime64(self.value[0][0])).to_numpy()
         if self.operator == 'between':
-            return df[(np.datetime64(self.value[0][0]) <= df[self.field.original_name]) & (df[self.field.original_name] <= np.datetime64(self.value[1][0]))]
+            return ((np.datetime64(self.value[0][0]) <= column) & (column <= np.datetime64(self.value[1][0]))).to_numpy()
         if self.operator == 'before':
-            return df[df[self.field.original_name] < np.datetime64(self.value[0][0])]
+            return (column < np.datetime64(self.value[0][0])).to_numpy()
         if self.operator == 'after':
-            return df[df[self.field.original_name] > np.datetime64(self.value[0][0])]
+            return (column > np.datetime64(self.value[0][0])).to_numpy()
         logging.warning('No datetime filter could be applied')
-        return df
+        return np.ones(len(df), dtype=bool)
 
-    def apply_boolean_filter(self, df: DataFrame):
+    def get_boolean_mask(self, df: DataFrame) -> np.ndarray:
         if self.operator == 'equals':
-            return df[df[self.field.original_name] == self.value]
+            return (df[self.field.original_name] == self.value).to_numpy()
         logging.warning('No textual filter could be applied')
-        return df
+        return np.ones(len(df), dtype=bool)
@@ -0,0 +1,151 @@
+import copy
+import weakref
+
+import numpy as np
+from pandas import DataFrame
+
+from src.schema.value_index import get_positions_dtype
+
+
+class SortedIndex:
+    """Sorted permutation index of a numeric or datetime field: the row positions sorted by the field value.
+
+    It is used to resolve range conditions (<, <=, >, >=, between...) with 2 binary searches instead of comparing the
+    whole column, and to get the rows with the highest/lowest values without sorting the data again. Null values are
+    not indexed.
+
+    Args:
+        df (pandas.DataFrame): the DataFrame to index
+        field_name (str): the name of the indexed field
+
+    Attributes:
+        field_name (str): the name of the indexed field
+        num_rows (int): the number of rows of the indexed DataFrame
+        _df (weakref.ref): a weak reference to the indexed DataFrame
+        _positions (numpy.ndarray): the non-null row positions, sorted by value
+        _sorted_values (numpy.ndarray): the non-null values, sorted
+    """
+
+    def __init__(self, df: DataFrame, field_name: str):
+        self.field_name: str = field_name
+        self.num_rows: int = len(df)
+        self._df: weakref.ref = weakref.ref(df)
+        column = df[field_name]
+        positions = np.flatnonzero(column.notna().to_numpy())
+        values = column.to_numpy()[positions]
+        order = np.argsort(values, kind='stable')
+        self._positions: np.ndarray = positions[order].astype(get_positions_dtype(self.num_rows))
+        self._sorted_values: np.ndarray = values[order]
+
+    @staticmethod
+    def supports(df: DataFrame, field_name: str) -> bool:
+        """Check if a field can be indexed, i.e. its values are stored as numeric or datetime64 numpy arrays."""
+        dtype = df[field_name].dtype
+        return isinstance(dtype, np.dtype) and (np.issubdtype(dtype, np.number) or np.issubdtype(dtype, np.datetime64))
+
+    def built_on(self, df: DataFrame) -> bool:
+        """Check if the index was built on a specific DataFrame (i.e. its positions are valid for it)."""
+        return self._df() is df
+
+    def bind(self, df: DataFrame) -> None:
+        """Set the DataFrame the index was built on, after restoring it from disk (only if it contains the same data
+        it was built on)."""
+        self._df = weakref.ref(df)
+
+    def __getstate__(self) -> dict:
+        # The reference to the DataFrame cannot be stored (see bind)
+        state = self.__dict__.copy()
+        state['_df'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._df = lambda: None
+
+    def appended(self, df: DataFrame, start: int) -> 'SortedIndex':
+        """Get the index of the DataFrame after rows were appended to the indexed one: the new rows are sorted and
+        merged into the index (after the indexed rows with the same value), without sorting the indexed rows again.
+
+        The index is not modified, as running queries may be reading it: a new index is returned.
+
+        Args:
+            df (pandas.DataFrame): the new DataFrame, whose rows before start are the indexed ones. The field must keep
+                the indexed dtype
+            start (int): the position of the first appended row
+
+        Returns:
+            SortedIndex: the index of the new DataFrame
+        """
+        added = SortedIndex(df.iloc[start:], self.field_name)
+        index = copy.copy(self)
+        index.num_rows = len(df)
+        dtype = get_positions_dtype(index.num_rows)
+        insertions = np.searchsorted(self._sorted_values, added._sorted_values, side='right')
+        index._positions = np.insert(self._positions.astype(dtype), insertions, added._positions.astype(dtype) + start)
+        index._sorted_values = np.insert(self._sorted_values, insertions, added._sorted_values)
+        index._df = weakref.ref(df)
+        return index
+
+    def get_positions(self, lower=None, upper=None, include_lower: bool = True,
+                      include_upper: bool = True) -> np.ndarray:
+        """Get the positions of the rows with a value within a range (in value order, not row order).
+
+        Args:
+            lower: the lower bound of the range, or None for no lower bound
+            upper: the upper bound of the range, or None for no upper bound
+            include_lower (bool): whether the lower bound is included in the range
+            include_upper (bool): whether the upper bound is included in the range
+
+        Returns:
+            numpy.ndarray: the row positions
+        """
+        start = 0
+        end = len(self._sorted_values)
+        if lower is not None:
+            start = np.searchsorted(self._sorted_values, lower, side='left' if include_lower else 'right')
+        if upper is not None:
+            end = np.searchsorted(self._sorted_values, upper, side='right' if include_upper else 'left')
+        return self._positions[start:max(start, end)]
+
+    def get_mask(self, lower=None, upper=None, include_lower: bool = True, include_upper: bool = True) -> np.ndarray:
+        """Get the boolean row mask of the rows with a value within a range (see :meth:`get_positions`)."""
+        mask = np.zeros(self.num_rows, dtype=bool)
+        mask[self.get_positions(lower, upper, include_lower, include_upper)] = True
+        return mask
+
+    def get_top_positions(self, number: int, largest: bool, rows: np.ndarray or None = None) -> np.ndarray:
+        """Get the positions of the rows with the highest (or lowest) values, keeping all the ties of the last value
+        (like pandas.DataFrame.nlargest/nsmallest with keep='all').
+
+        Args:
+            number (int): the number of values to get
+            largest (bool): True to get the highest values, False to get the lowest ones
+            rows (numpy.ndarray or None): only consider these rows (a boolean row mask or the sorted row
+                positions), or None to consider all the rows
+
+        Returns:
+            numpy.ndarray: the row positions, sorted by value (descending if largest) and then by position
+        """
+        positions = self._positions
+        values = self._sorted_values
+        if rows is not None:
+            keep = rows[positions] if rows.dtype == bool else np.isin(positions, rows, assume_unique=True)
+            positions = positions[keep]
+            values = values[keep]
+        if number <= 0 or len(values) == 0:
+            return positions[:0]
+        if largest:
+            start = np.searchsorted(values, values[max(len(values) - number, 0)], side='left')
+            positions = positions[start:][::-1]
+            values = values[start:][::-1]
+        else:
+            end = np.searchsorted(values, values[min(number, len(values)) - 1], side='right')
+            positions = positions[:end]
+            values = values[:end]
+        # Sort the ties by position
+        groups = np.cumsum(np.concatenate(([True], values[1:] != values[:-1])))
+        return positions[np.lexsort((positions, groups))]
+
+    @property
+    def nbytes(self) -> int:
+        return self._positions.nbytes + self._sorted_values.nbytes
@@ -0,0 +1,218 @@
+import numpy as np
+import pandas as pd
+
+INFERENCE_SAMPLE_SIZE = 1000
+"""int: Number of values of a text column tested against each candidate type. Only the winning type is then applied
+to the whole column."""
+
+DATETIME_FORMATS = [
+    # ISO 8601
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%SZ',
+    '%Y-%m-%dT%H:%M:%S.%fZ',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y/%m/%d',
+    # Month first
+    '%m/%d/%Y',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    # Day first (European)
+    '%d/%m/%Y',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d-%m-%Y',
+    '%d-%m-%Y %H:%M:%S',
+    '%d.%m.%Y',
+    '%d.%m.%Y %H:%M:%S',
+    '%Y/%d/%m',
+]
+"""list[str]: Datetime formats recognized in text columns, in order of preference (e.g. 01/02/2024 is read month
+first)."""
+
+EPOCH_UNITS = {10: 's', 13: 'ms'}
+"""dict[int, str]: Units of the Unix timestamps recognized in text columns, by their number of digits."""
+
+EPOCH_RANGE = (pd.Timestamp('1990-01-01'), pd.Timestamp('2100-01-01'))
+"""tuple[pandas.Timestamp, pandas.Timestamp]: Range of the Unix timestamps recognized in text columns (other integers
+with the same number of digits are more likely to be identifiers)."""
+
+BOOLEAN_VALUES = [('true', 'false'), ('yes', 'no')]
+"""list[tuple[str, str]]: True and false values recognized (case-insensitively) in text columns."""
+
+NUMBER_CONVERSION = 'number'
+"""str: Conversion of text to numbers (see :func:`convert_text`)."""
+
+BOOLEAN_CONVERSION = 'boolean'
+"""str: Conversion of text to booleans (see :func:`convert_text`)."""
+
+EPOCH_CONVERSION_PREFIX = 'epoch_'
+"""str: Prefix of the conversions of Unix timestamps to datetimes, followed by their unit (see :func:`convert_text`)."""
+
+
+def get_sample(values: pd.Series, size: int = INFERENCE_SAMPLE_SIZE) -> pd.Series:
+    """Get a stratified sample of the non-null values of a column: values evenly spaced across all the rows, so every
+    part of the data (e.g. each file of a concatenated dataset) is represented.
+
+    Args:
+        values (pandas.Series): the column
+        size (int): the maximum number of values of the sample
+
+    Returns:
+        pandas.Series: the distinct values of the sample
+    """
+    values = values.dropna()
+    if len(values) > size:
+        values = values.iloc[np.linspace(0, len(values) - 1, size).astype(np.intp)]
+    return pd.Series(values.unique(), dtype=object)
+
+
+def find_datetime_formats(sample: pd.Series) -> list[str]:
+    """Get the :data:`DATETIME_FORMATS` that all the values of a sample of text match, in order of preference (e.g.
+    both the month first and day first formats, if no day of the sample is after the 12th)."""
+    datetime_formats = []
+    for datetime_format in DATETIME_FORMATS:
+        # The first value rejects most of the formats without parsing the whole sample
+        if pd.isna(pd.to_datetime(sample.iloc[0], format=datetime_format, errors='coerce')):
+            continue
+        if pd.to_datetime(sample, format=datetime_format, errors='coerce').notna().all():
+            datetime_formats.append(datetime_format)
+    return datetime_formats
+
+
+def find_epoch_unit(sample: pd.Series) -> str or None:
+    """Get the unit of the Unix timestamps of a sample of text (see :data:`EPOCH_UNITS`), or None if its values are not
+    timestamps within :data:`EPOCH_RANGE`."""
+    lengths = sample.str.len()
+    unit = EPOCH_UNITS.get(int(lengths.iloc[0]))
+    if unit is None or not (lengths == lengths.iloc[0]).all() or not sample.str.isdecimal().all():
+        return None
+    datetimes = pd.to_datetime(sample.astype(np.int64), unit=unit)
+    if datetimes.min() < EPOCH_RANGE[0] or datetimes.max() > EPOCH_RANGE[1]:
+        return None
+    return unit
+
+
+def to_number(values: pd.Series) -> pd.Series:
+    """Convert text to numbers (the values that are not a number become null). Numbers with a decimal comma and no
+    other separator (e.g. 3,5) are also recognized."""
+    numbers = pd.to_numeric(values, errors='coerce')
+    invalid = (numbers.isna() & values.notna()).to_numpy()
+    if invalid.any():
+        text = values[invalid].astype(str)
+        decimal_comma = text.str.fullmatch(r'\s*[-+]?\d*,\d+\s*').to_numpy()
+        if decimal_comma.any():
+            numbers = numbers.to_numpy(dtype=np.float64, copy=True)
+            numbers[np.flatnonzero(invalid)[decimal_comma]] = pd.to_numeric(
+                text[decimal_comma].str.replace(',', '.')).to_numpy()
+            numbers = pd.Series(numbers, index=values.index, name=values.name)
+    return numbers
+
+
+def to_boolean(values: pd.Series) -> pd.Series:
+    """Convert text to booleans (see :data:`BOOLEAN_VALUES`), or to null if a value is not a boolean."""
+    text = values.astype(str).str.strip().str.lower()
+    for true_value, false_value in BOOLEAN_VALUES:
+        booleans = text.map({true_value: True, false_value: False})
+        if booleans.notna().any():
+            return booleans
+    return pd.Series(np.nan, index=values.index, dtype=object)
+
+
+def get_conversions(sample: pd.Series) -> list[str]:
+    """Get the conversions (from text to a candidate type, see :func:`convert_text`) that all the values of a sample
+    of text pass, in order of preference: datetimes (one per matching format), Unix timestamps, numbers and booleans."""
+    conversions = find_datetime_formats(sample)
+    epoch_unit = find_epoch_unit(sample)
+    if epoch_unit is not None:
+        conversions.append(EPOCH_CONVERSION_PREFIX + epoch_unit)
+    if to_number(sample).notna().all():
+        conversions.append(NUMBER_CONVERSION)
+    if to_boolean(sample).notna().all():
+        conversions.append(BOOLEAN_CONVERSION)
+    return conversions
+
+
+def convert_text(values: pd.Series, conversion: str) -> pd.Series:
+    """Convert text to another type (the values that cannot be converted become null).
+
+    Args:
+        values (pandas.Series): the text values
+        conversion (str): a datetime format (see :data:`DATETIME_FORMATS`), :data:`EPOCH_CONVERSION_PREFIX` followed
+            by the unit of the Unix timestamps, :data:`NUMBER_CONVERSION` or :data:`BOOLEAN_CONVERSION`
+
+    Returns:
+        pandas.Series: the converted values
+    """
+    if conversion == NUMBER_CONVERSION:
+        return to_number(values)
+    if conversion == BOOLEAN_CONVERSION:
+        return to_boolean(values)
+    if conversion.startswith(EPOCH_CONVERSION_PREFIX):
+        return pd.to_datetime(pd.to_numeric(values, errors='coerce'), unit=conversion[len(EPOCH_CONVERSION_PREFIX):])
+    return pd.to_datetime(values, format=conversion, errors='coerce')
+
+
+def convert_text_column(column: pd.Series, conversion: str) -> pd.Series or None:
+    """Convert a text column (object or categorical) to another type (see :func:`convert_text`). Categorical columns
+    are converted by converting their categories only.
+
+    Args:
+        column (pandas.Series): the column
+        conversion (str): the conversion
+
+    Returns:
+        pandas.Series or None: the converted column, or None if one of its values cannot be converted
+    """
+    categorical = isinstance(column.dtype, pd.CategoricalDtype)
+    values = pd.Series(column.cat.categories, dtype=object) if categorical else column
+    converted = convert_text(values, conversion)
+    if converted.notna().sum() != values.notna().sum():
+        return None
+    if converted.dtype == object:
+        # Booleans (only when there are no null values, as numpy booleans cannot be null)
+        if column.isna().any():
+            return None
+        converted = converted.astype(bool)
+    if categorical:
+        codes = column.cat.codes.to_numpy()
+        nulls = codes == -1
+        converted = converted.to_numpy()
+        if nulls.any() and converted.dtype.kind in 'iu':
+            converted = converted.astype(np.float64)
+        converted = converted[codes]
+        if nulls.any():
+            converted[nulls] = np.datetime64('NaT') if converted.dtype.kind == 'M' else np.nan
+    return pd.Series(converted, index=column.index, name=column.name)
+
+
+def infer_text_column(column: pd.Series) -> tuple[pd.Series, str] or None:
+    """Detect if a text column (object or categorical) holds datetimes, Unix timestamps, numbers or booleans, and
+    convert it.
+
+    The candidate types are tested against a stratified sample of the column (see :func:`get_sample`), and the whole
+    column is only converted to the first candidate its sample matched. If a value outside the sample does not match
+    it, the next candidate is tried.
+
+    The column is not modified: project.df is shared across sessions, so the converted column is returned and the
+    DataSchema replaces it in the project DataFrame.
+
+    Args:
+        column (pandas.Series): the column
+
+    Returns:
+        tuple[pandas.Series, str] or None: the converted column and the conversion applied to it (see
+        :func:`convert_text`, to convert new rows of the column the same way), or None if it is text
+    """
+    values = pd.Series(column.cat.categories, dtype=object) if isinstance(column.dtype, pd.CategoricalDtype) else column
+    sample = get_sample(values)
+    if sample.empty or not all(isinstance(value, str) for value in sample):
+        return None
+    for conversion in get_conversions(sample):
+        converted = convert_text_column(column, conversion)
+        if converted is not None:
+            return converted, conversion
+    return None
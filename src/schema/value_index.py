@@ -0,0 +1,133 @@
+import copy
+import weakref
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+
+def get_positions_dtype(num_rows: int) -> np.dtype:
+    """Get the smallest integer dtype able to store the row positions of a DataFrame."""
+    return np.dtype(np.int32) if num_rows < np.iinfo(np.int32).max else np.dtype(np.intp)
+
+
+def get_value_mask(column: pd.Series, value) -> np.ndarray:
+    """Get the boolean row mask of the rows of a column containing a value without an index, comparing their string
+    representations like :class:`ValueIndex` (so both select the same rows). Null values never match.
+
+    Args:
+        column (pandas.Series): the column
+        value: the value
+
+    Returns:
+        numpy.ndarray: the row mask
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Only the categories are compared. Null values (code -1) take the last element, which is False
+        matches = np.append(column.cat.categories.astype(str) == str(value), False)
+        return matches[column.cat.codes.to_numpy()]
+    return (column.astype(str) == str(value)).to_numpy() & column.notna().to_numpy()
+
+
+class ValueIndex:
+    """Inverted index of a (categorical) field: for each value, the sorted positions of the rows containing it.
+
+    It is used to resolve equality conditions (field = value) with a lookup instead of comparing the whole column.
+    Values are indexed by their string representation, like the field :class:`~src.schema.category.Category` values.
+
+    Args:
+        df (pandas.DataFrame): the DataFrame to index
+        field_name (str): the name of the indexed field
+
+    Attributes:
+        field_name (str): the name of the indexed field
+        num_rows (int): the number of rows of the indexed DataFrame
+        _df (weakref.ref): a weak reference to the indexed DataFrame
+        _positions (numpy.ndarray): the non-null row positions, grouped by value and sorted within each group
+        _slices (dict[str, tuple[int, int]]): for each value, the start and end of its group in _positions
+    """
+
+    def __init__(self, df: DataFrame, field_name: str):
+        self.field_name: str = field_name
+        self.num_rows: int = len(df)
+        self._df: weakref.ref = weakref.ref(df)
+        column = df[field_name]
+        codes, uniques = pd.factorize(column.astype(str).where(column.notna()))
+        # A stable sort keeps the positions of each value in ascending order. Null values (code -1) go first
+        order = np.argsort(codes, kind='stable')
+        num_nulls = int(np.count_nonzero(codes == -1))
+        self._positions: np.ndarray = order[num_nulls:].astype(get_positions_dtype(self.num_rows))
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        ends = np.cumsum(counts)
+        self._slices: dict[str, tuple[int, int]] = {
+            value: (int(end - count), int(end)) for value, count, end in zip(uniques, counts, ends)
+        }
+
+    def appended(self, df: DataFrame, start: int) -> 'ValueIndex':
+        """Get the index of the DataFrame after rows were appended to the indexed one, only indexing the new rows.
+
+        The index is not modified, as running queries may be reading it: a new index is returned.
+
+        Args:
+            df (pandas.DataFrame): the new DataFrame, whose rows before start are the indexed ones
+            start (int): the position of the first appended row
+
+        Returns:
+            ValueIndex: the index of the new DataFrame
+        """
+        added = ValueIndex(df.iloc[start:], self.field_name)
+        index = copy.copy(self)
+        index.num_rows = len(df)
+        dtype = get_positions_dtype(index.num_rows)
+        groups = []
+        slices = {}
+        end = 0
+        for value in list(self._slices) + [value for value in added._slices if value not in self._slices]:
+            positions = [self.get_positions(value).astype(dtype), added.get_positions(value).astype(dtype) + start]
+            groups.extend(positions)
+            count = len(positions[0]) + len(positions[1])
+            slices[value] = (end, end + count)
+            end += count
+        index._positions = np.concatenate(groups) if groups else self._positions.astype(dtype)
+        index._slices = slices
+        index._df = weakref.ref(df)
+        return index
+
+    def built_on(self, df: DataFrame) -> bool:
+        """Check if the index was built on a specific DataFrame (i.e. its positions are valid for it)."""
+        return self._df() is df
+
+    def bind(self, df: DataFrame) -> None:
+        """Set the DataFrame the index was built on, after restoring it from disk (only if it contains the same data
+        it was built on)."""
+        self._df = weakref.ref(df)
+
+    def __getstate__(self) -> dict:
+        # The reference to the DataFrame cannot be stored (see bind)
+        state = self.__dict__.copy()
+        state['_df'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._df = lambda: None
+
+    def get_positions(self, value) -> np.ndarray:
+        """Get the sorted positions of the rows containing a value (empty if the value does not exist)."""
+        start, end = self._slices.get(str(value), (0, 0))
+        return self._positions[start:end]
+
+    def count(self, value) -> int:
+        """Get the number of rows containing a value."""
+        start, end = self._slices.get(str(value), (0, 0))
+        return end - start
+
+    def get_mask(self, value) -> np.ndarray:
+        """Get the boolean row mask of the rows containing a value."""
+        mask = np.zeros(self.num_rows, dtype=bool)
+        mask[self.get_positions(value)] = True
+        return mask
+
+    @property
+    def nbytes(self) -> int:
+        return self._positions.nbytes
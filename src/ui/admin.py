@@ -1,17 +1,26 @@
+import itertools
+import os
+import shutil
+import tempfile
 import time
-from io import StringIO
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-import chardet
+import duckdb
 import pandas as pd
 import requests
 import streamlit as st
 import streamlit_antd_components as sac
 
 from src.app.app import get_app
+from src.app.data_source import SOURCE_APPENDED, SOURCE_REPLACED, DataSource
 from src.app.project import Project
 from src.schema.data_schema import DataSchema
 from src.schema.field_type import BOOLEAN, DATETIME, NUMERIC, TEXTUAL
+from src.utils.csv_loader import read_csv
+from src.utils.ckan import CKAN_CATALOG_TTL, iter_packages
 from src.utils.data_schema_enhancement import data_schema_enhancement
+from src.utils.download import DOWNLOAD_MAX_WORKERS, DownloadTooLargeError, create_http_session, download_to_file
+from src.utils.encoding_detection import ENCODING_DETECTION_MAX_BYTES, FALLBACK_ENCODING, detect_encoding
 from src.utils.session_state_keys import AI_ICON, CKAN, COUNT_CSVS, COUNT_DATASETS, EDITED_PACKAGES_DF, IMPORT, \
     IMPORT_OPEN_DATA_PORTAL, METADATA, OPEN_DATA_SOURCES, SELECTED_PROJECT, SELECT_ALL_CHECKBOXES, TITLE, UDATA, \
     UPLOAD_DATA
@@ -53,19 +62,41 @@ def upload_data():
     st.header('Upload data')
     with st.form(UPLOAD_DATA, clear_on_submit=True):
         project_name = st.text_input(label='Project name', placeholder='Example: sales_project')
-        uploaded_file = st.file_uploader(label="Choose a file", type='csv')
+        uploaded_files = st.file_uploader(
+            label="Choose a file",
+            type='csv',
+            accept_multiple_files=True,
+            help='Files with the same fields (e.g. one file per year) can be uploaded together as partitions of the project'
+        )
         delimiter = st.text_input(label='Delimiter', value=',')
+        out_of_core = out_of_core_checkbox()
         submitted = st.form_submit_button(label="Create project", type='primary')
         if submitted:
-            if uploaded_file is None:
+            if not uploaded_files:
                 st.error('Please add a dataset to the project')
             else:
+                uploaded_file = uploaded_files[0]
                 if project_name is None or project_name == '':
                     project_name = uploaded_file.name[:-4]  # remove .csv file extension
                 if project_name in [project.name for project in app.projects]:
                     st.error(f"The project name '{project_name}' already exists. Please choose another one")
                 else:
-                    project = Project(app, project_name, pd.read_csv(uploaded_file, delimiter=delimiter))
+                    if out_of_core:
+                        try:
+                            project = import_uploaded_csv(project_name, uploaded_file, delimiter)
+                        except duckdb.Error as e:
+                            st.error(f'{uploaded_file.name} could not be imported: {e}')
+                            return
+                    else:
+                        df, original_memory_usage = read_uploaded_csv(uploaded_file, delimiter)
+                        project = Project(app, project_name, df, original_memory_usage,
+                                          partition_key=uploaded_file.name)
+                    for uploaded_file in uploaded_files[1:]:
+                        try:
+                            df, original_memory_usage = read_uploaded_csv(uploaded_file, delimiter)
+                            project.append_partition(uploaded_file.name, df, original_memory_usage)
+                        except ValueError as e:
+                            st.error(f'{uploaded_file.name} could not be added to the project: {e}')
                     st.session_state[SELECTED_PROJECT] = project
                     st.info(f'The project **{project.name}** has been created! Go to **Manage project** to train a 🤖 bot upon it.')
                     if len(app.projects) == 1:
@@ -73,6 +104,48 @@ def upload_data():
                         st.rerun()
 
 
+def out_of_core_checkbox() -> bool:
+    """Show the checkbox to create an out-of-core project (see :attr:`src.app.project.Project.out_of_core`)."""
+    return st.checkbox(
+        label='Keep the data on disk',
+        help='For datasets larger than memory: the data is not loaded, the bot queries read it from disk'
+    )
+
+
+def read_uploaded_csv(uploaded_file, delimiter: str) -> tuple[pd.DataFrame, int]:
+    """Read an uploaded CSV file (see :func:`~src.utils.csv_loader.read_csv`), detecting its encoding. If the file is
+    not valid in the encoding detected from its first bytes, it is read again with the fallback encoding."""
+    encoding = detect_encoding(uploaded_file.read(ENCODING_DETECTION_MAX_BYTES))
+    uploaded_file.seek(0)
+    try:
+        return read_csv(uploaded_file, delimiter=delimiter, encoding=encoding)
+    except UnicodeDecodeError:
+        uploaded_file.seek(0)
+        return read_csv(uploaded_file, delimiter=delimiter, encoding=FALLBACK_ENCODING, encoding_errors='replace')
+
+
+def import_uploaded_csv(project_name: str, uploaded_file, delimiter: str) -> Project:
+    """Create an out-of-core project from an uploaded CSV file (see :meth:`src.app.project.Project.import_csv`)."""
+    encoding = detect_encoding(uploaded_file.read(ENCODING_DETECTION_MAX_BYTES))
+    uploaded_file.seek(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, uploaded_file.name)
+        with open(file_path, 'wb') as file:
+            shutil.copyfileobj(uploaded_file, file)
+        return Project.import_csv(get_app(), project_name, file_path, delimiter, encoding)
+
+
+def import_csv_url(project_name: str, file_url: str, delimiter: str) -> Project:
+    """Create an out-of-core project from a CSV file URL (see :meth:`src.app.project.Project.import_csv`). The file
+    is downloaded to disk first."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'data.csv')
+        download_to_file(file_url, file_path)
+        with open(file_path, 'rb') as file:
+            encoding = detect_encoding(file.read(ENCODING_DETECTION_MAX_BYTES))
+        return Project.import_csv(get_app(), project_name, file_path, delimiter, encoding)
+
+
 def load_file_url():
     """Show the Load file URL container."""
     app = get_app()
@@ -82,6 +155,7 @@ def load_file_url():
         project_name = st.text_input(label='Project name', placeholder='Example: sales_project')
         file_url = st.text_input(label='File URL')
         delimiter = st.text_input(label='Delimiter', value=',')
+        out_of_core = out_of_core_checkbox()
         submitted = st.form_submit_button(label="Create project", type='primary')
         if submitted:
             if file_url is None:
@@ -92,7 +166,18 @@ def load_file_url():
                 if project_name in [project.name for project in app.projects]:
                     st.error(f"The project name '{project_name}' already exists. Please choose another one")
                 else:
-                    project = Project(app, project_name, pd.read_csv(file_url, delimiter=delimiter))
+                    if out_of_core:
+                        try:
+                            project = import_csv_url(project_name, file_url, delimiter)
+                        except duckdb.Error as e:
+                            st.error(f'{file_url} could not be imported: {e}')
+                            return
+                    else:
+                        source = DataSource(file_url, delimiter)
+                        content, validators = source.download()
+                        df, original_memory_usage = source.read(content)
+                        source.update(content, validators)
+                        project = Project(app, project_name, df, original_memory_usage, source=source)
                     st.session_state[SELECTED_PROJECT] = project
                     st.info(
                         f'The project **{project.name}** has been created! Go to **Manage project** to train a 🤖 bot upon it.')
@@ -122,44 +207,75 @@ def import_open_data_portal():
         st.error('Currently, only CKAN data management systems are supported')
 
 
+@st.cache_resource
+def get_ckan_catalog_cache() -> dict[str, tuple[float, dict[str, dict]]]:
+    """Get the CKAN catalogs loaded by all the sessions: for each portal base URL, the time it was loaded and its data
+    sources (see :func:`get_ckan_catalog`)."""
+    return {}
+
+
+def get_package_data_source(package: dict) -> dict:
+    """Get the data source entry of a CKAN package, shown in the packages table."""
+    # TODO: ALSO CHECK THE 'format' FIELD IN 'resources': 'CSV'
+    count_csvs = len([resource for resource in package['resources'] if resource['name'].endswith('.csv')])
+    return {
+        TITLE: package['title'],
+        COUNT_CSVS: count_csvs,
+        COUNT_DATASETS: len(package['resources']),
+        METADATA: package,
+        # TODO: Now, Set 'Import' to True if it has CSV Data
+        IMPORT: count_csvs == 1,
+    }
+
+
+def get_ckan_catalog(base_url: str) -> dict[str, dict]:
+    """Get the data sources (packages) of a CKAN portal, sorted by name.
+
+    The catalog is cached by base URL for :data:`~src.utils.ckan.CKAN_CATALOG_TTL` seconds. Otherwise, the packages
+    are requested page by page, with a few concurrent requests (see :func:`~src.utils.ckan.iter_packages`), and shown
+    in a table as they arrive.
+
+    Args:
+        base_url (str): the portal base URL
+
+    Returns:
+        dict[str, dict]: the data source entry of each package (see :func:`get_package_data_source`), a copy for the
+        session
+
+    Raises:
+        requests.RequestException: if a request fails
+        ValueError: if a response is not a successful CKAN API response
+    """
+    catalog_cache = get_ckan_catalog_cache()
+    cached = catalog_cache.get(base_url)
+    if cached is None or time.time() - cached[0] > CKAN_CATALOG_TTL:
+        data_sources = {}
+        rows = []
+        progress = st.progress(0, text='Retrieving data sources...')
+        table = st.empty()
+        for packages, count in iter_packages(base_url):
+            for package in packages:
+                data_sources[package['name']] = get_package_data_source(package)
+                rows.append({'Name': package['name'], 'Title': package['title'],
+                             'Resources': len(package['resources'])})
+            progress.progress(min(len(data_sources) / count, 1.0) if count else 1.0,
+                              text=f'Retrieved {len(data_sources)}/{count} packages')
+            table.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        cached = (time.time(), dict(sorted(data_sources.items())))
+        catalog_cache[base_url] = cached
+    # The entries are modified by the session (e.g. the Import flag)
+    return {name: dict(data_source) for name, data_source in cached[1].items()}
+
+
 def import_ckan_portal(base_url: str, submitted_base_url: bool, import_projects: bool):
     app = get_app()
-    PACKAGE_LIST_ENDPOINT = '/api/action/package_list'
-    PACKAGE_SEARCH_ENDPOINT = '/api/action/package_search'
     if submitted_base_url:
-        package_list_url = base_url + PACKAGE_LIST_ENDPOINT
-        with st.spinner('Retrieving data sources...'):
-            # Get the list of packages
-            response = requests.get(package_list_url)
-            if response.status_code == 200:
-                package_list = response.json()['result']
-                package_search_url = base_url + f'{PACKAGE_SEARCH_ENDPOINT}?start=0&rows={len(package_list)}'
-                # Get the metadata of all packages
-                response = requests.get(package_search_url)
-                if response.status_code == 200:
-                    packages = response.json()['result']['results']
-                    st.session_state[OPEN_DATA_SOURCES] = {}
-                    for package in packages:
-                        package_name = package['name']
-                        st.session_state[OPEN_DATA_SOURCES][package_name] = {
-                            TITLE: package['title'],
-                            # TODO: ALSO CHECK THE 'format' FIELD IN 'resources': 'CSV'
-                            COUNT_CSVS: len(
-                                [resource for resource in package['resources'] if resource['name'].endswith('.csv')]),
-                            COUNT_DATASETS: len(package['resources']),
-                            METADATA: package
-                        }
-                        # TODO: Now, Set 'Import' to True if it has CSV Data
-                        st.session_state[OPEN_DATA_SOURCES][package_name][IMPORT] = True if \
-                            st.session_state[OPEN_DATA_SOURCES][package_name][COUNT_CSVS] == 1 else False
-                    # Sort the data sources list
-                    st.session_state[OPEN_DATA_SOURCES] = dict(
-                        sorted(st.session_state[OPEN_DATA_SOURCES].items()))
-                    st.rerun()
-                else:
-                    st.error('Error in package_search')
-            else:
-                st.error('Error in package_list')
+        try:
+            st.session_state[OPEN_DATA_SOURCES] = get_ckan_catalog(base_url.rstrip('/'))
+        except (requests.RequestException, ValueError, KeyError) as e:
+            st.error(f'Error in package_search: {e}')
+        else:
+            st.rerun()
 
     if OPEN_DATA_SOURCES in st.session_state:  # If packages have been stored in the session...
         if import_projects:
@@ -203,31 +319,43 @@ def import_ckan_portal(base_url: str, submitted_base_url: bool, import_projects:
         # Iterate over the edited DataFrame to get the 'Import' boolean value
         start_time = time.time()
         first_index = -1
+        package_urls = {}
         for index, row in st.session_state[EDITED_PACKAGES_DF].iterrows():
             if row['Import']:
                 package = row['Name']
                 metadata = st.session_state[OPEN_DATA_SOURCES][package]
                 # TODO: ONLY 1 CSV IN A PACKAGE ALLOWED
-                for resource in metadata[METADATA]['resources']:
-                    if resource['name'].endswith('.csv'):
-                        data_url = resource['url']
-                        # Download data
-                        response = requests.get(data_url)
-                        try:
-                            result = chardet.detect(response.content)
-                            encoding = result['encoding']
-                            df = pd.read_csv(StringIO(response.content.decode(encoding)), low_memory=False)
-                            # Create project with the downloaded data into a DataFrame
-                            project = Project(app, package, df)
-                            if first_index == -1:
-                                first_index = len(app.projects) - 1
-                            count_imports += 1
-                            import_progress.progress(count_imports / total_imports,
-                                                     text=f'Imported {count_imports}/{total_imports} projects')
-                            # TODO: This break forces only 1 csv being downloaded for each package
-                            break
-                        except Exception as e:
-                            st.error(f"Failed to fetch data from {package}")
+                data_urls = [resource['url'] for resource in metadata[METADATA]['resources']
+                             if resource['name'].endswith('.csv')]
+                if data_urls:
+                    package_urls[package] = data_urls
+        # Download and read the data in parallel, while the projects (and their data schemas) are created as the
+        # downloads finish. Only DOWNLOAD_MAX_WORKERS downloads are in flight at once, so the downloaded data waiting
+        # for its project to be created never exceeds that number of packages
+        with create_http_session(DOWNLOAD_MAX_WORKERS) as http_session, \
+                ThreadPoolExecutor(max_workers=DOWNLOAD_MAX_WORKERS) as executor:
+            pending_packages = iter(package_urls.items())
+            futures = {}
+            for package, data_urls in itertools.islice(pending_packages, DOWNLOAD_MAX_WORKERS):
+                futures[executor.submit(load_package_data, data_urls, http_session)] = package
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    package = futures.pop(future)
+                    next_package = next(pending_packages, None)
+                    if next_package is not None:
+                        futures[executor.submit(load_package_data, next_package[1], http_session)] = next_package[0]
+                    try:
+                        df, original_memory_usage, source = future.result()
+                        # Create project with the downloaded data into a DataFrame
+                        project = Project(app, package, df, original_memory_usage, source=source)
+                        if first_index == -1:
+                            first_index = len(app.projects) - 1
+                        count_imports += 1
+                        import_progress.progress(count_imports / total_imports,
+                                                 text=f'Imported {count_imports}/{total_imports} projects')
+                    except Exception as e:
+                        st.error(f"Failed to fetch data from {package}")
         if first_index != -1:
             st.session_state[SELECTED_PROJECT] = app.projects[first_index]
         end_time = time.time()
@@ -238,6 +366,33 @@ def import_ckan_portal(base_url: str, submitted_base_url: bool, import_projects:
         finish_message.info(f"Importing data finished. Elapsed Time: {'0' if elapsed_hours < 10 else ''}{elapsed_hours}:{'0' if elapsed_minutes < 10 else ''}{elapsed_minutes}:{'0' if remaining_seconds < 10 else ''}{remaining_seconds:.3f}")
 
 
+def load_package_data(data_urls: list[str],
+                      http_session: requests.Session) -> tuple[pd.DataFrame, int, DataSource]:
+    """Download and read the data of an Open Data package. The package CSV files are tried in order until one of them
+    is successfully read.
+
+    Args:
+        data_urls (list[str]): the URLs of the package CSV files
+        http_session (requests.Session): the HTTP session used to download the files
+
+    Returns:
+        tuple[pandas.DataFrame, int, DataSource]: the data, the memory it would take with the default pandas types
+        (see :func:`~src.utils.csv_loader.read_csv`) and the file it was read from, to refresh it
+    """
+    error = None
+    for data_url in data_urls:
+        try:
+            # TODO: Only 1 csv is downloaded for each package
+            source = DataSource(data_url)
+            content, validators = source.download(http_session)
+            df, original_memory_usage = source.read(content)
+            source.update(content, validators)
+            return df, original_memory_usage, source
+        except Exception as e:
+            error = e
+    raise error
+
+
 def all_projects_container():
     """Show the All Projects container. It displays a list with all the created projects to easily train/run/stop
     them.
@@ -376,6 +531,8 @@ def project_customization_container():
     """Show the Project Customization container."""
     app = get_app()
     project = st.session_state[SELECTED_PROJECT]
+    # Store the data schema customizations (e.g. of the previous run, if it was interrupted by st.rerun)
+    project.save_state()
     c1, c2, c3 = st.columns([0.45, 0.45, 0.1])
     with c1:
         st.header(f'Project: {project.name}')
@@ -437,8 +594,62 @@ def project_customization_container():
 
     # DATA PREVIEW
     st.subheader('Data preview')
+    if project.source is not None:
+        refresh_cols = st.columns([0.25, 0.75])
+        with refresh_cols[0]:
+            refresh = st.button(label='🔄 Refresh data', key='refresh_data', use_container_width=True,
+                                help='Download the source file again (only if it changed) and update the project data')
+        with refresh_cols[1]:
+            st.caption(f'Source: {project.source.url}')
+        if refresh:
+            with st.spinner('Refreshing...'):
+                try:
+                    result = project.refresh_from_source()
+                except (ValueError, requests.RequestException, DownloadTooLargeError) as e:
+                    st.error(f'The data could not be refreshed: {e}')
+                else:
+                    if result == SOURCE_APPENDED:
+                        st.success(f'New rows added to the project (partition {project.partitions[-1].key})')
+                    elif result == SOURCE_REPLACED:
+                        st.success('The source file changed: the project data has been replaced')
+                    else:
+                        st.info('The source file has not changed')
+    memory_usage = project.get_memory_usage()
+    if project.out_of_core:
+        memory_info = f'{project.num_rows:,} rows stored on disk (out-of-core), a sample of {len(project.df):,} rows ' \
+                      f'({memory_usage / 2**20:.1f} MB) in memory'
+    else:
+        memory_info = f'{len(project.df):,} rows, {memory_usage / 2**20:.1f} MB in memory'
+    if project.original_memory_usage:
+        memory_saved = project.original_memory_usage - memory_usage
+        memory_info += f' ({memory_saved / 2**20:.1f} MB saved by the optimized data types)'
+    st.caption(memory_info)
     with st.expander(project.name, expanded=False):
         st.dataframe(project.df)
+    # DATA PARTITIONS
+    with st.expander(f'Data partitions ({len(project.partitions)})', expanded=False):
+        st.dataframe(
+            pd.DataFrame({
+                'Partition': [partition.key for partition in project.partitions],
+                'Rows': [len(partition) for partition in project.partitions],
+            }),
+            hide_index=True
+        )
+        if project.out_of_core:
+            st.caption('Partitions cannot be appended to an out-of-core project')
+        else:
+            with st.form(f'append_partition_{project.name}', clear_on_submit=True):
+                uploaded_file = st.file_uploader(label='Append a file with the same fields', type='csv')
+                partition_key = st.text_input(label='Partition key',
+                                              placeholder='Example: 2024 (default: the file name)')
+                delimiter = st.text_input(label='Delimiter', value=',')
+                if st.form_submit_button(label='Append partition') and uploaded_file is not None:
+                    try:
+                        df, original_memory_usage = read_uploaded_csv(uploaded_file, delimiter)
+                        project.append_partition(partition_key or uploaded_file.name, df, original_memory_usage)
+                        st.rerun()
+                    except ValueError as e:
+                        st.error(f'{uploaded_file.name} could not be added to the project: {e}')
     # FIELD CUSTOMIZATION
     st.subheader('Data schema')
     st.info(
@@ -448,6 +659,17 @@ def project_customization_container():
              'You should review the generated data schema and complete it if you find it '
              f'necessary, either manually or automatically through {AI_ICON}AI',
         icon='💡')
+    if project.data_schema.inference_times:
+        with st.expander('Data schema inference times', expanded=False):
+            inference_times = sorted(project.data_schema.inference_times.items(), key=lambda item: item[1],
+                                     reverse=True)
+            st.dataframe(
+                pd.DataFrame({
+                    'Field': [name for name, _ in inference_times],
+                    'Time (ms)': [seconds * 1000 for _, seconds in inference_times],
+                }),
+                hide_index=True
+            )
     data_schema_button_cols = st.columns([0.25, 0.25, 0.7])
     with data_schema_button_cols[0]:
         if st.button(label=f'{AI_ICON} Enhance with AI',
@@ -521,7 +743,8 @@ def project_customization_container():
         # NUM DIFFERENT VALUES
         st.text_input(
             label='Number of different values',
-            value=field.num_different_values,
+            value=field.num_different_values if field.num_different_values_exact else f'~{field.num_different_values}',
+            help=None if field.num_different_values_exact else 'Estimated (the field has many different values)',
             disabled=True
         )
         # CATEGORICAL
@@ -574,3 +797,4 @@ def project_customization_container():
                     st.rerun()
             else:
                 st.error('There are no synonyms')
+    project.save_state()
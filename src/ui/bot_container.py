@@ -16,9 +16,10 @@ from streamlit.runtime.scriptrunner import add_script_run_ctx
 from besser.bot.platforms.payload import Payload, PayloadAction, PayloadEncoder
 
 from src.app.app import get_app
+from src.utils.dataframe_encoding import decode_dataframe, is_dataframe_frame
 from src.utils.session_monitoring import get_streamlit_session
-from src.utils.session_state_keys import AUDIO, BOT_DF_DATA, BOT_DF_SQL, BOT_DF_TITLE, DASHBOARD_TAB, \
-    DASHBOARD_TAB_SWITCH, DATAFRAME, HISTORY, LAST_VOICE_MESSAGE, PLOTS, PLOTLY, PLOT_INDEX, PROJECTS, QUEUE, \
+from src.utils.session_state_keys import AUDIO, BOT_DF_DATA, BOT_DF_HANDLE, BOT_DF_SQL, BOT_DF_TITLE, \
+    BOT_DF_TOTAL_ROWS, DASHBOARD_TAB, DASHBOARD_TAB_SWITCH, DATAFRAME, HISTORY, LAST_VOICE_MESSAGE, PLOTS, PLOTLY, PLOT_INDEX, PROJECTS, QUEUE, \
     SELECTED_PROJECT, SESSION_ID, STR, TABLES, TABLE_INDEX, USER_INPUT, WEBSOCKET, WEBSOCKET_PORT, WEBSOCKET_THREAD
 from src.utils.tweaker import st_tweaker
 from src.utils.utils import get_page_height
@@ -41,8 +42,16 @@ def websocket_connection():
     def on_message(ws, payload_str):
         # https://github.com/streamlit/streamlit/issues/2838
         streamlit_session = get_streamlit_session()
-        payload: Payload = Payload.decode(payload_str)
-        if payload.action == PayloadAction.BOT_REPLY_STR.value:
+        if isinstance(payload_str, bytes):
+            if not is_dataframe_frame(payload_str):
+                return
+            # Binary frames contain DataFrame bot replies (see DataBot.reply_dataframe)
+            payload = None
+            action = PayloadAction.BOT_REPLY_DF.value
+        else:
+            payload: Payload = Payload.decode(payload_str)
+            action = payload.action
+        if action == PayloadAction.BOT_REPLY_STR.value:
             content = payload.message
             try:
                 # First bot message contains the user's session id (bot session, not streamlit session)
@@ -54,19 +63,23 @@ def websocket_connection():
             except Exception as e:
                 pass
             t = STR
-        elif payload.action == PayloadAction.BOT_REPLY_DF.value:
-            content = json.loads(payload.message)
-            title = content[BOT_DF_TITLE]
-            sql = content[BOT_DF_SQL]
-            data = content[BOT_DF_DATA]
-            content = pd.DataFrame(data)
+        elif action == PayloadAction.BOT_REPLY_DF.value:
+            if payload is None:
+                header, content = decode_dataframe(payload_str)
+            else:
+                header = json.loads(payload.message)
+                content = pd.DataFrame(header[BOT_DF_DATA])
+            title = header[BOT_DF_TITLE]
+            sql = header[BOT_DF_SQL]
+            handle = header[BOT_DF_HANDLE]
+            total_rows = header[BOT_DF_TOTAL_ROWS]
             t = DATAFRAME
-            streamlit_session._session_state[PROJECTS][project.name][TABLES].append((title, content, sql))
+            streamlit_session._session_state[PROJECTS][project.name][TABLES].append((title, content, sql, handle, total_rows))
             streamlit_session._session_state[PROJECTS][project.name][TABLE_INDEX] = len(streamlit_session._session_state[PROJECTS][project.name][TABLES]) - 1
             if streamlit_session._session_state[DASHBOARD_TAB] != 0:
                 streamlit_session._session_state[DASHBOARD_TAB_SWITCH] = not streamlit_session._session_state[DASHBOARD_TAB_SWITCH]
             streamlit_session._session_state[DASHBOARD_TAB] = 0
-        elif payload.action == PayloadAction.BOT_REPLY_PLOTLY.value:
+        elif action == PayloadAction.BOT_REPLY_PLOTLY.value:
             content = io.from_json(payload.message)
             title = content.layout.title.text
             content.update_layout(title='')
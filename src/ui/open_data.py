@@ -2,7 +2,7 @@ import json
 import queue
 import threading
 import time
-import chardet
+from io import StringIO
 import requests
 from datetime import datetime
 
@@ -19,16 +19,62 @@ from src.app.parent_bot import parent_bot
 from src.app.app import get_app
 from src.app.project import Project
 from src.app.content import Content
+from src.app.data_source import DataSource
+from src.utils.download import download_prefix
+from src.utils.encoding_detection import detect_encoding
 from src.utils.session_state_keys import AI_ICON, CKAN, COUNT_CSVS, COUNT_DATASETS, EDITED_PACKAGES_DF, IMPORT, \
     IMPORT_OPEN_DATA_PORTAL, METADATA, OPEN_DATA_SOURCES, SELECTED_PROJECT, SELECT_ALL_CHECKBOXES, TITLE, UDATA, \
     UPLOAD_DATA
 from src.utils.session_monitoring import get_streamlit_session
 
 
+PREVIEW_CACHE_TTL = 600
+"""int: Time (in seconds) the dataset previews (and the checks of their URLs) are cached."""
+
+PREVIEW_MAX_BYTES = 64 * 1024
+"""int: Number of bytes downloaded from the start of a dataset to preview it."""
+
+
 @st.cache_resource
 def run_parent_bot():
     parent_bot.run(sleep=False)
 
+
+@st.cache_data(ttl=PREVIEW_CACHE_TTL, show_spinner=False)
+def get_url_status(file_url: str) -> int or None:
+    """Get the HTTP status of a HEAD request to a dataset URL, or None if the request fails."""
+    try:
+        return requests.head(file_url, timeout=5).status_code
+    except requests.RequestException as e:
+        return None
+
+
+@st.cache_data(ttl=PREVIEW_CACHE_TTL, show_spinner=False)
+def get_file_prefix(file_url: str) -> bytes:
+    """Get the first bytes of a dataset (see :data:`PREVIEW_MAX_BYTES`)."""
+    return download_prefix(file_url, PREVIEW_MAX_BYTES)
+
+
+@st.cache_data(ttl=PREVIEW_CACHE_TTL, show_spinner=False)
+def get_dataset_preview(file_url: str, delimiter: str) -> tuple[pd.DataFrame, str]:
+    """Get the first rows of a dataset, read from its first bytes only.
+
+    Args:
+        file_url (str): the dataset URL
+        delimiter (str): the CSV delimiter
+
+    Returns:
+        tuple[pandas.DataFrame, str]: the preview and the encoding of the dataset
+    """
+    prefix = get_file_prefix(file_url)
+    encoding = detect_encoding(prefix)
+    if len(prefix) == PREVIEW_MAX_BYTES and b'\n' in prefix:
+        # Drop the last line, which may be cut
+        prefix = prefix[:prefix.rindex(b'\n') + 1]
+    text = prefix.decode(encoding, errors='replace')
+    preview = pd.read_csv(StringIO(text), sep=delimiter, nrows=2, on_bad_lines='skip')
+    return preview, encoding
+
 def open_data():
     run_parent_bot()
 
@@ -46,13 +92,13 @@ def open_data():
     def display_expanders(message):
         for expander_entry in message.content.expanders: 
             file_url = expander_entry["dataset_url"] 
-            try: #check that the csv url is valid before displaying the expander
-                response = requests.head(file_url, timeout=5)
-            except requests.RequestException as e:
+            #check that the csv url is valid before displaying the expander
+            status_code = get_url_status(file_url)
+            if status_code is None:
                 print(f"Error checking URL {file_url}, ignoring file")
                 continue #no need to stay in this loop iteration if the csv url is not valid
 
-            if response.status_code == 200:
+            if status_code == 200:
                 with st.expander(expander_entry["dataset_title"], False): 
                     st.write(f"Source platform: {expander_entry['dataset_source']}")
                     st.write(f"Title: {expander_entry['dataset_title']}")
@@ -71,8 +117,7 @@ def open_data():
                     delimiter = st.text_input(label='Delimiter', value=st.session_state[delimiter_key], key=delimiter_key)
                     project_name = st.text_input(label='Project Name', value=st.session_state[name_key], key=name_key)
                     st.write("Dataset preview (using your chosen delimiter):")
-                    csv_encoding = chardet.detect(requests.get(file_url).content)['encoding']
-                    dataset_preview = pd.read_csv(file_url, sep=delimiter, encoding=csv_encoding, nrows=2, on_bad_lines='skip')
+                    dataset_preview, csv_encoding = get_dataset_preview(file_url, delimiter)
                     st.dataframe(dataset_preview)
 
                     if st.button(f"Generate bot", key=f'button_{file_url}'):
@@ -80,7 +125,11 @@ def open_data():
                         if project_name in [project.name for project in app.projects]:
                             st.error(f"The project name '{project_name}' already exists. Please choose another one")
                         else:
-                            project = Project(app, project_name, pd.read_csv(file_url, delimiter=delimiter, encoding=csv_encoding))
+                            source = DataSource(file_url, delimiter, csv_encoding)
+                            content, validators = source.download()
+                            df, original_memory_usage = source.read(content)
+                            source.update(content, validators)
+                            project = Project(app, project_name, df, original_memory_usage, source=source)
                             st.session_state[SELECTED_PROJECT] = project
                             st.info(
                                 f'The project **{project.name}** has been created! Go to **Admin** to train a 🤖 bot upon it.')
@@ -1,8 +1,11 @@
 import queue
+
+import pandas as pd
 import streamlit as st
 import streamlit_antd_components as sac
 
 from src.app.bot.library.session_keys import FILTERS, LLM_ANSWERS_ENABLED
+from src.app.result_store import DATAFRAME_PAGE_SIZE, stringify_datetimes
 from src.schema.field_type import BOOLEAN, DATETIME, NUMERIC, TEXTUAL
 from src.schema.filter import Filter, boolean_operators, datetime_operators, numeric_operators, textual_operators
 from src.ui.bot_container import bot_container
@@ -36,7 +39,7 @@ def playground():
             QUEUE: queue.Queue(),
             PLOTS: [],
             PLOT_INDEX: None,
-            TABLES: [(f'{project.name}: original data', project.df, None)],
+            TABLES: [(f'{project.name}: original data', project.df, None, None, len(project.df))],
             TABLE_INDEX: 0
         }
 
@@ -64,8 +67,7 @@ def playground():
                 select_dashboard_element(col_title, TABLES, TABLE_INDEX)
                 navigate_dashboard_elements(TABLES, TABLE_INDEX)
                 table_index = st.session_state[PROJECTS][project.name][TABLE_INDEX]
-                data = st.session_state[PROJECTS][project.name][TABLES][table_index][1]
-                sql = st.session_state[PROJECTS][project.name][TABLES][table_index][2]
+                title, data, sql, handle, total_rows = st.session_state[PROJECTS][project.name][TABLES][table_index]
                 height_offset = 250
 
                 with col_info:
@@ -82,6 +84,23 @@ def playground():
                             table_container.info('Here you can see the original data where DataBot will search the answers.')
                             height_offset += 71
 
+                if len(data) < total_rows:
+                    # Only the first rows of large tables are sent by the bot, the rest are loaded on demand
+                    height_offset += 50
+                    load_rows_container = st.container()
+                    col_rows, col_load = load_rows_container.columns([0.8, 0.2])
+                    col_rows.caption(f'Showing {len(data)} of {total_rows} rows')
+                    if col_load.button('Load more rows', use_container_width=True):
+                        rows = app.result_store.get_rows(handle, len(data), DATAFRAME_PAGE_SIZE)
+                        if rows is None:
+                            load_rows_container.error('The remaining rows of this table are no longer available. Ask the bot again to get them.')
+                        else:
+                            # Datetime columns are strings if the first rows were received as JSON
+                            string_columns = [col for col in data.columns if not pd.api.types.is_datetime64_any_dtype(data[col])]
+                            data = pd.concat([data, stringify_datetimes(rows, string_columns)])
+                            st.session_state[PROJECTS][project.name][TABLES][table_index] = (title, data, sql, handle, total_rows)
+                            st.rerun()
+
                 table_container.dataframe(data, height=max(1, get_page_height(height_offset)), use_container_width=True)
             elif selected_tab == 1:  # Plots
                 if not st.session_state[PROJECTS][project.name][PLOTS]:
@@ -174,6 +193,7 @@ def playground():
                             bot_filter: Filter = Filter(target_field_schema, filter_operator, filter_value)
                             if bot_filter not in bot_filters:
                                 bot_filters.append(bot_filter)
+                                app.filter_cache.invalidate(session_id)
                             else:
                                 st.error('This filter already exists.')
                         with st.expander('All filters', expanded=True):
@@ -186,6 +206,7 @@ def playground():
                                 if st.button(label='Delete', key='delete_field_synonym'):
                                     for delete_filter in delete_filters:
                                         bot_filters.remove(delete_filter)
+                                    app.filter_cache.invalidate(session_id)
                                     st.rerun()
                             else:
                                 st.error('There are no filters')
@@ -193,10 +214,11 @@ def playground():
                 def reset_chat():
                     session_id = st.session_state[PROJECTS][project.name][SESSION_ID]
                     project.databot.bot.get_session(session_id).set(FILTERS, [])
+                    app.filter_cache.invalidate(session_id)
                     st.session_state[PROJECTS][project.name][HISTORY] = []
                     st.session_state[PROJECTS][project.name][PLOTS] = []
                     st.session_state[PROJECTS][project.name][PLOT_INDEX] = None
-                    st.session_state[PROJECTS][project.name][TABLES] = [(f'{project.name}: original data', project.df, None)]
+                    st.session_state[PROJECTS][project.name][TABLES] = [(f'{project.name}: original data', project.df, None, None, len(project.df))]
                     st.session_state[PROJECTS][project.name][TABLE_INDEX] = 0
                     project.databot.bot.reset(session_id)
                 st.button(label='🔄 Reset chat', on_click=reset_chat, help='Clear the chat history and the generated tables/plots.', disabled=not project.bot_running)
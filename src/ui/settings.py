@@ -1,7 +1,8 @@
 import streamlit as st
 
 from src.app.app import get_app
-from src.utils.session_state_keys import NLP_STT_HF_MODEL, OPENAI_API_KEY, OPENAI_MODEL_NAME
+from src.utils.session_state_keys import CHART_MAX_POINTS, LLM_CACHE_FILE, NLP_STT_HF_MODEL, OPENAI_API_KEY, \
+    OPENAI_MODEL_NAME, SCHEMA_INFERENCE_WORKERS
 
 
 def settings():
@@ -26,3 +27,24 @@ def settings():
             value=app.properties[NLP_STT_HF_MODEL],
             # disabled=True
         )
+        app.properties[CHART_MAX_POINTS] = st.number_input(
+            label='Maximum chart points',
+            help='Scatter, line and area charts with more points are downsampled to this number of points',
+            min_value=100,
+            step=1000,
+            value=app.properties[CHART_MAX_POINTS]
+        )
+        app.properties[SCHEMA_INFERENCE_WORKERS] = st.number_input(
+            label='Data schema inference workers',
+            help='Number of fields whose type is inferred at the same time when creating a project',
+            min_value=1,
+            max_value=64,
+            value=app.properties[SCHEMA_INFERENCE_WORKERS]
+        )
+        app.properties[LLM_CACHE_FILE] = st.text_input(
+            label='AI answers cache file',
+            help='File where the AI answers are stored, so they are reused after a restart. Leave it empty to keep them '
+                 'only in memory',
+            value=app.properties[LLM_CACHE_FILE] or ''
+        ) or None
+        app.llm_cache.set_path(app.properties[LLM_CACHE_FILE])
@@ -0,0 +1,97 @@
+import logging
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from src.utils.download import DOWNLOAD_TIMEOUT, create_http_session
+
+PACKAGE_SEARCH_ENDPOINT = '/api/action/package_search'
+"""str: CKAN API endpoint to search the packages of a portal (with their metadata)."""
+
+CKAN_PAGE_SIZE = 1000
+"""int: Number of packages requested at once. CKAN portals limit it (ckan.search.rows_max, 1000 by default), so the
+actual page size is the number of packages of the first page."""
+
+CKAN_MAX_WORKERS = 4
+"""int: Maximum number of package pages requested at the same time to a CKAN portal."""
+
+CKAN_CATALOG_TTL = 3600
+"""int: Time (in seconds) the catalog of a CKAN portal is cached (see :func:`src.ui.admin.get_ckan_catalog`)."""
+
+
+def search_packages(base_url: str, start: int, rows: int, http_session: requests.Session) -> dict:
+    """Get a page of the packages of a CKAN portal (package_search), sorted by name so the pages do not overlap.
+
+    Args:
+        base_url (str): the portal base URL
+        start (int): the position of the first package of the page
+        rows (int): the number of packages of the page
+        http_session (requests.Session): the HTTP session to use
+
+    Returns:
+        dict: the search result, with the total number of packages ('count') and the packages of the page
+        ('results')
+
+    Raises:
+        requests.RequestException: if the request fails
+        ValueError: if the response is not a successful CKAN API response
+    """
+    params = {'start': start, 'rows': rows, 'sort': 'name asc'}
+    response = http_session.get(base_url + PACKAGE_SEARCH_ENDPOINT, params=params, timeout=DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    content = response.json()
+    if not content.get('success'):
+        raise ValueError(f'package_search failed: {content.get("error")}')
+    return content['result']
+
+
+def iter_packages(base_url: str, page_size: int = CKAN_PAGE_SIZE,
+                  max_workers: int = CKAN_MAX_WORKERS) -> Iterator[tuple[list[dict], int]]:
+    """Get the packages of a CKAN portal page by page, as they are received.
+
+    The first page gives the total number of packages and the actual page size (the portal may return fewer packages
+    than requested). The rest of the pages are requested concurrently, with at most max_workers requests at the same
+    time, and yielded in the order they arrive. If the number of packages received does not match the total (e.g. the
+    packages changed while paging), a warning is logged.
+
+    Args:
+        base_url (str): the portal base URL
+        page_size (int): the number of packages requested in each page
+        max_workers (int): the maximum number of concurrent requests
+
+    Returns:
+        Iterator[tuple[list[dict], int]]: the packages of each page, and the total number of packages
+
+    Raises:
+        requests.RequestException: if a request fails
+        ValueError: if a response is not a successful CKAN API response
+    """
+    with create_http_session(max_workers) as http_session:
+        result = search_packages(base_url, 0, page_size, http_session)
+        count = result['count']
+        # Pages of the size the portal actually returns, so no package is skipped
+        page_size = len(result['results'])
+        num_received = page_size
+        yield result['results'], count
+        if page_size == 0:
+            return
+        starts = iter(range(page_size, count, page_size))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            for start in starts:
+                pending.add(executor.submit(search_packages, base_url, start, page_size, http_session))
+                if len(pending) == max_workers:
+                    break
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    packages = future.result()['results']
+                    num_received += len(packages)
+                    yield packages, count
+                    # Keep (at most) max_workers requests in flight
+                    start = next(starts, None)
+                    if start is not None:
+                        pending.add(executor.submit(search_packages, base_url, start, page_size, http_session))
+    if num_received != count:
+        logging.warning(f'Received {num_received} packages from {base_url}, but it reported {count}')
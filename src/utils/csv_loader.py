@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from pandas.api.types import union_categoricals
+
+from src.schema.type_inference import find_datetime_formats, get_sample
+
+CSV_CHUNK_SIZE = 100_000
+"""int: Number of rows read at once when loading a CSV file. The first chunk is also the sample used to infer the
+column types."""
+
+CATEGORY_MAX_RATIO = 0.5
+"""float: Maximum ratio of distinct values per row for a text column to be stored as a category."""
+
+# Column loading plans
+NUMERIC_COLUMN = 'numeric'
+CATEGORY_COLUMN = 'category'
+DATE_COLUMN = 'date'
+
+
+def get_date_formats(column: pd.Series) -> list[str]:
+    """Get the datetime formats (from :data:`~src.schema.type_inference.DATETIME_FORMATS`) that all the (non-null)
+    values of a text column match, in order of preference. The formats are tested against a sample of the column
+    (see :func:`~src.schema.type_inference.get_sample`), and only the ones it matches against all its values."""
+    values = column.dropna()
+    sample = get_sample(values)
+    if sample.empty or not all(isinstance(value, str) for value in sample):
+        return []
+    return [date_format for date_format in find_datetime_formats(sample)
+            if pd.to_datetime(values, format=date_format, errors='coerce').notna().all()]
+
+
+def get_column_plans(sample: DataFrame) -> dict[str, tuple[str, str or None]]:
+    """Decide how to store each column of a CSV file from a sample of its rows.
+
+    Numeric columns are downcast, text columns with a date format are parsed as dates and low-cardinality text
+    columns are stored as categories. The rest of the columns are kept as read.
+
+    Args:
+        sample (pandas.DataFrame): the sample, read with the default pandas types
+
+    Returns:
+        dict[str, tuple[str, list[str] or None]]: the plan of each column to convert, and the candidate date formats
+        of date columns (in order of preference, as a value outside the sample can rule out the first ones)
+    """
+    plans = {}
+    for name, column in sample.items():
+        if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            plans[name] = (NUMERIC_COLUMN, None)
+        elif column.dtype == object:
+            date_formats = get_date_formats(column)
+            if date_formats:
+                plans[name] = (DATE_COLUMN, date_formats)
+            elif column.nunique() <= CATEGORY_MAX_RATIO * len(column):
+                plans[name] = (CATEGORY_COLUMN, None)
+    return plans
+
+
+def downcast_numeric(column: pd.Series) -> pd.Series:
+    """Store a numeric column in the smallest type that holds its values without any loss (floats are only
+    converted to float32 if all their values are exactly representable)."""
+    if pd.api.types.is_integer_dtype(column):
+        return pd.to_numeric(column, downcast='integer')
+    if pd.api.types.is_float_dtype(column) and column.dtype != np.float32:
+        values = column.to_numpy()
+        downcast = values.astype(np.float32)
+        if np.array_equal(downcast, values, equal_nan=True):
+            return pd.Series(downcast, index=column.index, name=column.name)
+    return column
+
+
+def convert_chunk(chunk: DataFrame, plans: dict[str, tuple[str, list[str] or None]]) -> DataFrame:
+    """Convert the columns of a chunk according to their plans. Columns that do not match their plan in this chunk
+    (e.g. text in a numeric column) are kept as read."""
+    converted = {}
+    for name, (plan, _) in plans.items():
+        column = chunk[name]
+        if plan == NUMERIC_COLUMN:
+            if pd.api.types.is_numeric_dtype(column):
+                converted[name] = downcast_numeric(column)
+        elif column.dtype == object or pd.api.types.is_float_dtype(column) and column.isna().all():
+            # Dates are stored as categories until all the chunks are read, so each distinct date is parsed once
+            converted[name] = column.astype('category')
+    return chunk.assign(**converted) if converted else chunk
+
+
+def concat_column(columns: list[pd.Series]) -> pd.Series:
+    """Concatenate a column read in chunks, merging the categories of categorical chunks."""
+    if len(columns) > 1 and all(isinstance(column.dtype, pd.CategoricalDtype) for column in columns):
+        try:
+            return pd.Series(union_categoricals(columns), name=columns[0].name)
+        except TypeError:
+            # Categories of different types (e.g. numbers in some chunks, text in others)
+            columns = [column.astype(object) for column in columns]
+    return pd.concat(columns, ignore_index=True)
+
+
+def parse_dates(column: pd.Series, date_formats: list[str]) -> pd.Series:
+    """Parse a categorical column of dates, parsing each distinct value once, with the first of the date formats that
+    all its values match. If no format matches all the values, the column is returned as it is."""
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        return column
+    for date_format in date_formats:
+        try:
+            dates = pd.to_datetime(column.cat.categories, format=date_format)
+        except (ValueError, TypeError):
+            continue
+        codes = column.cat.codes.to_numpy()
+        values = dates.to_numpy()[codes]
+        values[codes == -1] = np.datetime64('NaT')
+        return pd.Series(values, name=column.name)
+    return column
+
+
+def read_csv(source, chunk_size: int = CSV_CHUNK_SIZE, **kwargs) -> tuple[DataFrame, int]:
+    """Read a CSV file into a memory-lean DataFrame.
+
+    The file is read in chunks. The column types are inferred from the first chunk (see :func:`get_column_plans`)
+    and each chunk is converted before reading the next one, so the whole file is never held with the default pandas
+    types.
+
+    Args:
+        source: the file path, URL or buffer
+        chunk_size (int): the number of rows of each chunk
+        **kwargs: other arguments for pandas.read_csv (e.g. the delimiter or the encoding)
+
+    Returns:
+        tuple[pandas.DataFrame, int]: the data, and the memory (in bytes) it would take with the default pandas
+        types
+    """
+    plans = None
+    default_memory_usage = 0
+    chunks = []
+    with pd.read_csv(source, chunksize=chunk_size, **kwargs) as reader:
+        for chunk in reader:
+            default_memory_usage += int(chunk.memory_usage(index=False, deep=True).sum())
+            if plans is None:
+                plans = get_column_plans(chunk)
+            chunks.append(convert_chunk(chunk, plans))
+    if not chunks:
+        return pd.read_csv(source, **kwargs), 0
+    if len(chunks) == 1:
+        df = chunks[0].reset_index(drop=True)
+    else:
+        df = DataFrame({name: concat_column([chunk[name] for chunk in chunks]) for name in chunks[0].columns})
+    chunks.clear()
+    converted = {}
+    for name, (plan, date_formats) in plans.items():
+        column = df[name]
+        if plan == DATE_COLUMN:
+            converted[name] = parse_dates(column, date_formats)
+            if converted[name] is column and isinstance(column.dtype, pd.CategoricalDtype) \
+                    and len(column.cat.categories) > CATEGORY_MAX_RATIO * len(column):
+                converted[name] = column.astype(object)
+        elif plan == CATEGORY_COLUMN and isinstance(column.dtype, pd.CategoricalDtype) \
+                and len(column.cat.categories) > CATEGORY_MAX_RATIO * len(column):
+            # The sample was not representative: the column has too many distinct values to be a category
+            converted[name] = column.astype(object)
+    return (df.assign(**converted) if converted else df), default_memory_usage
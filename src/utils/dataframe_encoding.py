@@ -0,0 +1,60 @@
+import json
+import struct
+
+import pyarrow as pa
+from pandas import DataFrame
+
+DATAFRAME_FRAME_MAGIC = b'DBDF'
+"""bytes: Prefix of the binary WebSocket frames containing a DataFrame."""
+
+_HEADER_LENGTH = struct.Struct('>I')
+
+
+def encode_dataframe(header: dict, df: DataFrame) -> bytes:
+    """Encode a DataFrame and a JSON header (e.g. its title) into a binary frame.
+
+    The frame contains the magic prefix, the header length (4 bytes, big-endian), the header JSON and the DataFrame in
+    the Arrow IPC streaming format, which keeps the column dtypes and the index.
+
+    Args:
+        header (dict): the header, must be JSON serializable
+        df (pandas.DataFrame): the DataFrame
+
+    Returns:
+        bytes: the binary frame
+
+    Raises:
+        pyarrow.ArrowException: if the DataFrame cannot be converted to Arrow (e.g. columns with mixed types)
+    """
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    header_bytes = json.dumps(header).encode('utf-8')
+    return DATAFRAME_FRAME_MAGIC + _HEADER_LENGTH.pack(len(header_bytes)) + header_bytes + sink.getvalue().to_pybytes()
+
+
+def is_dataframe_frame(frame: bytes) -> bool:
+    """Check if a binary frame contains a DataFrame encoded with :func:`encode_dataframe`."""
+    return frame[:len(DATAFRAME_FRAME_MAGIC)] == DATAFRAME_FRAME_MAGIC
+
+
+def decode_dataframe(frame: bytes) -> tuple[dict, DataFrame]:
+    """Decode a binary frame created with :func:`encode_dataframe`.
+
+    The Arrow data is read directly from the frame bytes, without copying them.
+
+    Args:
+        frame (bytes): the binary frame
+
+    Returns:
+        tuple[dict, pandas.DataFrame]: the header and the DataFrame
+    """
+    offset = len(DATAFRAME_FRAME_MAGIC)
+    (header_length,) = _HEADER_LENGTH.unpack_from(frame, offset)
+    offset += _HEADER_LENGTH.size
+    header = json.loads(frame[offset:offset + header_length].decode('utf-8'))
+    offset += header_length
+    buffer = pa.py_buffer(frame)[offset:]
+    table = pa.ipc.open_stream(buffer).read_all()
+    return header, table.to_pandas()
@@ -0,0 +1,192 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DOWNLOAD_MAX_WORKERS = 8
+"""int: Maximum number of files downloaded at the same time."""
+
+DOWNLOAD_TIMEOUT = (10, 60)
+"""tuple[float, float]: Connect and read timeouts (in seconds) of a download."""
+
+DOWNLOAD_RETRIES = 3
+"""int: Number of times a failed request (connection error or 429/5xx response) is retried."""
+
+DOWNLOAD_BACKOFF = 0.5
+"""float: Backoff factor (in seconds) between retries, doubled after every retry."""
+
+DOWNLOAD_MAX_SIZE = 500 * 2**20
+"""int: Maximum size (in bytes) of a downloaded file."""
+
+DOWNLOAD_CHUNK_SIZE = 2**20
+"""int: Size (in bytes) of the chunks of a download stream."""
+
+
+class DownloadTooLargeError(Exception):
+    """Raised when a file to download is larger than the allowed size."""
+
+
+def create_http_session(pool_size: int = DOWNLOAD_MAX_WORKERS) -> requests.Session:
+    """Create an HTTP session that reuses its connections and retries the failed requests with exponential backoff.
+
+    Args:
+        pool_size (int): the maximum number of connections kept per host (i.e. the number of threads that use the
+            session at the same time)
+
+    Returns:
+        requests.Session: the HTTP session
+    """
+    retry = Retry(
+        total=DOWNLOAD_RETRIES,
+        backoff_factor=DOWNLOAD_BACKOFF,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=['GET', 'HEAD'],
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    http_session = requests.Session()
+    http_session.mount('http://', adapter)
+    http_session.mount('https://', adapter)
+    return http_session
+
+
+def read_response(url: str, response: requests.Response, max_size: int = DOWNLOAD_MAX_SIZE) -> bytes:
+    """Read the content of a streamed response, stopping as soon as it exceeds the maximum size.
+
+    Args:
+        url (str): the file URL
+        response (requests.Response): the response, requested with stream=True
+        max_size (int): the maximum size of the file, in bytes
+
+    Returns:
+        bytes: the file content
+
+    Raises:
+        DownloadTooLargeError: if the file is larger than max_size
+    """
+    content_length = response.headers.get('Content-Length')
+    if content_length is not None and content_length.isdigit() and int(content_length) > max_size:
+        raise DownloadTooLargeError(f'{url} is larger than {max_size} bytes')
+    content = bytearray()
+    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+        content += chunk
+        if len(content) > max_size:
+            raise DownloadTooLargeError(f'{url} is larger than {max_size} bytes')
+    return bytes(content)
+
+
+def download(url: str, http_session: requests.Session = None, max_size: int = DOWNLOAD_MAX_SIZE) -> bytes:
+    """Download a file, streaming it to stop as soon as it exceeds the maximum size (see :func:`read_response`).
+
+    Args:
+        url (str): the file URL
+        http_session (requests.Session): the HTTP session to use (see :func:`create_http_session`). If None, a new
+            one is created for this download
+        max_size (int): the maximum size of the file, in bytes
+
+    Returns:
+        bytes: the file content
+
+    Raises:
+        requests.RequestException: if the request fails (after all the retries)
+        DownloadTooLargeError: if the file is larger than max_size
+    """
+    if http_session is None:
+        with create_http_session(1) as http_session:
+            return download(url, http_session, max_size)
+    with http_session.get(url, timeout=DOWNLOAD_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        return read_response(url, response, max_size)
+
+
+def download_if_modified(url: str, etag: str = None, last_modified: str = None, http_session: requests.Session = None,
+                         max_size: int = DOWNLOAD_MAX_SIZE) -> tuple[bytes or None, dict[str, str or None]]:
+    """Download a file only if it changed since it was last downloaded, with a conditional request (the server answers
+    304 Not Modified, without sending the file, if it did not change).
+
+    Args:
+        url (str): the file URL
+        etag (str): the ETag header of the last download, or None
+        last_modified (str): the Last-Modified header of the last download, or None
+        http_session (requests.Session): the HTTP session to use (see :func:`create_http_session`). If None, a new
+            one is created for this download
+        max_size (int): the maximum size of the file, in bytes
+
+    Returns:
+        tuple[bytes or None, dict[str, str or None]]: the file content (None if it did not change) and its validators
+        ('etag' and 'last_modified') to send in the next conditional request
+
+    Raises:
+        requests.RequestException: if the request fails (after all the retries)
+        DownloadTooLargeError: if the file is larger than max_size
+    """
+    if http_session is None:
+        with create_http_session(1) as http_session:
+            return download_if_modified(url, etag, last_modified, http_session, max_size)
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    with http_session.get(url, headers=headers, timeout=DOWNLOAD_TIMEOUT, stream=True) as response:
+        if response.status_code == 304:
+            return None, {'etag': etag, 'last_modified': last_modified}
+        response.raise_for_status()
+        validators = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+        return read_response(url, response, max_size), validators
+
+
+def download_to_file(url: str, file_path: str, http_session: requests.Session = None) -> None:
+    """Download a file to disk. The file is streamed in chunks, so it is never entirely loaded in memory (and it has
+    no maximum size, unlike :func:`download`).
+
+    Args:
+        url (str): the file URL
+        file_path (str): the path where the file is written
+        http_session (requests.Session): the HTTP session to use (see :func:`create_http_session`). If None, a new
+            one is created for this download
+
+    Raises:
+        requests.RequestException: if the request fails (after all the retries)
+    """
+    if http_session is None:
+        with create_http_session(1) as http_session:
+            return download_to_file(url, file_path, http_session)
+    with http_session.get(url, timeout=DOWNLOAD_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        with open(file_path, 'wb') as file:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                file.write(chunk)
+
+
+def download_prefix(url: str, size: int, http_session: requests.Session = None) -> bytes:
+    """Download (at most) the first bytes of a file.
+
+    Only the needed byte range is requested (with a Range header). If the server ignores it and sends the whole file,
+    the response is streamed and the connection is closed once the first bytes have been read.
+
+    Args:
+        url (str): the file URL
+        size (int): the number of bytes to download
+        http_session (requests.Session): the HTTP session to use (see :func:`create_http_session`). If None, a new
+            one is created for this download
+
+    Returns:
+        bytes: the first bytes of the file (all of it if it is smaller than size)
+
+    Raises:
+        requests.RequestException: if the request fails (after all the retries)
+    """
+    if http_session is None:
+        with create_http_session(1) as http_session:
+            return download_prefix(url, size, http_session)
+    headers = {'Range': f'bytes=0-{size - 1}'}
+    with http_session.get(url, headers=headers, timeout=DOWNLOAD_TIMEOUT, stream=True) as response:
+        if response.status_code == 416:
+            # Range Not Satisfiable: the file is empty
+            return b''
+        response.raise_for_status()
+        content = bytearray()
+        for chunk in response.iter_content(chunk_size=min(size, DOWNLOAD_CHUNK_SIZE)):
+            content += chunk
+            if len(content) >= size:
+                break
+        return bytes(content[:size])
@@ -0,0 +1,104 @@
+import codecs
+
+from chardet.universaldetector import UniversalDetector
+
+ENCODING_DETECTION_MAX_BYTES = 64 * 1024
+"""int: Maximum number of bytes from the start of a file read to detect its encoding."""
+
+ENCODING_DETECTION_BLOCK_SIZE = 4096
+"""int: Number of bytes fed at once to the encoding detector, which stops as soon as it is confident enough."""
+
+DEFAULT_ENCODING = 'utf-8'
+"""str: Encoding used when it cannot be detected."""
+
+FALLBACK_ENCODING = 'cp1252'
+"""str: Encoding used when a file is not valid in its detected encoding (e.g. a Windows-1252 file with an ASCII
+prefix, detected as UTF-8). Undefined bytes are replaced."""
+
+TRANSCODING_CHUNK_SIZE = 2**20
+"""int: Number of bytes decoded at once when converting a file to UTF-8."""
+
+
+def detect_encoding(data: bytes, max_bytes: int = ENCODING_DETECTION_MAX_BYTES) -> str:
+    """Detect the encoding of a file from (at most) its first bytes.
+
+    The bytes are fed to chardet's incremental detector in small blocks, stopping as soon as the detector is
+    confident about the result, so large files are not scanned entirely.
+
+    Args:
+        data (bytes): the file content, or its first bytes
+        max_bytes (int): the maximum number of bytes to read
+
+    Returns:
+        str: the encoding name
+    """
+    detector = UniversalDetector()
+    data = memoryview(data)[:max_bytes]
+    for start in range(0, len(data), ENCODING_DETECTION_BLOCK_SIZE):
+        detector.feed(bytes(data[start:start + ENCODING_DETECTION_BLOCK_SIZE]))
+        if detector.done:
+            break
+    detector.close()
+    encoding = detector.result['encoding']
+    if encoding is None or encoding.lower() == 'ascii':
+        # An ASCII prefix does not mean the rest of the file is ASCII, UTF-8 is a superset of it
+        return DEFAULT_ENCODING
+    return encoding
+
+
+def decode(data: bytes, encoding: str) -> tuple[str, str]:
+    """Decode the content of a file, falling back to :data:`FALLBACK_ENCODING` if it is not valid in the given
+    encoding (which was detected from its first bytes only, see :func:`detect_encoding`).
+
+    Args:
+        data (bytes): the file content
+        encoding (str): the file encoding
+
+    Returns:
+        tuple[str, str]: the decoded text, and the encoding it was decoded with
+    """
+    try:
+        return data.decode(encoding), encoding
+    except UnicodeDecodeError:
+        return data.decode(FALLBACK_ENCODING, errors='replace'), FALLBACK_ENCODING
+
+
+def check_file_encoding(file_path: str, encoding: str or None) -> str or None:
+    """Check that a file is valid in its encoding, decoding it in chunks (see :func:`decode`).
+
+    Args:
+        file_path (str): the file path
+        encoding (str or None): the file encoding, or None if it is UTF-8
+
+    Returns:
+        str or None: the encoding, or :data:`FALLBACK_ENCODING` if the file is not valid in it
+    """
+    decoder = codecs.getincrementaldecoder(encoding or DEFAULT_ENCODING)()
+    try:
+        with open(file_path, 'rb') as file:
+            while chunk := file.read(TRANSCODING_CHUNK_SIZE):
+                decoder.decode(chunk)
+            decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+    return encoding
+
+
+def is_utf8(encoding: str or None) -> bool:
+    """Check if an encoding is UTF-8 (or unknown, i.e. :data:`DEFAULT_ENCODING`)."""
+    return encoding is None or codecs.lookup(encoding).name == 'utf-8'
+
+
+def transcode_file(source_path: str, target_path: str, encoding: str) -> None:
+    """Convert a text file to UTF-8. The file is decoded in chunks, so it is never entirely loaded in memory.
+
+    Args:
+        source_path (str): the path of the file to convert
+        target_path (str): the path of the converted file
+        encoding (str): the encoding of the file to convert
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    with open(source_path, 'rb') as source, open(target_path, 'w', encoding='utf-8', newline='') as target:
+        while chunk := source.read(TRANSCODING_CHUNK_SIZE):
+            target.write(decoder.decode(chunk))
+        target.write(decoder.decode(b'', final=True))
@@ -3,8 +3,10 @@ ALL_PROJECTS_BUTTON = 'all_projects_button'
 APP = 'app'
 AUDIO = 'audio'
 BOT_DF_DATA = 'BOT_DF_DATA'
+BOT_DF_HANDLE = 'BOT_DF_HANDLE'
 BOT_DF_SQL = 'BOT_DF_SQL'
 BOT_DF_TITLE = 'BOT_DF_TITLE'
+BOT_DF_TOTAL_ROWS = 'BOT_DF_TOTAL_ROWS'
 CKAN = 'CKAN'
 COUNT_CSVS = 'count_csvs'
 COUNT_DATASETS = 'count_datasets'
@@ -41,8 +43,12 @@ WEBSOCKET = 'websocket'
 WEBSOCKET_THREAD = 'websocket_thread'
 
 # PROPERTIES
+CHART_MAX_POINTS = 'chart.max_points'
+DATA_DIR = 'data.dir'
+LLM_CACHE_FILE = 'llm.cache.file'
 NLP_LANGUAGE = 'nlp.language'
 NLP_STT_HF_MODEL = 'nlp.speech2text.hf.model'
+SCHEMA_INFERENCE_WORKERS = 'schema.inference.workers'
 WEBSOCKET_PORT = 'websocket.port'
 
 # EXTRAS
@@ -0,0 +1,29 @@
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a column name to use it in a SQL query."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def sql_literal(value) -> str:
+    """Get the SQL literal of a Python value (text, number, boolean, date or a list of them), to use it in a SQL
+    query."""
+    if value is None or value is pd.NaT:
+        return 'NULL'
+    if isinstance(value, (bool, np.bool_)):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, (float, np.floating)):
+        return 'NULL' if np.isnan(value) else repr(float(value))
+    if isinstance(value, (datetime, np.datetime64)):
+        return f"TIMESTAMP '{pd.Timestamp(value).tz_localize(None).isoformat(sep=' ')}'"
+    if isinstance(value, date):
+        return f"DATE '{value.isoformat()}'"
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(sql_literal(v) for v in value) + ']'
+    return "'" + str(value).replace("'", "''") + "'"
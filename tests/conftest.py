@@ -0,0 +1,20 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from src.schema.data_schema import DataSchema
+from src.utils.session_state_keys import SCHEMA_INFERENCE_WORKERS
+
+
+@pytest.fixture
+def make_data_schema():
+    """Infer the data schema of a DataFrame, with the indexes and statistics built when training a bot."""
+    def make_data_schema(df: pd.DataFrame) -> DataSchema:
+        project = SimpleNamespace(name='test', df=df, out_of_core=False,
+                                  app=SimpleNamespace(properties={SCHEMA_INFERENCE_WORKERS: 1}))
+        data_schema = DataSchema(project)
+        data_schema.build_indexes()
+        data_schema.compute_statistics()
+        return data_schema
+    return make_data_schema
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.app.bot.workflows.queries.charts.chart_data import reduce_box_data, reduce_line_data, reduce_scatter_data, \
+    stratified_sample
+
+
+@pytest.fixture
+def scatter_df() -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    x = np.concatenate([rng.normal(0, 1, 50_000), rng.uniform(-100, 100, 200)])
+    y = np.concatenate([rng.normal(0, 1, 50_000), rng.uniform(-100, 100, 200)])
+    return pd.DataFrame({'x': x, 'y': y, 'label': rng.integers(0, 5_000, len(x)).astype(str)})
+
+
+@pytest.mark.parametrize('max_points', [1, 10, 100, 1_000, 5_000])
+def test_scatter_sample_within_budget(scatter_df, max_points):
+    result = reduce_scatter_data(scatter_df, 'x', 'y', max_points)
+    assert 0 < len(result) <= max_points
+
+
+@pytest.mark.parametrize('max_points', [10, 1_000])
+def test_scatter_sample_within_budget_categorical_axis(scatter_df, max_points):
+    # One cell per label: many more cells than points
+    result = reduce_scatter_data(scatter_df, 'label', 'y', max_points)
+    assert 0 < len(result) <= max_points
+
+
+def test_scatter_sample_uses_budget(scatter_df):
+    assert len(reduce_scatter_data(scatter_df, 'x', 'y', 1_000)) == 1_000
+
+
+def test_scatter_sample_is_deterministic(scatter_df):
+    first = stratified_sample(scatter_df, 'x', 'y', 500)
+    second = stratified_sample(scatter_df, 'x', 'y', 500)
+    assert np.array_equal(first, second)
+    assert np.all(np.diff(first) > 0)
+
+
+def test_scatter_sample_small_data(scatter_df):
+    df = scatter_df.iloc[:50]
+    assert reduce_scatter_data(df, 'x', 'y', 100) is df
+
+
+@pytest.mark.parametrize('max_points', [1, 2, 100, 999])
+@pytest.mark.parametrize('x', ['x', 'label'])
+def test_line_data_within_budget(scatter_df, x, max_points):
+    result = reduce_line_data(scatter_df, x, 'y', max_points)
+    assert 0 < len(result) <= max_points
+
+
+def test_box_data_keeps_extremes_and_quartiles():
+    rng = np.random.default_rng(2)
+    days = pd.Series(pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 10_000, 100_000), unit='min'))
+    df = pd.DataFrame({'day': days})
+    result = reduce_box_data(df, 'day', 1_001)
+    assert len(result) == 1_001
+    assert result['day'].min() == days.min()
+    assert result['day'].max() == days.max()
+    assert abs(result['day'].median() - days.median()) < pd.Timedelta(minutes=30)
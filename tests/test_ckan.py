@@ -0,0 +1,41 @@
+import logging
+from unittest import mock
+
+import pytest
+
+pytest.importorskip('requests')
+
+from src.utils import ckan  # noqa: E402
+
+
+def fake_portal(num_packages: int, rows_max: int):
+    """A package_search that returns at most rows_max packages per page, like a CKAN portal."""
+    def search_packages(base_url, start, rows, http_session):
+        end = min(start + min(rows, rows_max), num_packages)
+        return {'count': num_packages, 'results': [{'name': f'package-{i:05}'} for i in range(start, end)]}
+    return search_packages
+
+
+@pytest.mark.parametrize('rows_max', [1000, 300, 7])
+def test_iter_packages_gets_every_package(rows_max):
+    with mock.patch.object(ckan, 'search_packages', fake_portal(2_500, rows_max)):
+        names = [package['name'] for packages, _ in ckan.iter_packages('http://portal', max_workers=3)
+                 for package in packages]
+    assert sorted(names) == [f'package-{i:05}' for i in range(2_500)]
+
+
+def test_iter_packages_empty_portal():
+    with mock.patch.object(ckan, 'search_packages', fake_portal(0, 1000)):
+        assert list(ckan.iter_packages('http://portal')) == [([], 0)]
+
+
+def test_iter_packages_warns_on_missing_packages(caplog):
+    search_packages = fake_portal(2_500, 1000)
+
+    def shrinking_portal(base_url, start, rows, http_session):
+        result = search_packages(base_url, start, rows, http_session)
+        return {'count': result['count'], 'results': result['results'][:-1] if start else result['results']}
+
+    with mock.patch.object(ckan, 'search_packages', shrinking_portal), caplog.at_level(logging.WARNING):
+        list(ckan.iter_packages('http://portal'))
+    assert 'Received 2498 packages' in caplog.text
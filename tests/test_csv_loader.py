@@ -0,0 +1,23 @@
+from io import StringIO
+
+import pandas as pd
+
+from src.utils.csv_loader import read_csv
+
+
+def test_read_csv_day_first_fallback():
+    values = ['01/02/2020', '03/04/2021'] * 50_000
+    values[23_456] = '13/02/2020'
+    csv = pd.DataFrame({'date': values, 'value': range(len(values))}).to_csv(index=False)
+    # The day after the 12th is in the third chunk, after the column plans were decided
+    df, _ = read_csv(StringIO(csv), chunk_size=10_000)
+    assert pd.api.types.is_datetime64_any_dtype(df['date'])
+    assert df['date'].iloc[0] == pd.Timestamp('2020-02-01')
+    assert df['date'].iloc[23_456] == pd.Timestamp('2020-02-13')
+
+
+def test_read_csv_not_dates():
+    csv = 'date,value\n01/02/2020,1\n13/13/2020,2\n' + '03/04/2021,3\n' * 100
+    df, _ = read_csv(StringIO(csv), chunk_size=10)
+    assert not pd.api.types.is_datetime64_any_dtype(df['date'])
+    assert df['date'].iloc[1] == '13/13/2020'
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+from src.schema.data_schema import DataSchema
+from src.schema.field_type import BOOLEAN, DATETIME, NUMERIC, TEXTUAL
+from src.utils.session_state_keys import SCHEMA_INFERENCE_WORKERS
+
+
+def make_project(df: pd.DataFrame) -> SimpleNamespace:
+    return SimpleNamespace(name='test', df=df, out_of_core=False,
+                           app=SimpleNamespace(properties={SCHEMA_INFERENCE_WORKERS: 1}))
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    return pd.DataFrame({
+        'city': ['Paris', 'Rome', 'Paris', 'Oslo'],
+        'date': ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04'],
+        'open': ['yes', 'no', 'yes', 'yes'],
+        'value': [1.0, 2.0, 3.0, 4.0],
+    })
+
+
+def test_restore_state_without_inference(df):
+    project = make_project(df)
+    data_schema = DataSchema(project)
+    data_schema.get_field('city').readable_name = 'City'
+    data_schema.get_field('city').get_category('Rome').synonyms['en'] = ['Roma']
+    state = data_schema.get_state()
+    # The project data was converted by the type inference, as it is stored
+    restored_project = make_project(project.df)
+    with mock.patch('src.schema.field_schema.count_distinct') as count_distinct, \
+            mock.patch('src.schema.field_schema.infer_text_column') as infer_text_column:
+        restored = DataSchema(restored_project, state)
+    count_distinct.assert_not_called()
+    infer_text_column.assert_not_called()
+    assert restored.get_state() == state
+    assert [field.type.t for field in restored.field_schemas] == [TEXTUAL, DATETIME, BOOLEAN, NUMERIC]
+    assert restored.get_field('city').readable_name == 'City'
+    assert restored.get_field('city').get_category('Rome').synonyms['en'] == ['Roma']
+
+
+def test_restore_state_type_changed(df):
+    project = make_project(df)
+    state = DataSchema(project).get_state()
+    changed_df = project.df.assign(value=['a', 'b', 'c', 'd'])
+    restored = DataSchema(make_project(changed_df), state)
+    assert restored.get_field('value').type.t == TEXTUAL
+    assert restored.get_field('value').num_different_values == 4
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.schema.distinct_count import count_distinct, estimate_distinct, hash_values
+
+
+@pytest.mark.parametrize('num_values', [100_000, 250_000])
+def test_unique_floats_estimate_within_row_count(num_values):
+    column = pd.Series(np.random.default_rng(0).random(num_values))
+    count, exact = count_distinct(column, max_exact=9)
+    assert not exact
+    assert count <= column.count()
+    assert count == pytest.approx(num_values, rel=0.015)
+
+
+def test_estimate_ignores_nulls():
+    values = np.random.default_rng(0).random(200_000)
+    values[::2] = np.nan
+    column = pd.Series(values)
+    count, exact = count_distinct(column, max_exact=9)
+    assert not exact
+    assert count <= column.count() == 100_000
+
+
+@pytest.mark.parametrize('num_distinct', [1_000, 50_000, 200_000, 500_000, 1_000_000])
+def test_estimate_unbiased(num_distinct):
+    # Average relative error over several hash sets, so the standard error (~0.4%) averages out
+    errors = [estimate_distinct(hash_values(pd.Series(np.random.default_rng(seed).random(num_distinct))))
+              / num_distinct - 1 for seed in range(4)]
+    assert abs(np.mean(errors)) < 0.006
+
+
+def test_exact_low_cardinality():
+    column = pd.Series(np.arange(300_000) % 7, dtype=np.int64)
+    assert count_distinct(column, max_exact=9) == (7, True)
+
+
+def test_datetimes_and_text():
+    datetimes = pd.Series(pd.date_range('2020-01-01', periods=100_000, freq='min'))
+    count, _ = count_distinct(datetimes, max_exact=9)
+    assert count == pytest.approx(100_000, rel=0.015) and count <= 100_000
+    text = pd.Series([f'id-{i % 80_000}' for i in range(160_000)])
+    count, _ = count_distinct(text, max_exact=9)
+    assert count == pytest.approx(80_000, rel=0.015)
@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip('requests')
+
+from src.utils.download import DownloadTooLargeError, read_response  # noqa: E402
+
+
+class StreamedResponse:
+
+    def __init__(self, content: bytes, content_length: bool = True):
+        self.content = content
+        self.headers = {'Content-Length': str(len(content))} if content_length else {}
+
+    def iter_content(self, chunk_size: int):
+        for start in range(0, len(self.content), 10):
+            yield self.content[start:start + 10]
+
+
+def test_read_response():
+    assert read_response('http://file', StreamedResponse(b'x' * 95)) == b'x' * 95
+
+
+@pytest.mark.parametrize('content_length', [True, False])
+def test_read_response_too_large(content_length):
+    with pytest.raises(DownloadTooLargeError):
+        read_response('http://file', StreamedResponse(b'x' * 95, content_length), max_size=50)
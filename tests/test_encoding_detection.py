@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip('chardet')
+
+from src.utils.encoding_detection import FALLBACK_ENCODING, check_file_encoding, decode, detect_encoding  # noqa: E402
+
+# The first non-ASCII character is after the bytes used to detect the encoding
+LATE_LATIN1_CONTENT = ('name,city\n' + 'a,Paris\n' * 20_000 + 'b,Zürich\n').encode('cp1252')
+
+
+def test_ascii_prefix_falls_back():
+    encoding = detect_encoding(LATE_LATIN1_CONTENT)
+    text, encoding = decode(LATE_LATIN1_CONTENT, encoding)
+    assert encoding == FALLBACK_ENCODING
+    assert text.endswith('Zürich\n')
+
+
+def test_utf8_is_kept():
+    content = 'name\nZürich\n'.encode('utf-8')
+    assert decode(content, detect_encoding(content)) == ('name\nZürich\n', 'utf-8')
+
+
+def test_check_file_encoding(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_bytes(LATE_LATIN1_CONTENT)
+    assert check_file_encoding(str(path), None) == FALLBACK_ENCODING
+    path.write_bytes(LATE_LATIN1_CONTENT.decode('cp1252').encode('utf-8'))
+    assert check_file_encoding(str(path), None) is None
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.schema.field_statistics import BOX_MAX_OUTLIERS, FieldStatistics, get_box_statistics
+
+
+def read_only_column(values) -> pd.Series:
+    array = np.asarray(values, dtype=np.float64)
+    array.flags.writeable = False
+    return pd.Series(array, copy=False)
+
+
+def test_box_statistics_read_only_values():
+    column = read_only_column([5, 1, 4, 2, 3, 100, np.nan])
+    statistics = get_box_statistics(column)
+    assert statistics['median'] == 3.5
+    assert statistics['count'] == 6
+    assert statistics['outliers'].tolist() == [100.0]
+    # The column is not sorted in place
+    assert column.iloc[:3].tolist() == [5.0, 1.0, 4.0]
+
+
+def test_box_statistics_match_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(size=10_001)
+    statistics = get_box_statistics(read_only_column(values))
+    assert statistics['q1'] == pytest.approx(np.percentile(values, 25))
+    assert statistics['median'] == pytest.approx(np.median(values))
+    assert statistics['q3'] == pytest.approx(np.percentile(values, 75))
+    assert statistics['mean'] == pytest.approx(values.mean())
+    iqr = statistics['q3'] - statistics['q1']
+    inside = values[(values >= statistics['q1'] - 1.5 * iqr) & (values <= statistics['q3'] + 1.5 * iqr)]
+    assert statistics['lowerfence'] == inside.min()
+    assert statistics['upperfence'] == inside.max()
+    assert len(statistics['outliers']) == min(len(values) - len(inside), BOX_MAX_OUTLIERS)
+
+
+@pytest.mark.parametrize('column', [pd.Series(['a', 'b']), pd.Series([True, False]), pd.Series([], dtype=float)])
+def test_box_statistics_not_numeric_or_empty(column):
+    assert get_box_statistics(column) is None
+
+
+def test_appended_statistics():
+    df = pd.DataFrame({'value': [5.0, 1.0, np.nan, 4.0, 2.0, 3.0, 100.0]})
+    statistics = FieldStatistics(df.iloc[:4], 'value')
+    appended = statistics.appended(df, 4)
+    expected = FieldStatistics(df, 'value')
+    assert appended.built_on(df)
+    assert (appended.min, appended.max, appended.null_count) == (expected.min, expected.max, expected.null_count)
+    assert appended.mean == pytest.approx(expected.mean)
+    assert appended.box['median'] == expected.box['median']
+    # The previous statistics are unchanged, for the queries still reading them
+    assert (statistics.max, statistics.box['count']) == (5.0, 3)
@@ -0,0 +1,76 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.app.sql_engine import SQLEngine
+from src.schema.filter import Filter
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 2_000
+    value = rng.normal(size=n)
+    value[::50] = np.nan
+    city = rng.choice(['Paris', 'Rome', "L'Aquila", 'Oslo'], n).astype(object)
+    city[::70] = None
+    return pd.DataFrame({
+        'value': value,
+        'count': rng.integers(0, 10, n),
+        'city': city,
+        'day': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 60, n), unit='D'),
+        'flag': rng.random(n) < 0.3,
+    })
+
+
+FILTERS = [
+    ('value', op, 0.5) for op in ['=', '!=', '<', '<=', '>', '>=']
+] + [
+    ('count', op, 3) for op in ['=', '!=', '<', '>=']
+] + [
+    ('city', op, value) for op, value in [('equals', 'Paris'), ('different', 'Paris'), ('equals', "L'Aquila"),
+                                          ('contains', 'o'), ('starts with', 'R'), ('ends with', 'is')]
+] + [
+    ('day', 'equals', [(date(2024, 1, 10), None)]),
+    ('day', 'different', [(date(2024, 1, 10), None)]),
+    ('day', 'before', [(date(2024, 1, 20), None)]),
+    ('day', 'after', [(date(2024, 1, 20), None)]),
+    ('day', 'between', [(date(2024, 1, 5), None), (date(2024, 2, 5), None)]),
+    ('flag', 'equals', True),
+]
+
+
+@pytest.mark.parametrize('field, operator, value', FILTERS)
+def test_sql_pushdown_matches_pandas(make_data_schema, df, tmp_path, field, operator, value):
+    data_schema = make_data_schema(df)
+    bot_filter = Filter(data_schema.get_field(field), operator, value)
+    file_path = str(tmp_path / 'part-0.parquet')
+    df.to_parquet(file_path)
+    engine = SQLEngine(file_paths=[file_path])
+    try:
+        pushed_down = engine.query('SELECT * FROM df', where=bot_filter.get_sql())
+    finally:
+        engine.close()
+    expected = df[bot_filter.get_mask(df)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(pushed_down, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize('operator', ['equals', 'different'])
+@pytest.mark.parametrize('value', ['Paris', "L'Aquila", '1', 1, 'missing'])
+@pytest.mark.parametrize('categorical', [False, True])
+def test_indexed_mask_matches_plain_mask(make_data_schema, operator, value, categorical):
+    # Mixed types: the value index compares the string representation of the values
+    city = pd.Series(['Paris', 1, '1', None, "L'Aquila", 'Rome'] * 100, dtype=object)
+    df = pd.DataFrame({'city': city.astype(str).where(city.notna()).astype('category') if categorical else city})
+    data_schema = make_data_schema(df)
+    field = data_schema.get_field('city')
+    assert field.value_index is not None
+    bot_filter = Filter(field, operator, value)
+    indexed = bot_filter.get_indexed_mask(df)
+    # A copy of the data is not indexed, so the whole column is compared
+    assert bot_filter.get_indexed_mask(df.copy()) is None
+    plain = bot_filter.get_mask(df.copy())
+    assert np.array_equal(indexed, plain)
+    assert np.array_equal(bot_filter.get_mask(df), plain)
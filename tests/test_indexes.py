@@ -0,0 +1,38 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.schema.sorted_index import SortedIndex
+from src.schema.value_index import ValueIndex
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    value = rng.normal(size=1_000)
+    value[::40] = np.nan
+    return pd.DataFrame({'city': rng.choice(['Paris', 'Rome', 'Oslo'], 1_000), 'value': value})
+
+
+@pytest.mark.parametrize('index_class, field_name', [(ValueIndex, 'city'), (SortedIndex, 'value')])
+def test_restored_index(df, index_class, field_name):
+    index = index_class(df, field_name)
+    restored = pickle.loads(pickle.dumps(index))
+    assert not restored.built_on(df)
+    restored.bind(df)
+    assert restored.built_on(df)
+    assert np.array_equal(restored._positions, index._positions)
+
+
+@pytest.mark.parametrize('index_class, field_name', [(ValueIndex, 'city'), (SortedIndex, 'value')])
+def test_appended_index(df, index_class, field_name):
+    index = index_class(df.iloc[:600], field_name)
+    positions = index._positions.copy()
+    appended = index.appended(df, 600)
+    assert appended.built_on(df)
+    assert np.array_equal(appended._positions, index_class(df, field_name)._positions)
+    # The previous index is unchanged, for the queries still reading it
+    assert index.num_rows == 600
+    assert np.array_equal(index._positions, positions)
@@ -0,0 +1,54 @@
+from src.app.llm_cache import LLM_CACHE_COMPACTION_RATIO, LLMCache
+
+
+def test_entries_are_appended_and_reloaded(tmp_path):
+    path = str(tmp_path / 'llm.cache')
+    cache = LLMCache(path=path)
+    cache.put('a', {'answer': 1})
+    cache.put('b', {'answer': 2})
+    cache.put('a', {'answer': 3})
+    with open(path, encoding='utf-8') as file:
+        assert len(file.readlines()) == 3
+    reloaded = LLMCache(path=path)
+    assert reloaded.get('a') == {'answer': 3}
+    assert reloaded.get('b') == {'answer': 2}
+
+
+def test_file_is_compacted(tmp_path):
+    path = str(tmp_path / 'llm.cache')
+    cache = LLMCache(max_entries=2, path=path)
+    for i in range(10 * LLM_CACHE_COMPACTION_RATIO):
+        cache.put(str(i % 3), {'answer': i})
+    with open(path, encoding='utf-8') as file:
+        assert len(file.readlines()) <= LLM_CACHE_COMPACTION_RATIO * 2 + 1
+    assert len(LLMCache(max_entries=2, path=path)._entries) == 2
+
+
+def test_half_written_line_is_ignored(tmp_path):
+    path = str(tmp_path / 'llm.cache')
+    LLMCache(path=path).put('a', {'answer': 1})
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('["b", 1')
+    assert LLMCache(path=path).get('a') == {'answer': 1}
+
+
+def test_expired_entries_are_not_loaded(tmp_path):
+    path = str(tmp_path / 'llm.cache')
+    LLMCache(path=path).put('a', {'answer': 1})
+    assert LLMCache(ttl=-1, path=path).get('a') is None
+
+
+def test_set_path(tmp_path):
+    cache = LLMCache()
+    cache.put('a', {'answer': 1})
+    path = str(tmp_path / 'llm.cache')
+    other = LLMCache(path=path)
+    other.put('b', {'answer': 2})
+    cache.set_path(path)
+    assert cache.get('b') == {'answer': 2}
+    reloaded = LLMCache(path=path)
+    assert reloaded.get('a') == {'answer': 1}
+    assert reloaded.get('b') == {'answer': 2}
+    cache.set_path(None)
+    cache.put('c', {'answer': 3})
+    assert LLMCache(path=path).get('c') is None
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('besser')
+
+from src.app.project import Project
+from src.app.project_store import ProjectStore
+from src.utils.session_state_keys import SCHEMA_INFERENCE_WORKERS
+
+
+@pytest.fixture
+def app(tmp_path) -> SimpleNamespace:
+    projects = []
+    return SimpleNamespace(projects=projects, add_project=projects.append, project_store=ProjectStore(str(tmp_path)),
+                           properties={SCHEMA_INFERENCE_WORKERS: 1})
+
+
+def text_data(num_rows: int, day: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'price': ['1,5', '2'] * num_rows,
+        'open': ['yes', 'no'] * num_rows,
+        'date': [f'{day}/02/2024', f'{day}/03/2024'] * num_rows,
+        'city': ['Paris', 'Rome'] * num_rows,
+    })
+
+
+def test_append_partition_converts_text(app):
+    project = Project(app, 'test', text_data(50, 13))
+    data_schema = project.data_schema
+    dtypes = project.df.dtypes
+    project.append_partition('new', text_data(5, 14))
+    # The data schema was updated in place, not inferred again
+    assert project.data_schema is data_schema
+    assert project.df.dtypes.equals(dtypes)
+    assert len(project.df) == 110
+    appended = project.df.iloc[100]
+    assert appended['price'] == 1.5
+    assert appended['open']
+    assert appended['date'] == pd.Timestamp('2024-02-14')
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('chardet')
+
+from src.app.project_store import ProjectStore  # noqa: E402
+
+
+def test_loaded_columns_are_memory_mapped(tmp_path):
+    store = ProjectStore(str(tmp_path))
+    # More rows than the default Arrow chunk size (64K rows)
+    df = pd.DataFrame({'value': np.random.default_rng(0).random(200_000), 'count': np.arange(200_000)})
+    assert store.save('project', df)
+    loaded, metadata = store.load(store.get_file_path('project'))
+    assert metadata['name'] == 'project'
+    pd.testing.assert_frame_equal(loaded, df)
+    for column in ['value', 'count']:
+        # Read-only: a view of the mapped file, not a copy
+        assert not loaded[column].to_numpy().flags.writeable
+
+
+def test_empty_project(tmp_path):
+    store = ProjectStore(str(tmp_path))
+    assert store.save('empty', pd.DataFrame({'value': pd.Series([], dtype=float)}))
+    loaded, _ = store.load(store.get_file_path('empty'))
+    assert len(loaded) == 0
@@ -0,0 +1,14 @@
+import pandas as pd
+
+from src.app.result_store import ResultStore
+
+
+def test_text_counts_towards_max_size():
+    df = pd.DataFrame({'text': ['x' * 10_000] * 100})
+    store = ResultStore(max_size=500_000)
+    first = store.put(df)
+    second = store.put(df)
+    # Each DataFrame holds ~1 MB of text, so only the last one is kept
+    assert store.get_rows(first, 0, 1) is None
+    assert len(store.get_rows(second, 0, 1)) == 1
+    assert store.size > 1_000_000
@@ -0,0 +1,73 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.app.sql_engine import DATA_TABLE, SQLEngine
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    return pd.DataFrame({'city': ['Paris', 'Rome', 'Paris', 'Oslo'], 'value': [1.0, 2.0, 3.0, 4.0]})
+
+
+@pytest.fixture(params=['in_memory', 'out_of_core'])
+def engine(request, df, tmp_path):
+    if request.param == 'in_memory':
+        sql_engine = SQLEngine(df)
+    else:
+        file_path = str(tmp_path / 'part-0.parquet')
+        df.to_parquet(file_path)
+        sql_engine = SQLEngine(file_paths=[file_path])
+    yield sql_engine
+    sql_engine.close()
+
+
+def test_query_untrusted_select(engine):
+    result = engine.query_untrusted('SELECT city, sum(value) AS total FROM df GROUP BY city ORDER BY city')
+    assert result['city'].tolist() == ['Oslo', 'Paris', 'Rome']
+    assert result['total'].tolist() == [4.0, 4.0, 2.0]
+
+
+def test_query_untrusted_session_rows(df):
+    engine = SQLEngine(df)
+    result = engine.query_untrusted('SELECT * FROM df', np.array([True, False, True, False]))
+    assert result.equals(df.iloc[[0, 2]].reset_index(drop=True))
+    engine.close()
+
+
+@pytest.mark.parametrize('sql', [
+    f'DELETE FROM {DATA_TABLE}',
+    'DROP VIEW df',
+    "COPY (SELECT * FROM df) TO 'out.csv'",
+    'SET enable_external_access = true',
+    'SELECT 1; SELECT 2',
+    'CALL pragma_version()',
+])
+def test_query_untrusted_rejects_other_statements(engine, sql):
+    with pytest.raises(ValueError):
+        engine.query_untrusted(sql)
+
+
+def test_query_untrusted_cannot_read_files(engine, tmp_path):
+    path = tmp_path / 'secret.csv'
+    path.write_text('secret\n42\n')
+    with pytest.raises(duckdb.Error):
+        engine.query_untrusted(f"SELECT * FROM read_csv('{path}')")
+
+
+def test_query_untrusted_cannot_modify_data(df):
+    engine = SQLEngine(df)
+    with pytest.raises(duckdb.Error):
+        engine.query_untrusted(f'SELECT * FROM {DATA_TABLE}')
+    assert len(engine.query('SELECT * FROM df')) == len(df)
+    engine.close()
+
+
+def test_append_rows(df):
+    engine = SQLEngine(df)
+    appended = pd.concat([df, df.iloc[:1]], ignore_index=True)
+    engine.append_rows(appended, len(df))
+    assert len(engine.query('SELECT * FROM df')) == len(appended)
+    assert len(engine.query_untrusted('SELECT * FROM df')) == len(appended)
+    engine.close()
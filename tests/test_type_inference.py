@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from src.schema.type_inference import BOOLEAN_CONVERSION, NUMBER_CONVERSION, convert_text_column, \
+    find_datetime_formats, get_sample, infer_text_column
+
+
+def day_first_column() -> pd.Series:
+    # Every value of the sample could be month first, but a value outside it has a day after the 12th
+    values = ['01/02/2020', '03/04/2021'] * 50_000
+    values[12_345] = '13/02/2020'
+    return pd.Series(values, name='date')
+
+
+def test_find_datetime_formats_keeps_all_candidates():
+    assert find_datetime_formats(pd.Series(['01/02/2020', '03/04/2021'])) == ['%m/%d/%Y', '%d/%m/%Y']
+    assert find_datetime_formats(pd.Series(['13/02/2020'])) == ['%d/%m/%Y']
+    assert find_datetime_formats(pd.Series(['hello'])) == []
+
+
+def test_day_first_fallback():
+    column = day_first_column()
+    assert '13/02/2020' not in get_sample(column).tolist()
+    converted, conversion = infer_text_column(column)
+    assert conversion == '%d/%m/%Y'
+    assert converted.iloc[0] == pd.Timestamp('2020-02-01')
+    assert converted.iloc[12_345] == pd.Timestamp('2020-02-13')
+    assert converted.notna().all()
+
+
+def test_day_first_fallback_categorical():
+    column = day_first_column().astype('category')
+    converted, _ = infer_text_column(column)
+    assert converted.iloc[1] == pd.Timestamp('2021-04-03')
+    assert converted.iloc[12_345] == pd.Timestamp('2020-02-13')
+
+
+def test_month_first_preferred():
+    converted, _ = infer_text_column(pd.Series(['01/02/2020', '03/04/2021', None]))
+    assert converted.iloc[0] == pd.Timestamp('2020-01-02')
+    assert pd.isna(converted.iloc[2])
+
+
+def test_infer_numbers():
+    converted, conversion = infer_text_column(pd.Series(['1', '2.5', '3,5', None]))
+    assert conversion == NUMBER_CONVERSION
+    np.testing.assert_array_equal(converted.to_numpy(), [1.0, 2.5, 3.5, np.nan])
+
+
+def test_infer_booleans():
+    converted, conversion = infer_text_column(pd.Series(['yes', 'no', 'YES']))
+    assert converted.tolist() == [True, False, True]
+    assert conversion == BOOLEAN_CONVERSION
+
+
+def test_text_column_is_kept():
+    assert infer_text_column(pd.Series(['a', '1', '2020-01-01'])) is None
+
+
+def test_convert_text_column():
+    assert convert_text_column(pd.Series(['4,5', '6']), NUMBER_CONVERSION).tolist() == [4.5, 6.0]
+    converted = convert_text_column(pd.Series(['15/02/2020', None]).astype('category'), '%d/%m/%Y')
+    assert converted.iloc[0] == pd.Timestamp('2020-02-15')
+    assert pd.isna(converted.iloc[1])
+    assert convert_text_column(pd.Series(['1', 'a']), NUMBER_CONVERSION) is None